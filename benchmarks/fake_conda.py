@@ -0,0 +1,79 @@
+# fake_conda.py
+"""
+假的 conda 可执行程序，用合成根目录的 conda-meta 回放 `conda env list` / `conda list` 的输出，
+create/install/remove 等修改类命令只等待后直接返回成功
+
+环境变量:
+    FAKE_CONDA_ROOT     合成根目录（由 synthetic_root.py 生成）
+    FAKE_CONDA_LATENCY  每次调用的额外延迟（秒），模拟真实 conda 的启动开销，默认 0
+
+使用方式（通过执行器替换 conda 命令）:
+    CondaEnvManager(root, executables={'conda': [sys.executable, 'benchmarks/fake_conda.py']})
+"""
+import json
+import os
+import sys
+import time
+
+
+# 列出根目录下的所有环境
+def list_envs(root: str) -> list:
+    envs = [("base", root)]
+    envs_dir = os.path.join(root, "envs")
+    if os.path.isdir(envs_dir):
+        for name in sorted(os.listdir(envs_dir)):
+            path = os.path.join(envs_dir, name)
+            if os.path.isdir(os.path.join(path, "conda-meta")):
+                envs.append((name, path))
+    return envs
+
+
+# 输出 conda env list
+def print_env_list(root: str):
+    print("# conda environments:")
+    print("#")
+    for name, path in list_envs(root):
+        marker = "*" if name == "base" else " "
+        print(f"{name:<25} {marker}  {path}")
+
+
+# 输出 conda list
+def print_list(prefix: str) -> int:
+    meta_dir = os.path.join(prefix, "conda-meta")
+    if not os.path.isdir(meta_dir):
+        print(f"EnvironmentLocationNotFound: Not a conda environment: {prefix}", file=sys.stderr)
+        return 1
+    print(f"# packages in environment at {prefix}:")
+    print("#")
+    print("# Name                    Version                   Build  Channel")
+    for entry in sorted(os.listdir(meta_dir)):
+        if not entry.endswith(".json"):
+            continue
+        with open(os.path.join(meta_dir, entry), "r", encoding="utf-8") as f:
+            record = json.load(f)
+        print(f"{record['name']:<25} {record['version']:<25} {record['build']:<15}")
+    return 0
+
+
+def main(argv) -> int:
+    root = os.environ.get("FAKE_CONDA_ROOT", "")
+    time.sleep(float(os.environ.get("FAKE_CONDA_LATENCY", "0")))
+
+    if argv[:2] == ["env", "list"]:
+        print_env_list(root)
+        return 0
+    if argv[:1] == ["list"]:
+        if "-p" in argv:
+            return print_list(argv[argv.index("-p") + 1])
+        if "-n" in argv:
+            name = argv[argv.index("-n") + 1]
+            return print_list(root if name == "base" else os.path.join(root, "envs", name))
+        return print_list(root)
+    if argv[:1] in (["create"], ["install"], ["remove"], ["update"]):
+        return 0    # 修改类命令只模拟耗时
+    print(f"fake_conda: 不支持的命令 {' '.join(argv)}", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,156 @@
+# run_benchmarks.py
+"""
+可重复的基准测试：在合成根目录 + 假 conda 上测量各个耗时路径，输出耗时和峰值内存
+
+场景:
+    full_refresh        get_all_envs_and_packages（每个环境一次 conda list）
+    incremental_refresh get_env_inventory（只刷新一个环境）
+    db_save             save_environments（全量写入）
+    db_load             load_environments
+    cold_start          load_environments + get_python_versions（旧版图形界面从数据库启动时的路径）
+    cold_start_lazy     list_environments + 一个环境的 load_env_packages（按需加载模式的启动路径）
+    search              跨环境按包名查找（内存中 + 数据库 find_packages）
+
+用法:
+    python benchmarks/run_benchmarks.py --envs 50 --packages 200 --latency 0.2 [--repeat 3] [--json out.json]
+    python benchmarks/run_benchmarks.py --no-db     # 没有 MySQL 时只跑 conda 相关场景
+
+数据库场景默认使用单独的 condaControlor_bench 库，不会影响正式数据
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from condaEnvManager import CondaEnvManager
+import synthetic_root
+
+
+# 运行单个场景
+def measure(name: str, func, repeat: int) -> dict:
+    """
+    重复运行场景，记录每次耗时和峰值内存（tracemalloc，只统计 Python 分配）
+
+    返回值:
+        dict: 场景名称、各次耗时统计、峰值内存（字节）、最后一次的返回值摘要
+    """
+    times = []
+    peak = 0
+    summary = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        summary = summarize(result)
+    return {
+        "scenario": name,
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "max": max(times),
+        "peak_bytes": peak,
+        "result": summary,
+    }
+
+
+# 返回值摘要（避免把整个数据打印出来）
+def summarize(result):
+    if isinstance(result, dict):
+        return f"dict[{len(result)}]"
+    if isinstance(result, list):
+        return f"list[{len(result)}]"
+    return repr(result)
+
+
+# 打印结果表格
+def print_table(results: list):
+    print(f"{'scenario':<22}{'repeat':>7}{'min(s)':>10}{'median(s)':>11}{'max(s)':>10}{'peak(MB)':>10}  result")
+    for r in results:
+        print(f"{r['scenario']:<22}{r['repeat']:>7}{r['min']:>10.4f}{r['median']:>11.4f}{r['max']:>10.4f}"
+              f"{r['peak_bytes'] / 1024 / 1024:>10.2f}  {r['result']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="conda 环境管理器基准测试")
+    parser.add_argument("--root", help="已有的合成根目录，不指定则在临时目录中生成")
+    parser.add_argument("--envs", type=int, default=20)
+    parser.add_argument("--packages", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="假 conda 每次调用的额外延迟（秒）")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database", default="condaControlor_bench", help="数据库场景使用的库名")
+    parser.add_argument("--no-db", action="store_true", help="跳过数据库场景")
+    parser.add_argument("--json", help="把结果另存为 JSON 文件")
+    args = parser.parse_args(argv)
+
+    # 准备合成根目录
+    tmp = None
+    root = args.root
+    if not root:
+        tmp = tempfile.TemporaryDirectory(prefix="conda_bench_")
+        root = tmp.name
+        start = time.perf_counter()
+        synthetic_root.generate(root, args.envs, args.packages, args.seed)
+        print(f"生成合成根目录 {root}: {args.envs} 个环境 × {args.packages} 个包，耗时 {time.perf_counter() - start:.2f}s")
+
+    os.environ["FAKE_CONDA_ROOT"] = root
+    os.environ["FAKE_CONDA_LATENCY"] = str(args.latency)
+    fake_conda = [sys.executable, os.path.join(BENCH_DIR, "fake_conda.py")]
+    manager = CondaEnvManager(root, executables={"conda": fake_conda})
+
+    results = []
+    env_data = manager.get_all_envs_and_packages()     # 预热，同时作为数据库场景的数据
+    some_env = sorted(env_data)[len(env_data) // 2]
+    results.append(measure("full_refresh", manager.get_all_envs_and_packages, args.repeat))
+    results.append(measure("incremental_refresh", lambda: manager.get_env_inventory(some_env), args.repeat))
+    results.append(measure("search_memory", lambda: [
+        name for name, info in env_data.items() if "numpy" in info[1][0]
+    ], args.repeat))
+
+    if not args.no_db:
+        try:
+            import mysqlcontroller
+            if mysqlcontroller.ensure_schema(args.database) is None:
+                raise RuntimeError("无法连接数据库或创建表")
+            controller = mysqlcontroller.MySQLController(database=args.database)
+            if not controller.connect():
+                raise RuntimeError("无法连接数据库")
+            controller.disconnect()
+        except Exception as e:
+            print(f"跳过数据库场景: {e}")
+        else:
+            results.append(measure("db_save", lambda: controller.save_environments(env_data), args.repeat))
+            results.append(measure("db_load", controller.load_environments, args.repeat))
+            results.append(measure("cold_start", lambda: (controller.load_environments(), controller.get_python_versions()),
+                                   args.repeat))
+            results.append(measure("cold_start_lazy", lambda: (controller.list_environments(),
+                                                               controller.load_env_packages(some_env)), args.repeat))
+            results.append(measure("search_db", lambda: controller.find_packages("numpy"), args.repeat))
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "envs": len(env_data),
+                "packages": args.packages,
+                "latency": args.latency,
+                "results": results,
+            }, f, indent=2, default=str)
+
+    if tmp is not None:
+        tmp.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# synthetic_root.py
+"""
+生成合成的 conda 根目录：N 个环境 × M 个包，每个包都有真实格式的 conda-meta/*.json 记录
+（name/version/build/channel/url/md5/sha256/files/paths_data），以及对应的空文件和部分 pip 包的 dist-info
+
+用法:
+    python benchmarks/synthetic_root.py OUTPUT_DIR --envs 100 --packages 300 [--seed 0]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+
+# 常见包名，用完后用 pkgNNN 补足
+COMMON_PACKAGES = [
+    "python", "pip", "setuptools", "wheel", "numpy", "scipy", "pandas", "matplotlib", "requests", "urllib3",
+    "certifi", "idna", "charset-normalizer", "six", "python-dateutil", "pytz", "tzdata", "openssl", "zlib",
+    "sqlite", "libffi", "xz", "bzip2", "ca-certificates", "packaging", "pyyaml", "jinja2", "markupsafe",
+    "click", "colorama", "tqdm", "pillow", "scikit-learn", "joblib", "threadpoolctl", "pyparsing", "cycler",
+    "kiwisolver", "fonttools", "contourpy", "attrs", "typing_extensions", "filelock", "psutil", "pytest",
+]
+CHANNEL = "https://repo.anaconda.com/pkgs/main"
+SUBDIR = "win-64" if os.name == "nt" else "linux-64"
+
+
+# 生成包名列表
+def package_names(count: int) -> list:
+    names = COMMON_PACKAGES[:count]
+    names += [f"pkg{i:04d}" for i in range(count - len(names))]
+    return names
+
+
+# 生成单个包的 conda-meta 记录并写出文件
+def write_package(env_path: str, name: str, version: str, build: str, files_per_package: int):
+    dist = f"{name}-{version}-{build}"
+    files = []
+    paths = []
+    for j in range(files_per_package):
+        rel_path = f"Lib/site-packages/{name.replace('-', '_')}/mod{j}.py"
+        content = f"# {dist} file {j}\n".encode()
+        full_path = os.path.join(env_path, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(content)
+        files.append(rel_path)
+        paths.append({
+            "_path": rel_path,
+            "path_type": "hardlink",
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "size_in_bytes": len(content),
+        })
+
+    record = {
+        "name": name,
+        "version": version,
+        "build": build,
+        "build_number": 0,
+        "channel": CHANNEL,
+        "subdir": SUBDIR,
+        "fn": dist + ".conda",
+        "url": f"{CHANNEL}/{SUBDIR}/{dist}.conda",
+        "md5": hashlib.md5(dist.encode()).hexdigest(),
+        "sha256": hashlib.sha256(dist.encode()).hexdigest(),
+        "size": 1024 * (1 + len(name)),
+        "depends": [],
+        "files": files,
+        "paths_data": {"paths": paths, "paths_version": 1},
+    }
+    with open(os.path.join(env_path, "conda-meta", dist + ".json"), "w", encoding="utf-8") as f:
+        json.dump(record, f)
+
+
+# 写出一个 pip 安装的包（只有 dist-info）
+def write_pip_package(env_path: str, name: str, version: str):
+    dist_info = os.path.join(env_path, "Lib", "site-packages", f"{name.replace('-', '_')}-{version}.dist-info")
+    os.makedirs(dist_info, exist_ok=True)
+    with open(os.path.join(dist_info, "METADATA"), "w", encoding="utf-8") as f:
+        f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\n")
+    with open(os.path.join(dist_info, "INSTALLER"), "w", encoding="utf-8") as f:
+        f.write("pip\n")
+
+
+# 生成单个环境
+def write_env(env_path: str, names: list, rng: random.Random, files_per_package: int, pip_packages: int):
+    os.makedirs(os.path.join(env_path, "conda-meta"), exist_ok=True)
+    for name in names:
+        if name == "python":
+            version = rng.choice(["3.9.18", "3.10.13", "3.11.7", "3.12.1"])
+        else:
+            version = f"{rng.randint(0, 3)}.{rng.randint(0, 30)}.{rng.randint(0, 9)}"
+        build = f"py_{rng.randint(0, 3)}" if rng.random() < 0.5 else f"h{rng.getrandbits(32):08x}_0"
+        write_package(env_path, name, version, build, files_per_package)
+    for i in range(pip_packages):
+        write_pip_package(env_path, f"pipdist{i:03d}", f"1.{rng.randint(0, 20)}.0")
+    with open(os.path.join(env_path, "conda-meta", "history"), "w", encoding="utf-8") as f:
+        f.write("==> 2024-01-01 00:00:00 <==\n")
+
+
+# 生成合成根目录
+def generate(root: str, envs: int, packages: int, seed: int = 0, files_per_package: int = 2, pip_packages: int = 3) -> dict:
+    """
+    生成合成 conda 根目录，根目录本身为 base 环境，其余环境位于 envs/ 下
+
+    参数:
+        root (str): 输出目录
+        envs (int): 环境数量（含 base）
+        packages (int): 每个环境的 conda 包数量
+        seed (int): 随机种子，相同参数生成完全相同的目录
+        files_per_package (int): 每个包写出的文件数
+        pip_packages (int): 每个环境额外的 pip 包数量
+
+    返回值:
+        dict: {环境名称: 环境路径}
+    """
+    rng = random.Random(seed)
+    pool = package_names(packages * 2)
+    env_paths = {}
+    for i in range(envs):
+        name = "base" if i == 0 else f"env{i:03d}"
+        env_path = root if i == 0 else os.path.join(root, "envs", name)
+        # 前一半是大家都有的公共包，后一半随机挑选，模拟真实环境之间的重叠
+        common = pool[:packages // 2]
+        extra = rng.sample(pool[packages // 2:], packages - len(common))
+        write_env(env_path, common + extra, rng, files_per_package, pip_packages)
+        env_paths[name] = env_path
+    os.makedirs(os.path.join(root, "pkgs", "cache"), exist_ok=True)
+    return env_paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成合成的 conda 根目录")
+    parser.add_argument("output")
+    parser.add_argument("--envs", type=int, default=20)
+    parser.add_argument("--packages", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--files-per-package", type=int, default=2)
+    parser.add_argument("--pip-packages", type=int, default=3)
+    args = parser.parse_args()
+    result = generate(args.output, args.envs, args.packages, args.seed, args.files_per_package, args.pip_packages)
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,624 @@
+# cli.py
+"""
+无界面的命令行入口，所有输出均为 JSON，便于脚本调用
+
+用法示例:
+    python cli.py list                      # 从数据库读取环境列表
+    python cli.py list --live               # 直接调用 conda 获取环境列表
+    python cli.py scan [--env NAME]         # 重新扫描（全部或单个环境）并写入数据库
+    python cli.py query numpy [--like]      # 查找包含某个包的环境
+    python cli.py diff env_a env_b          # 比较两个环境的包差异
+    python cli.py install ENV PKG [--version V] [--backend libmamba]
+    python cli.py export [-o FILE]          # 导出数据库中的全部环境信息
+    python cli.py history --env ENV --at "2024-05-01 08:00"    # 环境在某个时间点的状态
+    python cli.py history --package numpy [--since 2024-05-01] # numpy 什么时候变过
+    python cli.py fleet envs --env X --python 3.9   # 哪些机器上有环境 X 且 Python 为 3.9
+    python cli.py fleet packages numpy [--version 1.26]
+    python cli.py verify [--env NAME]           # 按 conda-meta 记录校验环境中的文件
+    python cli.py outdated [--format csv -o outdated.csv]   # 所有环境中落后于最新版本的包
+    python cli.py gc [--stale-days 90] [--remove ENV ...]   # 可回收的环境（长期不用/近似重复/损坏），可批量删除
+    python cli.py usage install ENV... | --all  # 在环境中安装导入统计钩子（uninstall 删除）
+    python cli.py usage collect                 # 把各环境的导入日志汇总到数据库
+    python cli.py usage report [--env NAME]     # 装了但从未被导入的包
+    python cli.py lock ENV [-o FILE] [--yml]    # 从 conda-meta 生成显式锁定文件或 environment.yml
+    python cli.py recreate NEW_ENV FILE         # 用锁定文件重建环境（显式锁定文件不经过求解器）
+    python cli.py snapshot export inventory.parquet         # 按列导出清单快照（.parquet/.arrow 需要 pyarrow）
+    python cli.py snapshot import inventory.cmsnap --as-local   # 在新机器上用快照预热本地数据库
+
+只导入用到的模块：不会导入 PySide6，数据库驱动也只在需要访问数据库的子命令中才导入
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+import tracing
+from condaEnvManager import CondaEnvManager, SOLVER_BACKENDS, load_saved_conda_path, load_saved_conda_paths
+from condaApi import CondaApiClient
+
+
+# 输出 JSON
+def emit(data, pretty: bool = False):
+    json.dump(data, sys.stdout, ensure_ascii=False, default=str, indent=2 if pretty else None)
+    sys.stdout.write("\n")
+
+
+# 输出错误信息并返回错误码
+def fail(message: str, pretty: bool = False) -> int:
+    emit({"error": message}, pretty)
+    return 1
+
+
+# 获取数据库控制器（延迟导入数据库驱动）
+def get_controller(db_host: str = 'localhost'):
+    from queryCache import CachedMySQLController
+    return CachedMySQLController(host=db_host)
+
+
+# 获取conda环境管理器
+def get_manager(args, many_queries: bool = False):
+    """
+    参数:
+        many_queries: 本次命令是否要查询所有环境的包（全量扫描等），是则默认启动常驻的查询辅助进程；
+            只查询一两次的命令启动辅助进程反而多一次解释器启动，默认不用。--api / --no-api 可强制打开/关闭
+    """
+    conda_path = args.conda_path or load_saved_conda_path()
+    if not conda_path:
+        return None
+    use_api = getattr(args, "api", False) or (many_queries and not getattr(args, "no_api", False))
+    api = CondaApiClient(conda_path) if use_api else None
+    # 未指定 --conda-path 时使用 conda_path.txt 中配置的所有根目录
+    roots = [conda_path] if args.conda_path else load_saved_conda_paths()
+    return CondaEnvManager(conda_path, backend=getattr(args, "backend", None) or 'conda', api=api, roots=roots)
+
+
+# 把包信息列表转换为字典列表
+def packages_to_rows(packages: list) -> list:
+    """
+    把 [packages_name, packages_version, packages_BuildChannel, packages_source] 转换为字典列表
+    """
+    if not packages or len(packages) < 3:
+        return []
+    sources = packages[3] if len(packages) > 3 else ["conda"] * len(packages[0])
+    return [
+        {"package_name": name, "version": version, "build_channel": build, "source": source}
+        for name, version, build, source in zip(packages[0], packages[1], packages[2], sources)
+    ]
+
+
+# === 子命令 ===
+
+# 列出环境
+def cmd_list(args) -> int:
+    if args.live:
+        manager = get_manager(args)
+        if manager is None:
+            return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+        if len(manager.roots) > 1:
+            # 多个根目录时按根目录分组输出
+            inventory = manager.discover()
+            emit([{"env_name": name, "path": path, "root": root}
+                  for root, envs in inventory.items() for name, path in envs.items()], args.pretty)
+            return 0
+        envs = manager.get_conda_envs()
+        if not envs:
+            return fail("无法获取环境列表", args.pretty)
+        emit([{"env_name": name, "path": path} for name, path in zip(envs[0], envs[1])], args.pretty)
+        return 0
+
+    rows = get_controller().list_environments()
+    if rows is None:
+        return fail("无法从数据库读取环境列表", args.pretty)
+    emit(rows, args.pretty)
+    return 0
+
+
+# 扫描并写入数据库
+def cmd_scan(args) -> int:
+    manager = get_manager(args, many_queries=not args.env)
+    if manager is None:
+        return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+
+    if args.env:
+        env_info = manager.get_env_inventory(args.env)
+        if env_info is None:
+            return fail(f"环境 {args.env} 不存在或无法获取", args.pretty)
+        env_data = {args.env: env_info}
+        saved = args.no_save or get_controller().save_environment(args.env, env_info)
+    else:
+        env_data = manager.get_all_envs_and_packages()
+        if not env_data:
+            return fail("无法获取环境信息", args.pretty)
+        saved = args.no_save or get_controller().save_environments(env_data)
+
+    emit({
+        "saved": bool(saved) and not args.no_save,
+        "environments": {
+            name: {"path": info[0], "package_count": len(info[1][0]) if info[1] else 0}
+            for name, info in env_data.items()
+        },
+    }, args.pretty)
+    return 0 if saved else 1
+
+
+# 查找包
+def cmd_query(args) -> int:
+    controller = get_controller()
+    if args.env:
+        rows = controller.get_packages_by_env(args.env)
+        if rows is not None:
+            rows = [row for row in rows if row["package_name"] == args.package or args.package == "*"]
+    else:
+        rows = controller.find_packages(args.package, like=args.like)
+    if rows is None:
+        return fail("查询数据库失败", args.pretty)
+    emit(rows, args.pretty)
+    return 0
+
+
+# 比较两个环境
+def cmd_diff(args) -> int:
+    controller = get_controller()
+    rows_a = controller.get_packages_by_env(args.env_a)
+    rows_b = controller.get_packages_by_env(args.env_b)
+    if rows_a is None or rows_b is None:
+        return fail("查询数据库失败", args.pretty)
+
+    versions_a = {row["package_name"]: row["version"] for row in rows_a}
+    versions_b = {row["package_name"]: row["version"] for row in rows_b}
+    emit({
+        "only_in_" + args.env_a: {name: versions_a[name] for name in sorted(versions_a.keys() - versions_b.keys())},
+        "only_in_" + args.env_b: {name: versions_b[name] for name in sorted(versions_b.keys() - versions_a.keys())},
+        "changed": {
+            name: {args.env_a: versions_a[name], args.env_b: versions_b[name]}
+            for name in sorted(versions_a.keys() & versions_b.keys())
+            if versions_a[name] != versions_b[name]
+        },
+    }, args.pretty)
+    return 0
+
+
+# 安装包
+def cmd_install(args) -> int:
+    manager = get_manager(args)
+    if manager is None:
+        return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+
+    success = manager.install_package(args.env, args.package, args.version)
+    timing = manager.executor.last_timing()
+    result = {"success": success, "timing": timing}
+    if success:
+        # 只刷新这一个环境的数据库记录
+        env_info = manager.get_env_inventory(args.env)
+        result["saved"] = bool(env_info) and get_controller().save_environment(args.env, env_info)
+    emit(result, args.pretty)
+    return 0 if success else 1
+
+
+# 导出全部环境信息
+def cmd_export(args) -> int:
+    env_data = get_controller().load_environments()
+    if env_data is None:
+        return fail("无法从数据库读取环境信息", args.pretty)
+
+    data = {name: {"path": info[0], "packages": packages_to_rows(info[1])} for name, info in env_data.items()}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str, indent=2 if args.pretty else None)
+        emit({"output": args.output, "environments": len(data)}, args.pretty)
+    else:
+        emit(data, args.pretty)
+    return 0
+
+
+# 查询变更历史
+def cmd_history(args) -> int:
+    controller = get_controller()
+    if args.compact is not None:
+        deleted = controller.compact_history(args.compact)
+        emit({"deleted": deleted}, args.pretty)
+        return 0 if deleted >= 0 else 1
+
+    if args.at:
+        if not args.env:
+            return fail("--at 需要同时指定 --env", args.pretty)
+        state = controller.get_env_state_at(args.env, args.at)
+        if state is None:
+            return fail("查询数据库失败", args.pretty)
+        emit({"env_name": args.env, "at": args.at, "packages": state}, args.pretty)
+        return 0
+
+    rows = controller.get_package_history(args.package, args.env, args.since, args.until, args.limit)
+    if rows is None:
+        return fail("查询数据库失败", args.pretty)
+    emit(rows, args.pretty)
+    return 0
+
+
+# 跨主机查询
+def cmd_fleet(args) -> int:
+    controller = get_controller(args.db_host)
+    if args.fleet_command == "hosts":
+        rows = controller.list_hosts()
+    elif args.fleet_command == "envs":
+        rows = controller.fleet_find_envs(args.env, args.python)
+    else:
+        rows = controller.fleet_find_packages(args.package, args.version)
+    if rows is None:
+        return fail("查询数据库失败", args.pretty)
+    emit(rows, args.pretty)
+    return 0
+
+
+# 校验环境文件
+def cmd_verify(args) -> int:
+    from integrityVerifier import verify_envs
+    manager = get_manager(args)
+    if manager is None:
+        return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+    envs = manager.get_conda_envs()
+    if not envs:
+        return fail("无法获取环境列表", args.pretty)
+
+    env_paths = dict(zip(envs[0], envs[1]))
+    if args.env:
+        if args.env not in env_paths:
+            return fail(f"环境 {args.env} 不存在", args.pretty)
+        env_paths = {args.env: env_paths[args.env]}
+    reports = verify_envs(env_paths, workers=args.workers, use_cache=not args.no_cache)
+    emit(reports, args.pretty)
+    return 0 if all(not report["packages"] for report in reports.values()) else 2
+
+
+# 过期包报告
+def cmd_outdated(args) -> int:
+    from repodataIndex import RepodataIndex
+    from outdatedReport import build_report, export_report
+    conda_path = args.conda_path or load_saved_conda_path()
+    if not conda_path:
+        return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+
+    if args.live:
+        env_data = get_manager(args, many_queries=True).get_all_envs_and_packages()
+    else:
+        env_data = get_controller().load_environments()
+    if not env_data:
+        return fail("无法获取环境信息", args.pretty)
+
+    index = RepodataIndex(conda_path)
+    index.refresh()
+    report = build_report(env_data, index, args.policy)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            f.write(export_report(report, args.format))
+        emit({"output": args.output, "summary": report["summary"]}, args.pretty)
+    elif args.format == "csv":
+        sys.stdout.write(export_report(report, "csv"))
+    else:
+        emit(report, args.pretty)
+    return 0
+
+
+# 环境回收报告
+def cmd_gc(args) -> int:
+    from gcReport import build_report, remove_envs
+    if args.live or args.remove or args.remove_all:
+        manager = get_manager(args, many_queries=args.live)
+        if manager is None:
+            return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+    if args.live:
+        env_data = manager.get_all_envs_and_packages()
+    else:
+        env_data = get_controller().load_environments()
+    if not env_data:
+        return fail("无法获取环境信息", args.pretty)
+
+    report = build_report(env_data, args.stale_days, args.similarity, workers=args.workers)
+    targets = list(args.remove or [])
+    if args.remove_all:
+        targets += [item["env_name"] for item in report["reclaim"] if item["env_name"] not in targets]
+    if not targets:
+        emit({"summary": report["summary"], "reclaim": report["reclaim"], "duplicates": report["duplicates"]},
+             args.pretty)
+        return 0
+
+    # 只删除回收列表中的环境，防止误删正在使用的环境
+    candidates = {item["env_name"] for item in report["reclaim"]}
+    unknown = [name for name in targets if name not in candidates]
+    if unknown:
+        return fail(f"以下环境不在回收列表中: {', '.join(unknown)}", args.pretty)
+    results = remove_envs(manager, targets, workers=args.workers or 4)
+    removed = [name for name, ok in results.items() if ok]
+    # 数据库中删除已删除环境的记录
+    saved = not removed or get_controller().apply_delta({}, removed, scope="gc")
+    emit({"removed": removed, "failed": [name for name, ok in results.items() if not ok], "saved": bool(saved),
+          "scheduler": manager.executor.scheduler.metrics()}, args.pretty)
+    return 0 if len(removed) == len(targets) else 1
+
+
+# 包使用情况统计
+def cmd_usage(args) -> int:
+    import importUsage
+
+    if args.usage_command in ("install", "uninstall"):
+        manager = get_manager(args)
+        if manager is None:
+            return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+        envs = manager.get_conda_envs()
+        if not envs:
+            return fail("无法获取环境列表", args.pretty)
+        env_paths = dict(zip(envs[0], envs[1]))
+        names = list(env_paths) if args.all else args.envs
+        unknown = [name for name in names if name not in env_paths]
+        if unknown or not names:
+            return fail(f"环境不存在: {', '.join(unknown)}" if unknown else "请指定环境或使用 --all", args.pretty)
+        if args.usage_command == "install":
+            results = {name: importUsage.install_hook(env_paths[name]) for name in names}
+        else:
+            results = {name: importUsage.uninstall_hook(env_paths[name]) for name in names}
+        emit(results, args.pretty)
+        return 0 if all(results.values()) else 1
+
+    controller = get_controller()
+    if args.usage_command == "collect":
+        rows = controller.list_environments()
+        if rows is None:
+            return fail("无法从数据库读取环境列表", args.pretty)
+        result = importUsage.aggregate(controller, {row['env_name']: row['path'] for row in rows})
+        emit(result, args.pretty)
+        return 0 if result["saved"] else 1
+
+    env_data = controller.load_environments()
+    usage = controller.get_module_usage(args.env)
+    if not env_data or usage is None:
+        return fail("无法获取环境信息", args.pretty)
+    if args.env:
+        if args.env not in env_data:
+            return fail(f"环境 {args.env} 不存在", args.pretty)
+        env_data = {args.env: env_data[args.env]}
+    emit(importUsage.unused_report(env_data, usage), args.pretty)
+    return 0
+
+
+# 导出/导入清单快照
+def cmd_snapshot(args) -> int:
+    import inventorySnapshot
+
+    if args.snapshot_command == "export":
+        if args.live:
+            import socket
+            manager = get_manager(args, many_queries=True)
+            if manager is None:
+                return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+            env_data = manager.get_all_envs_and_packages()
+            if not env_data:
+                return fail("无法获取环境信息", args.pretty)
+            row_chunks = inventorySnapshot.rows_from_env_data(env_data, socket.gethostname())
+        else:
+            row_chunks = inventorySnapshot.rows_from_database(get_controller(args.db_host), args.all_hosts)
+        try:
+            rows = inventorySnapshot.write_snapshot(args.file, row_chunks, args.format)
+        except (RuntimeError, OSError) as e:
+            return fail(str(e), args.pretty)
+        emit({"output": args.file, "format": args.format or inventorySnapshot.format_of(args.file), "rows": rows},
+             args.pretty)
+        return 0
+
+    from mysqlcontroller import MySQLController, LOCAL_HOST_NAME, ensure_schema
+    if ensure_schema(host=args.db_host) is None:
+        return fail("无法连接数据库或创建表", args.pretty)
+    try:
+        imported = inventorySnapshot.import_snapshot(
+            args.file,
+            lambda host_name: MySQLController(host=args.db_host, host_name=host_name),
+            LOCAL_HOST_NAME if args.as_local else None,
+        )
+    except (RuntimeError, ValueError, OSError) as e:
+        return fail(str(e), args.pretty)
+    emit({"input": args.file, "imported": imported}, args.pretty)
+    return 0
+
+
+# 查找环境路径
+def find_env_path(manager, env_name: str):
+    envs = manager.get_conda_envs()
+    if not envs:
+        return None
+    for name, path in zip(envs[0], envs[1]):
+        if name == env_name or path == env_name:
+            return path
+    return None
+
+
+# 导出锁定文件
+def cmd_lock(args) -> int:
+    from envLockfile import export_explicit, export_environment_yml
+    manager = get_manager(args)
+    if manager is None:
+        return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+    env_path = find_env_path(manager, args.env)
+    if env_path is None:
+        return fail(f"环境 {args.env} 不存在", args.pretty)
+
+    skipped = []
+    if args.yml:
+        text = export_environment_yml(env_path, args.env, with_builds=not args.no_builds)
+    else:
+        text, skipped = export_explicit(env_path, "sha256" if args.sha256 else "md5")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        emit({"output": args.output, "skipped": skipped}, args.pretty)
+    else:
+        sys.stdout.write(text)
+        if skipped:
+            # 标准输出是锁定文件本身，缺少下载地址的包写到标准错误
+            print(f"缺少下载地址，未写入锁定文件的包: {', '.join(skipped)}", file=sys.stderr)
+    return 0 if not skipped else 2
+
+
+# 用锁定文件重建环境
+def cmd_recreate(args) -> int:
+    manager = get_manager(args)
+    if manager is None:
+        return fail("未找到conda安装路径，请使用 --conda-path 指定", args.pretty)
+    success = manager.create_env_from_lockfile(args.env, args.lockfile)
+    result = {"success": success, "timing": manager.executor.last_timing()}
+    if success:
+        env_info = manager.get_env_inventory(args.env)
+        result["saved"] = bool(env_info) and get_controller().save_environment(args.env, env_info)
+    emit(result, args.pretty)
+    return 0 if success else 1
+
+
+# 解析时间参数
+def parse_time(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无法解析时间: {value}（格式如 2024-05-01 或 2024-05-01 08:00）")
+
+
+# 构建参数解析器
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Miniconda 环境管理器（命令行版，输出 JSON）")
+    parser.add_argument("--conda-path", help="conda的安装根目录，默认读取图形界面保存的 conda_path.txt")
+    parser.add_argument("--pretty", action="store_true", help="格式化输出 JSON")
+    parser.add_argument("--trace", metavar="FILE", help="记录耗时追踪并导出为 Chrome trace JSON")
+    parser.add_argument("--api", action="store_true",
+                        help="所有子命令都使用常驻的 conda 查询辅助进程（默认只有全量扫描类命令使用）")
+    parser.add_argument("--no-api", action="store_true", help="不使用常驻的 conda 查询辅助进程，每次查询都运行 conda 命令")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="列出环境")
+    p.add_argument("--live", action="store_true", help="直接调用 conda，而不是读取数据库")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("scan", help="重新扫描环境并写入数据库")
+    p.add_argument("--env", help="只扫描指定环境")
+    p.add_argument("--no-save", action="store_true", help="只输出扫描结果，不写入数据库")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("query", help="查找包")
+    p.add_argument("package", help="包名称（在 --env 下可用 * 列出全部包）")
+    p.add_argument("--env", help="只在指定环境中查找")
+    p.add_argument("--like", action="store_true", help="按 SQL LIKE 模式匹配，如 num%%")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("diff", help="比较两个环境的包")
+    p.add_argument("env_a")
+    p.add_argument("env_b")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("install", help="在环境中安装包")
+    p.add_argument("env")
+    p.add_argument("package")
+    p.add_argument("--version")
+    p.add_argument("--backend", choices=SOLVER_BACKENDS, help="执行后端，默认为 conda")
+    p.set_defaults(func=cmd_install)
+
+    p = sub.add_parser("export", help="导出数据库中的全部环境信息")
+    p.add_argument("-o", "--output", help="输出文件，默认输出到标准输出")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("history", help="查询包的变更历史")
+    p.add_argument("--env", help="环境名称")
+    p.add_argument("--package", help="包名称")
+    p.add_argument("--at", type=parse_time, help="还原环境在该时间点的状态（需配合 --env）")
+    p.add_argument("--since", type=parse_time)
+    p.add_argument("--until", type=parse_time)
+    p.add_argument("--limit", type=int, default=1000)
+    p.add_argument("--compact", type=int, metavar="DAYS", help="压缩历史，只保留最近 DAYS 天的完整记录")
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("verify", help="按 conda-meta 中的 sha256/大小校验环境文件")
+    p.add_argument("--env", help="只校验指定环境")
+    p.add_argument("--workers", type=int, help="计算哈希的进程数，默认为 CPU 核数")
+    p.add_argument("--no-cache", action="store_true", help="忽略按 mtime 缓存的校验结果，全部重新计算")
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("outdated", help="所有环境中落后于本地可用版本索引的包")
+    p.add_argument("--live", action="store_true", help="直接调用 conda 获取包列表，而不是读取数据库")
+    p.add_argument("--policy", choices=("latest", "same-major"), default="latest",
+                   help="与最新版本比较，或只与主版本号相同的最新版本比较")
+    p.add_argument("--format", choices=("json", "csv"), default="json")
+    p.add_argument("-o", "--output", help="输出文件，默认输出到标准输出")
+    p.set_defaults(func=cmd_outdated)
+
+    p = sub.add_parser("gc", help="可回收的环境：长期不用、与其他环境近似重复或已损坏，按可释放的空间排序")
+    p.add_argument("--live", action="store_true", help="直接调用 conda 获取包列表，而不是读取数据库")
+    p.add_argument("--stale-days", type=float, default=90, help="超过多少天没有活动视为长期不用")
+    p.add_argument("--similarity", type=float, default=0.9, help="包集合相似度不低于该值视为近似重复")
+    p.add_argument("--remove", nargs="+", metavar="ENV", help="删除回收列表中的指定环境")
+    p.add_argument("--remove-all", action="store_true", help="删除回收列表中的全部环境")
+    p.add_argument("--workers", type=int, help="统计大小和删除环境的并发数")
+    p.set_defaults(func=cmd_gc)
+
+    p = sub.add_parser("usage", help="统计各环境实际导入的模块，找出装了却从未使用的包")
+    usage = p.add_subparsers(dest="usage_command", required=True)
+    for name, help_text in (("install", "在环境的 site-packages 中安装导入统计钩子（.pth，不修改 sitecustomize）"),
+                            ("uninstall", "删除导入统计钩子")):
+        q = usage.add_parser(name, help=help_text)
+        q.add_argument("envs", nargs="*", metavar="ENV")
+        q.add_argument("--all", action="store_true", help="所有环境")
+    usage.add_parser("collect", help="把导入日志的新增部分汇总到数据库")
+    q = usage.add_parser("report", help="每个环境中装了但从未被导入的包")
+    q.add_argument("--env", help="只报告指定环境")
+    p.set_defaults(func=cmd_usage)
+
+    p = sub.add_parser("lock", help="从 conda-meta 生成环境的锁定文件（不调用 conda）")
+    p.add_argument("env")
+    p.add_argument("-o", "--output", help="输出文件，默认输出到标准输出")
+    p.add_argument("--yml", action="store_true", help="生成 environment.yml，而不是显式锁定文件")
+    p.add_argument("--no-builds", action="store_true", help="environment.yml 中不写 build 字符串")
+    p.add_argument("--sha256", action="store_true", help="显式锁定文件使用 sha256 而不是 md5")
+    p.set_defaults(func=cmd_lock)
+
+    p = sub.add_parser("recreate", help="用锁定文件创建环境")
+    p.add_argument("env", help="新环境名称")
+    p.add_argument("lockfile")
+    p.add_argument("--backend", choices=SOLVER_BACKENDS, help="执行后端，默认为 conda")
+    p.set_defaults(func=cmd_recreate)
+
+    p = sub.add_parser("snapshot", help="按列导出/导入清单快照（Parquet、Arrow IPC 或内置二进制格式）")
+    p.add_argument("--db-host", default="localhost", help="数据库地址")
+    snapshot = p.add_subparsers(dest="snapshot_command", required=True)
+    q = snapshot.add_parser("export", help="导出快照，格式按扩展名确定：.parquet / .arrow / 其他为内置格式")
+    q.add_argument("file")
+    q.add_argument("--format", choices=("parquet", "arrow", "binary"), help="覆盖按扩展名确定的格式")
+    q.add_argument("--all-hosts", action="store_true", help="导出数据库中所有机器的数据")
+    q.add_argument("--live", action="store_true", help="直接调用 conda 获取清单（包含每个包的大小）")
+    q = snapshot.add_parser("import", help="把快照导入数据库")
+    q.add_argument("file")
+    q.add_argument("--as-local", action="store_true", help="全部导入到本机名下（用于新机器首次启动）")
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser("fleet", help="跨主机查询（数据由 collector.py 收集）")
+    p.add_argument("--db-host", default="localhost", help="共享数据库地址")
+    fleet = p.add_subparsers(dest="fleet_command", required=True)
+    fleet.add_parser("hosts", help="列出上报过的主机")
+    q = fleet.add_parser("envs", help="查找环境")
+    q.add_argument("--env", help="环境名称")
+    q.add_argument("--python", help="Python 版本（前缀匹配，如 3.9）")
+    q = fleet.add_parser("packages", help="查找安装了某个包的环境")
+    q.add_argument("package")
+    q.add_argument("--version", help="版本（前缀匹配）")
+    p.set_defaults(func=cmd_fleet)
+
+    return parser
+
+
+# 命令行入口
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        tracing.enable()
+    try:
+        return args.func(args)
+    finally:
+        if args.trace:
+            tracing.export_chrome_trace(args.trace)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
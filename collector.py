@@ -0,0 +1,311 @@
+# collector.py
+"""
+多主机清单收集：每台机器运行一个收集器，只把发生变化的环境（增量）推送到共享数据库，
+数据库中的每一行都带有 host_name，便于做跨机器的查询（见 cli.py fleet）
+
+变化检测分两层：
+    1. 先比较每个环境 conda-meta 和 site-packages 目录的 mtime（只 stat，不调用 conda list）
+    2. 签名变化的环境才重新获取包列表，再按内容指纹确认确实有变化后才推送
+
+推送方式:
+    直接写共享数据库       python collector.py run --db-host 10.0.0.5 [--interval 600]
+    通过 HTTP 汇总服务     python collector.py run --url http://10.0.0.5:8765/delta --token SECRET
+    启动 HTTP 汇总服务     python collector.py serve --port 8765 --token SECRET [--bind 0.0.0.0] [--db-host localhost]
+
+汇总服务默认只监听 127.0.0.1；推送必须在 X-Collector-Token 请求头中带上与服务端相同的共享令牌
+（--token 或环境变量 CONDA_COLLECTOR_TOKEN），否则拒绝写入
+
+已推送的状态保存在 conda_path.txt 同目录下的 conda_collector_state.json，重启后仍然只推送增量
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import socket
+import sys
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from condaEnvManager import CondaEnvManager, conda_path_file, load_saved_conda_path, load_saved_conda_paths
+from sitePackagesScanner import site_packages_dirs
+
+# 共享令牌的请求头和环境变量
+TOKEN_HEADER = "X-Collector-Token"
+TOKEN_ENV = "CONDA_COLLECTOR_TOKEN"
+
+# 状态文件版本，格式变化时丢弃旧状态重新全量推送
+STATE_VERSION = 1
+
+
+# 状态文件路径
+def state_file() -> str:
+    return os.path.join(os.path.dirname(conda_path_file()), 'conda_collector_state.json')
+
+
+# 读取已推送的状态
+def load_state(path: str) -> dict:
+    """
+    返回值:
+        dict: {"target": 推送目标, "envs": {env_name: {"signature": [...], "fingerprint": str}}}
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "target": None, "envs": {}}
+
+
+# 保存状态
+def save_state(path: str, state: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+# 环境目录签名
+def env_signature(env_path: str) -> list:
+    """
+    conda-meta 和 site-packages 目录的 mtime，安装/卸载包都会改变其中之一
+
+    返回值:
+        list: [path, conda-meta mtime, site-packages mtime...]，目录不存在时对应值为 None
+    """
+    signature = [env_path]
+    for directory in [os.path.join(env_path, 'conda-meta')] + site_packages_dirs(env_path):
+        try:
+            signature.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return signature
+
+
+# 环境内容指纹
+def env_fingerprint(env_info: list) -> str:
+    """
+    参数:
+        env_info: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]
+    """
+    digest = hashlib.sha1(env_info[0].encode('utf-8'))
+    packages = env_info[1] if len(env_info) > 1 and env_info[1] else [[], [], [], []]
+    for row in sorted(zip(*packages)):
+        digest.update("\0".join(row).encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+# 计算增量
+def collect_delta(manager: CondaEnvManager, state: dict, full: bool = False):
+    """
+    只对签名变化的环境调用 conda list，返回需要推送的增量
+
+    参数:
+        manager: conda环境管理器
+        state: 上一次推送后的状态（会被更新为本次的状态，推送成功后再保存）
+        full: 忽略已保存的状态，全部重新获取
+
+    返回值:
+        tuple: (changed, removed)，changed 为 {env_name: env_info}，removed 为环境名称列表；
+        获取环境列表失败时返回 None
+    """
+    envs = manager.get_conda_envs()
+    if not envs:
+        return None
+
+    known = {} if full else state["envs"]
+    current = {}
+    changed = {}
+    for env_name, env_path in zip(envs[0], envs[1]):
+        signature = env_signature(env_path)
+        entry = known.get(env_name)
+        if entry is not None and entry["signature"] == signature:
+            current[env_name] = entry
+            continue
+
+        packages = manager.get_packages_in_env(env_name, env_path)
+        if packages is None:
+            # 没获取到（如 conda 被占用）：保留上次的状态，不推送，下次收集时再试
+            if env_name in state["envs"]:
+                current[env_name] = state["envs"][env_name]
+            continue
+        env_info = [env_path, packages]
+        fingerprint = env_fingerprint(env_info)
+        current[env_name] = {"signature": signature, "fingerprint": fingerprint}
+        # 目录被碰过但包没变（如只写了 history），不用推送
+        if entry is None or entry["fingerprint"] != fingerprint:
+            changed[env_name] = env_info
+
+    removed = [env_name for env_name in state["envs"] if env_name not in current]
+    state["envs"] = current
+    return changed, removed
+
+
+# 直接写共享数据库
+class DatabaseSink:
+    def __init__(self, db_host: str = 'localhost', database: str = 'condaControlor', host_name: str = None):
+        from mysqlcontroller import MySQLController, ensure_schema
+        ensure_schema(database, db_host)
+        self.controller = MySQLController(host=db_host, database=database, host_name=host_name)
+        self.target = f"mysql://{db_host}/{database}"
+
+    # 推送增量
+    def push(self, changed: dict, removed: list) -> bool:
+        return self.controller.apply_delta(changed, removed, scope="collector")
+
+
+# 通过 HTTP 推送到汇总服务
+class HttpSink:
+    def __init__(self, url: str, host_name: str = None, timeout: float = 30, token: str = None):
+        # 通过 HTTP 推送的机器不需要安装数据库驱动，这里不导入 mysqlcontroller
+        self.url = url
+        self.host_name = host_name or socket.gethostname()
+        self.token = token or ""
+        self.timeout = timeout
+        self.target = url
+
+    # 推送增量
+    def push(self, changed: dict, removed: list) -> bool:
+        body = json.dumps({"host_name": self.host_name, "changed": changed, "removed": removed}).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body,
+                                         headers={"Content-Type": "application/json", TOKEN_HEADER: self.token})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status == 200
+        except Exception as e:
+            print(f"推送增量到 {self.url} 时出错: {e}")
+            return False
+
+
+# 收集一次并推送
+def collect_once(manager: CondaEnvManager, sink, state_path: str, full: bool = False) -> dict:
+    """
+    返回值:
+        dict: 本次推送的统计信息 {"changed": [...], "removed": [...], "pushed": bool, "seconds": float}
+    """
+    start = time.perf_counter()
+    state = load_state(state_path)
+    # 推送目标变了（换了数据库或汇总服务），需要全量推送
+    if state.get("target") != sink.target:
+        full = True
+    delta = collect_delta(manager, state, full)
+    if delta is None:
+        return {"changed": [], "removed": [], "pushed": False, "seconds": time.perf_counter() - start}
+
+    changed, removed = delta
+    pushed = sink.push(changed, removed)
+    if pushed:
+        state["target"] = sink.target
+        save_state(state_path, state)
+    return {
+        "changed": sorted(changed),
+        "removed": sorted(removed),
+        "pushed": pushed,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# HTTP 汇总服务
+def make_handler(db_host: str, database: str, token: str):
+    """
+    参数:
+        token: 共享令牌，请求头中的令牌不一致时拒绝写入（不能为空）
+    """
+    from mysqlcontroller import MySQLController
+    if not token:
+        raise ValueError("汇总服务必须设置共享令牌")
+    expected = token.encode('utf-8')
+
+    class DeltaHandler(BaseHTTPRequestHandler):
+        # 接收一台主机推送的增量
+        def do_POST(self):
+            if self.path.rstrip('/') != '/delta':
+                self.send_error(404)
+                return
+            if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode('utf-8'), expected):
+                self.send_error(403, "invalid token")
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length))
+                host_name = payload["host_name"]
+            except (ValueError, KeyError):
+                self.send_error(400, "invalid payload")
+                return
+
+            controller = MySQLController(host=db_host, database=database, host_name=host_name)
+            if controller.apply_delta(payload.get("changed") or {}, payload.get("removed") or [], scope="collector"):
+                self.send_response(200)
+                self.end_headers()
+            else:
+                self.send_error(500, "database error")
+
+    return DeltaHandler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="多主机 conda 环境清单收集器")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="收集本机环境并推送增量")
+    p.add_argument("--conda-path", help="conda的安装根目录，默认读取图形界面保存的 conda_path.txt")
+    p.add_argument("--db-host", default="localhost", help="共享数据库地址")
+    p.add_argument("--database", default="condaControlor")
+    p.add_argument("--url", help="HTTP 汇总服务地址，指定后不直接连接数据库")
+    p.add_argument("--host-name", help="上报的主机名，默认本机名")
+    p.add_argument("--interval", type=float, default=0, help="循环收集的间隔（秒），0 表示只收集一次")
+    p.add_argument("--full", action="store_true", help="忽略已保存的状态，全量推送一次")
+    p.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"汇总服务的共享令牌，默认读取环境变量 {TOKEN_ENV}")
+
+    p = sub.add_parser("serve", help="启动 HTTP 汇总服务，把各主机推送的增量写入数据库")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--bind", default="127.0.0.1", help="监听地址，需要接收其他机器的推送时改为 0.0.0.0")
+    p.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"共享令牌（必需），默认读取环境变量 {TOKEN_ENV}")
+    p.add_argument("--db-host", default="localhost")
+    p.add_argument("--database", default="condaControlor")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if not args.token:
+            print(f"请用 --token 或环境变量 {TOKEN_ENV} 设置共享令牌，推送方需使用相同的令牌")
+            return 1
+        from mysqlcontroller import ensure_schema
+        if ensure_schema(args.database, args.db_host) is None:
+            print("无法连接数据库或创建表")
+            return 1
+        server = ThreadingHTTPServer((args.bind, args.port), make_handler(args.db_host, args.database, args.token))
+        print(f"汇总服务已启动: http://{args.bind}:{args.port}/delta")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    conda_path = args.conda_path or load_saved_conda_path()
+    if not conda_path:
+        print("未找到conda安装路径，请使用 --conda-path 指定")
+        return 1
+    # 未指定 --conda-path 时收集 conda_path.txt 中配置的所有根目录
+    roots = [args.conda_path] if args.conda_path else load_saved_conda_paths()
+    manager = CondaEnvManager(conda_path, roots=roots)
+    if args.url:
+        sink = HttpSink(args.url, args.host_name, token=args.token)
+    else:
+        sink = DatabaseSink(args.db_host, args.database, args.host_name)
+
+    while True:
+        result = collect_once(manager, sink, state_file(), args.full)
+        print(json.dumps(result, ensure_ascii=False))
+        if args.interval <= 0:
+            return 0 if result["pushed"] else 1
+        args.full = False
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
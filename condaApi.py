@@ -0,0 +1,208 @@
+# condaApi.py
+"""
+常驻的 conda 查询辅助进程：用 conda 自带的 Python 运行本文件，进程内导入 conda（conda.api / PrefixData），
+通过标准输入输出上的 JSON-RPC（每行一个 JSON）回答查询，省去每次启动 conda 解释器的时间
+
+    请求: {"jsonrpc": "2.0", "id": 1, "method": "list_packages", "params": {"prefix": "..."}}
+    响应: {"jsonrpc": "2.0", "id": 1, "result": [...]} 或 {"jsonrpc": "2.0", "id": 1, "error": {"message": "..."}}
+
+支持的方法:
+    ping                        检查进程是否存活
+    env_list                    [{"name": 名称或 None, "path": 路径}]，与 conda env list 一致
+    list_packages(prefix)       [[name, version, build, channel]]，只包含 conda 包（pip 包由 site-packages 扫描补全）
+
+客户端 CondaApiClient 由 CondaEnvManager 使用：辅助进程退出、超时或返回错误时返回 None，调用方退回 subprocess
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+# 单次请求的超时时间（秒）
+REQUEST_TIMEOUT = 30
+# 辅助进程退出后，至少间隔多久才重新启动（秒），避免反复启动失败拖慢每次查询
+RESTART_INTERVAL = 60
+
+
+# === 辅助进程（在 conda 的 Python 中运行） ===
+
+def _serve():
+    from conda.base.context import context
+    from conda.core.envs_manager import list_all_known_prefixes
+    from conda.core.prefix_data import PrefixData
+
+    loaded = {}     # prefix -> conda-meta 的 mtime，未变化时直接使用 PrefixData 的缓存
+
+    def env_list(params):
+        envs_dirs = {os.path.normcase(os.path.abspath(d)) for d in context.envs_dirs}
+        root = os.path.normcase(os.path.abspath(context.root_prefix))
+        envs = []
+        for prefix in list_all_known_prefixes():
+            normalized = os.path.normcase(os.path.abspath(prefix))
+            if normalized == root:
+                name = 'base'
+            elif os.path.dirname(normalized) in envs_dirs:
+                name = os.path.basename(prefix)
+            else:
+                name = None     # 不在 envs_dirs 中的环境没有名字
+            envs.append({"name": name, "path": prefix})
+        return envs
+
+    def list_packages(params):
+        prefix = params["prefix"]
+        mtime = os.stat(os.path.join(prefix, 'conda-meta')).st_mtime_ns
+        # 只返回 conda-meta 中的记录，pip 安装的包由调用方扫描 site-packages 补充
+        prefix_data = PrefixData(prefix, pip_interop_enabled=False)
+        if loaded.get(prefix) != mtime:
+            prefix_data.reload()
+            loaded[prefix] = mtime
+        return [
+            [record.name, record.version, record.build, record.channel.canonical_name]
+            for record in sorted(prefix_data.iter_records(), key=lambda r: r.name)
+        ]
+
+    methods = {"ping": lambda params: "pong", "env_list": env_list, "list_packages": list_packages}
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            result = methods[request["method"]](request.get("params") or {})
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except Exception as e:
+            response = {"jsonrpc": "2.0", "id": request_id, "error": {"message": f"{type(e).__name__}: {e}"}}
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+# === 客户端 ===
+
+# conda 自带的 Python
+def conda_python(conda_path: str) -> str:
+    if os.name == 'nt':
+        return os.path.join(conda_path, 'python.exe')
+    return os.path.join(conda_path, 'bin', 'python')
+
+
+class CondaApiClient:
+    def __init__(self, conda_path: str, timeout: float = REQUEST_TIMEOUT):
+        """
+        参数:
+            conda_path: conda的安装根目录（用其中的 Python 运行辅助进程）
+            timeout: 单次请求的超时时间（秒）
+        """
+        self.conda_path = conda_path
+        self.timeout = timeout
+        self.process = None
+        self._responses = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._last_start = 0
+
+    # 启动辅助进程
+    def _start(self) -> bool:
+        if time.monotonic() - self._last_start < RESTART_INTERVAL and self._last_start:
+            return False
+        self._last_start = time.monotonic()
+        python = conda_python(self.conda_path)
+        if not os.path.exists(python):
+            return False
+        try:
+            self.process = subprocess.Popen(
+                [python, os.path.abspath(__file__)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                text=True, encoding='utf-8', bufsize=1,
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+            )
+        except OSError as e:
+            print(f"启动 conda 查询辅助进程失败: {e}")
+            self.process = None
+            return False
+
+        # 读取线程把每行响应放入队列，请求方带超时等待（Windows 管道不支持 select）
+        self._responses = queue.Queue()
+        threading.Thread(target=self._read_responses, args=(self.process, self._responses), daemon=True).start()
+        return True
+
+    # 读取响应（在读取线程中运行）
+    @staticmethod
+    def _read_responses(process, responses):
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)     # 进程已退出
+
+    # 结束辅助进程
+    def close(self):
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        if self.process is not None:
+            try:
+                self.process.kill()
+                self.process.wait(timeout=5)
+            except Exception:
+                pass
+        self.process = None
+
+    # 发送请求
+    def call(self, method: str, params: dict = None):
+        """
+        参数:
+            method: 方法名
+            params: 参数
+
+        返回值:
+            请求结果；辅助进程不可用、超时（包括等待前面的请求超过 timeout）或返回错误时返回 None（调用方应退回 subprocess）
+        """
+        from tracing import span
+        # 前面的请求很慢时不一直等下去，超时后让调用方改用命令行
+        if not self._lock.acquire(timeout=self.timeout):
+            print(f"conda 查询辅助进程忙，改用命令行: {method}")
+            return None
+        try:
+            with span("conda.api", method=method) as s:
+                if self.process is None or self.process.poll() is not None:
+                    self.process = None
+                    if not self._start():
+                        s.set(fallback=True)
+                        return None
+
+                self._next_id += 1
+                request_id = self._next_id
+                try:
+                    self.process.stdin.write(json.dumps({
+                        "jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}
+                    }) + "\n")
+                    self.process.stdin.flush()
+                    deadline = time.monotonic() + self.timeout
+                    while True:
+                        line = self._responses.get(timeout=max(0.0, deadline - time.monotonic()))
+                        if line is None:
+                            raise EOFError("辅助进程已退出")
+                        response = json.loads(line)
+                        if response.get("id") == request_id:
+                            break   # 丢弃之前超时请求的迟到响应
+                except (OSError, ValueError, EOFError, queue.Empty) as e:
+                    print(f"conda 查询辅助进程出错，改用命令行: {e}")
+                    self._stop()
+                    s.set(fallback=True)
+                    return None
+
+                if "error" in response:
+                    print(f"conda 查询辅助进程返回错误: {response['error'].get('message')}")
+                    s.set(fallback=True)
+                    return None
+                return response.get("result")
+        finally:
+            self._lock.release()
+
+
+if __name__ == "__main__":
+    _serve()
@@ -1,12 +1,253 @@
 import subprocess
 import os
-from PySide6.QtCore import Qt, QSize, QObject, QThread, Signal
-from PySide6.QtWidgets import (QMessageBox, QFileDialog, QApplication, QWidget, QMainWindow)
+import shutil
+import threading
+import time
+from sitePackagesScanner import merge_pip_packages
+from envLockfile import is_explicit
+from envDiscovery import discover_envs, flatten
+from tracing import span
+from condaScheduler import OperationScheduler, queue_for
+
+# 可选的求解/执行后端
+SOLVER_BACKENDS = ('conda', 'libmamba', 'mamba', 'micromamba')
+# 需要求解依赖的操作（libmamba 后端会为这些操作加上 --solver=libmamba）
+SOLVING_OPERATIONS = ('create', 'install', 'uninstall')
+
+
+# conda 命令执行器
+class CondaExecutor:
+    """
+    conda 修改类操作（创建/删除环境，安装/卸载包）的执行器
+    根据后端拼接实际命令，并记录每次操作的耗时，便于比较不同后端在自己机器上的表现
+
+    后端说明:
+        conda:      <conda_path>/Scripts/conda.exe，使用安装默认的求解器
+        libmamba:   同上，但加上 --solver=libmamba
+        mamba:      <conda_path>/Scripts/mamba.exe
+        micromamba: 独立的 micromamba 可执行文件，通过 -r 指向同一个 conda 根目录
+    """
+
+    def __init__(self, conda_path: str = None, backend: str = 'conda', executables: dict = None):
+        """
+        参数:
+            conda_path (str): conda的安装路径
+            backend (str): 全局默认后端，取值见 SOLVER_BACKENDS
+            executables (dict, optional): 手动指定各后端的可执行文件，{后端: 路径 或 命令列表}
+        """
+        if backend not in SOLVER_BACKENDS:
+            raise ValueError(f"未知的后端: {backend}")
+        self.conda_path = conda_path
+        self.backend = backend
+        self.executables = executables or {}
+        self.timings = []               # 每次操作的耗时记录列表
+        self._lock = threading.Lock()   # 多个工作线程可能共用同一个执行器
+        self.api = None                 # 常驻的 conda 查询辅助进程（condaApi.CondaApiClient），由共享执行器的管理器一起使用
+        self.roots = []                 # 所有 conda 根目录（多于一个时直接枚举文件系统发现环境），由共享执行器的管理器一起使用
+        # 命令调度：写包缓存的操作串行，只读查询并行，交互操作优先于后台刷新
+        self.scheduler = OperationScheduler()
+
+    # 获取后端对应的可执行文件
+    def executable_for(self, backend: str) -> list:
+        """
+        获取指定后端的可执行命令前缀
+
+        参数:
+            backend (str): 后端名称
+
+        返回值:
+            list: 命令前缀列表，如 ['C:/miniconda3/Scripts/conda.exe']
+        """
+        exe = self.executables.get(backend)
+        if exe is None and backend == 'libmamba':
+            exe = self.executables.get('conda')     # libmamba 只是 conda 的一个参数
+        if exe:
+            return list(exe) if isinstance(exe, (list, tuple)) else [exe]
+
+        if backend in ('conda', 'libmamba'):
+            return [conda_binary(self.conda_path, 'conda')]
+        if backend == 'mamba':
+            return [conda_binary(self.conda_path, 'mamba')]
+        # micromamba 一般是独立安装的，先找 PATH，再找 conda 根目录下
+        return [shutil.which('micromamba') or conda_binary(self.conda_path, 'micromamba')]
+
+    # 拼接命令
+    def build_command(self, operation: str, args: list, backend: str = None) -> list:
+        """
+        根据操作类型和后端拼接完整命令
+
+        参数:
+            operation (str): 操作类型（create/remove/install/uninstall）
+            args (list): 子命令及其参数，如 ['install', '-n', 'py39', 'numpy', '-y']
+            backend (str, optional): 本次操作使用的后端，默认为全局后端
+
+        返回值:
+            list: 完整的命令行参数列表
+        """
+        backend = backend or self.backend
+        if backend not in SOLVER_BACKENDS:
+            raise ValueError(f"未知的后端: {backend}")
+
+        command = self.executable_for(backend)
+        if backend == 'micromamba':
+            # micromamba 不支持 remove --all，删除环境要用 env remove
+            if operation == 'remove' and '--all' in args:
+                args = ['env', 'remove'] + [a for a in args[1:] if a != '--all']
+            command += args
+            if self.conda_path:
+                command += ['-r', self.conda_path]   # 指向同一个根目录，才能看到同样的环境
+        else:
+            command += args
+            if backend == 'libmamba' and operation in SOLVING_OPERATIONS:
+                command.append('--solver=libmamba')
+        return command
+
+    # 执行并计时
+    def execute(self, operation: str, args: list, backend: str = None, env_name: str = None) -> list:
+        """
+        执行一次修改类操作，并记录耗时（按操作类型在调度器的队列中排队，排队时间单独记录）
+
+        参数:
+            operation (str): 操作类型
+            args (list): 子命令及其参数
+            backend (str, optional): 本次操作使用的后端，默认为全局后端
+            env_name (str, optional): 操作的环境名称，仅用于记录
+
+        返回值:
+            list: 命令执行结果，包含输出结果、错误信息、返回码
+        """
+        backend = backend or self.backend
+        command = self.build_command(operation, args, backend)
+        queue = queue_for(operation)
+        with span("conda.execute", operation=operation, backend=backend, env=env_name, argv=command) as s:
+            with self.scheduler.slot(queue) as slot:
+                start = time.perf_counter()
+                try:
+                    result = subprocess.run(command, capture_output=True, text=True)
+                    output = [result.stdout, result.stderr, result.returncode]
+                except OSError as e:
+                    # 后端可执行文件不存在等情况
+                    output = ["", str(e), -1]
+                elapsed = time.perf_counter() - start
+            s.set(returncode=output[2], stdout_bytes=len(output[0]), stderr_bytes=len(output[1]),
+                  queue=queue, priority=slot["priority"], wait_ms=round(slot["wait"] * 1000, 1))
+
+        with self._lock:
+            self.timings.append({
+                'operation': operation,
+                'backend': backend,
+                'env_name': env_name,
+                'seconds': elapsed,
+                'queued_seconds': slot["wait"],
+                'returncode': output[2],
+                'finished_at': time.time(),
+            })
+        return output
+
+    # 获取最近一次操作的耗时记录
+    def last_timing(self):
+        with self._lock:
+            return dict(self.timings[-1]) if self.timings else None
+
+    # 按 操作+后端 汇总耗时
+    def timing_summary(self) -> dict:
+        """
+        按 (操作类型, 后端) 汇总耗时
+
+        返回值:
+            dict: {(operation, backend): {'count', 'total', 'mean', 'min', 'max'}}
+        """
+        summary = {}
+        with self._lock:
+            records = list(self.timings)
+        for record in records:
+            key = (record['operation'], record['backend'])
+            item = summary.setdefault(key, {'count': 0, 'total': 0.0, 'min': None, 'max': None})
+            item['count'] += 1
+            item['total'] += record['seconds']
+            item['min'] = record['seconds'] if item['min'] is None else min(item['min'], record['seconds'])
+            item['max'] = record['seconds'] if item['max'] is None else max(item['max'], record['seconds'])
+        for item in summary.values():
+            item['mean'] = item['total'] / item['count']
+        return summary
+
+
+# 获取保存conda安装路径的文件
+def conda_path_file() -> str:
+    """
+    conda安装路径保存在用户文档下的 conda_path.txt（Windows 为 %USERPROFILE%\\Documents\\conda_path.txt）
+    """
+    home = os.environ.get('USERPROFILE') or os.path.expanduser('~')
+    return os.path.join(home, 'Documents', 'conda_path.txt')
+
+
+# 读取保存的所有conda安装路径
+def load_saved_conda_paths() -> list:
+    """
+    conda_path.txt 每行一个conda根目录，第一行为主根目录（执行创建/安装等操作使用）
+
+    返回值:
+        list: 保存的conda安装路径列表，不存在则返回空列表
+    """
+    target_path = conda_path_file()
+    if os.path.exists(target_path):
+        with open(target_path, 'r') as f:
+            return [line.strip() for line in f if line.strip()]
+    return []
+
+
+# 读取保存的conda安装路径
+def load_saved_conda_path():
+    """
+    返回值:
+        str: 保存的（主）conda安装路径，不存在则返回None
+    """
+    paths = load_saved_conda_paths()
+    return paths[0] if paths else None
+
+
+# 保存conda安装路径
+def save_conda_path(conda_path: str):
+    target_path = conda_path_file()
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    with open(target_path, 'w') as f:
+        f.write(conda_path)
+
+
+# 获取conda根目录下的可执行文件路径
+def conda_binary(conda_path: str, name: str) -> str:
+    """
+    获取conda根目录下指定工具的路径（Windows 为 Scripts/<name>.exe，其他系统为 bin/<name>）
+    """
+    if os.name == 'nt':
+        return os.path.join(conda_path, "Scripts", name + ".exe")
+    return os.path.join(conda_path, "bin", name)
+
 
 class CondaEnvManager:
-    def __init__(self, conda_path: str = None):
+    def __init__(self, conda_path: str = None, backend: str = 'conda', executor: CondaExecutor = None,
+                 executables: dict = None, api=None, roots: list = None):
         # 初始化xonda路径
         self.conda_path = conda_path    # conda的安装路径
+        # 修改类操作的执行器，可以由外部传入以便多个管理器共享耗时记录
+        self.executor = executor or CondaExecutor(conda_path, backend, executables)
+        # 查询辅助进程，可用时环境列表和包列表不再每次启动 conda；不传则使用执行器上共享的客户端
+        self.api = api if api is not None else self.executor.api
+        # 所有conda根目录（第一个为主根目录），不传则使用执行器上共享的配置
+        self.roots = roots if roots is not None else self.executor.roots
+
+    # conda命令前缀（查询类命令使用，可通过执行器的 executables 替换，如基准测试中的假 conda）
+    def _conda_command(self) -> list:
+        return self.executor.executable_for('conda')
+
+    # 通过查询辅助进程查询
+    def _api_call(self, method: str, params: dict = None):
+        """
+        与命令行查询一样在 read 队列中按调用线程的优先级排队，后台预取和全量扫描不会排在交互查询前面；
+        辅助进程不可用时返回None（此时已释放队列位置，调用方再用 run_command 改用命令行）
+        """
+        with self.executor.scheduler.slot('read'):
+            return self.api.call(method, params)
 
     #运行命令通用函数
     def run_command(self, args):
@@ -19,7 +260,12 @@ class CondaEnvManager:
         返回值:
             list: 命令执行结果，包含输出结果、错误信息、返回码
         """
-        result = subprocess.run(args, capture_output=True, text=True)  #运行命令，设置捕获输出结果，设置自动解码为字符串
+        with span("conda.run_command", argv=args) as s:
+            # 查询命令只读，在 read 队列中与其他查询并行（受 CPU 并发数限制）；调用方不能已占用 read 队列
+            with self.executor.scheduler.slot('read') as slot:
+                result = subprocess.run(args, capture_output=True, text=True)  #运行命令，设置捕获输出结果，设置自动解码为字符串
+            s.set(returncode=result.returncode, stdout_bytes=len(result.stdout), stdout_lines=result.stdout.count("\n"),
+                  priority=slot["priority"], wait_ms=round(slot["wait"] * 1000, 1))
         return [result.stdout, result.stderr, result.returncode]
     
     # 获取环境列表
@@ -30,8 +276,20 @@ class CondaEnvManager:
         返回值:
             list: 嵌套列表，包含环境名称的列表和路径列表，如果执行失败则返回空列表
         """
+        # 配置了多个根目录时，并发枚举各根目录的环境（一个 conda 只能列出自己的环境）
+        if len(self.roots) > 1:
+            envs = flatten(self.discover())
+            return envs if envs[0] else []
+
+        # 优先通过查询辅助进程获取，失败时再运行 conda env list
+        if self.api is not None:
+            envs = self._api_call("env_list")
+            if envs is not None:
+                # 没有名字的环境用路径作为名字，与解析命令输出的结果一致
+                return [[env["name"] or env["path"] for env in envs], [env["path"] for env in envs]]
+
         # 执行 'conda env list' 命令获取所有环境
-        command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "env", "list"]
+        command = self._conda_command() + ["env", "list"]
         result = self.run_command(command) 
         if result[2] == 0:  #返回码为0，则表示命令执行成功
             # 解析命令输出，提取环境名称
@@ -44,35 +302,67 @@ class CondaEnvManager:
                 # 跳过空行和注释行（通常以#开头的行是注释）
                 if env.strip() and not env.startswith('#'):
                     parts = env.split()
-                    # 确保至少有两个部分（环境名和路径）
                     if len(parts) >= 2:
+                        # 环境名 [*] 路径，当前激活的环境中间会多一个 *，所以路径取最后一列
+                        envNameList.append(parts[0])
+                        envPathList.append(parts[-1])
+                    elif len(parts) == 1:
+                        # 没有名字的环境（如 vscode 创建的）只有路径，用路径作为名字
                         envNameList.append(parts[0])
-                        envPathList.append(parts[1])
+                        envPathList.append(parts[0])
             
             return [envNameList, envPathList]
         else:
             print("Failed to get environment list:", result[1])
             return []
 
+    # 按根目录发现环境
+    def discover(self) -> dict:
+        """
+        不调用 conda，并发扫描所有根目录（未配置多个根目录时只扫描 conda_path）
+
+        返回值:
+            dict: {根目录: {环境名称: 环境路径}}，同一环境只出现一次
+        """
+        roots = self.roots or ([self.conda_path] if self.conda_path else [])
+        with span("conda.discover", roots=len(roots)) as s:
+            inventory = discover_envs(roots)
+            s.set(envs=sum(len(envs) for envs in inventory.values()))
+        return inventory
+
     # 获取指定环境的包列表
-    def get_packages_in_env(self, env_name: str):
+    def get_packages_in_env(self, env_name: str, env_path: str = None):
         """
         获取指定环境的包列表
         
         参数:
             env_name (str): 环境名称
+            env_path (str, optional): 环境路径，传入时会扫描 site-packages 补全 pip 安装的包
         
         返回值:
-            list: 包列表，包含包名称、版本和构建渠道列表，如果执行失败则返回空列表
+            list: 包列表，包含包名称、版本、构建渠道和来源（conda/pip）列表
+            None: 执行失败（如 conda 被占用），与“环境中没有包”区分开，调用方不应据此覆盖已有的清单
         """
 
+        if env_path is None and any(char in env_name for char in [':', '/', '\\', '#']):
+            env_path = env_name
+
+        # 知道环境路径时优先通过查询辅助进程读取 conda-meta，失败时再运行 conda list
+        if self.api is not None and env_path:
+            records = self._api_call("list_packages", {"prefix": env_path})
+            if records is not None:
+                # 辅助进程只读 conda-meta（不开启 pip 互操作），全部是 conda 包，pip 包由 merge_pip_packages 补上
+                packages = [[r[0] for r in records], [r[1] for r in records], [r[2] for r in records],
+                            ["conda"] * len(records)]
+                return merge_pip_packages(packages, env_path)
+
         # 判断传入的是环境名称还是路径（偶尔有只能获得路径而没有名字的环境，如vscode创建的）
         if any(char in env_name for char in [':', '/', '\\', '#']):
             # 包含不允许的字符，应该是路径
-            command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "list", "-p", env_name]
+            command = self._conda_command() + ["list", "-p", env_name]
         else:
             # 环境名称
-            command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "list", "-n", env_name]
+            command = self._conda_command() + ["list", "-n", env_name]
 
         result = self.run_command(command)
         if result[2] == 0:
@@ -80,19 +370,34 @@ class CondaEnvManager:
             packages_name = []
             packages_version = []
             packages_BuildChannel = []
+            packages_source = []
 
             # 对每行内容进行处理
             for package in packages:
                 # 跳过空行和注释行（通常以#开头的行是注释）
-                if package.strip() and not package.startswith('#'):
-                    packages_name.append(package.split()[0]   )       # 包名称
-                    packages_version.append(package.split()[1])       # 包版本
-                    packages_BuildChannel.append(package.split()[2])  # 包构建渠道
+                if not package.strip() or package.startswith('#'):
+                    continue
+                # 列数并不固定：名称 版本 [构建] [渠道]，pip 包的构建/渠道为 pypi_0 pypi 或 <pip>
+                parts = package.split()
+                if len(parts) < 2:
+                    continue
+                build = parts[2] if len(parts) > 2 else ""
+                channel = parts[3] if len(parts) > 3 else ""
+                packages_name.append(parts[0])              # 包名称
+                packages_version.append(parts[1])           # 包版本
+                packages_BuildChannel.append(build)         # 包构建渠道
+                if channel == "pypi" or build in ("<pip>", "pypi_0") or channel == "<develop>":
+                    packages_source.append("pip")
+                else:
+                    packages_source.append("conda")
 
-            return [packages_name, packages_version, packages_BuildChannel]
+            packages = [packages_name, packages_version, packages_BuildChannel, packages_source]
+            if env_path:
+                packages = merge_pip_packages(packages, env_path)
+            return packages
         else:
             print(f"Failed to get packages for environment {env_name}:", result[1])
-            return []
+            return None
 
     # 获取所有环境的python版本
     def get_python_version(self):
@@ -110,8 +415,10 @@ class CondaEnvManager:
         env_python_version = {}
 
         # 获取每个环境的Python版本
-        for env in envs[0]:
-            packages = self.get_packages_in_env(env)   # 先获取包的列表
+        for env, env_path in zip(envs[0], envs[1]):
+            packages = self.get_packages_in_env(env, env_path)   # 先获取包的列表
+            if packages is None:
+                continue
             # 一一查找，直到找到Python包
             for package in packages[0]:
                 if package == "python":
@@ -126,7 +433,7 @@ class CondaEnvManager:
         获取所有环境及其包
         
         返回值:
-            dict: 环境名称为键，包含环境路径和包列表为值的字典，格式为 {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel]]}
+            dict: 环境名称为键，包含环境路径和包列表为值的字典，格式为 {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]}
             如果执行失败则返回空字典
         """
         
@@ -144,19 +451,68 @@ class CondaEnvManager:
             else:
                 env_path = "Unknown"
                 
-            packages = self.get_packages_in_env(env)
+            packages = self.get_packages_in_env(env, env_path if env_path != "Unknown" else None)
+            if packages is None:
+                packages = [[], [], [], []]     # 全量扫描中获取失败的环境按空环境记录，下次刷新时再获取
             # 存储环境路径和包信息
             env_packages[env] = [env_path, packages]
         return env_packages
 
+    # 获取单个环境的路径及其包
+    def get_env_inventory(self, env_name: str):
+        """
+        只获取单个环境的路径及包信息，用于操作完成后的局部刷新
+
+        参数:
+            env_name (str): 环境名称（或无名环境的路径）
+
+        返回值:
+            list: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]
+            None: 环境不存在（如已被删除）或获取失败
+        """
+        # 无名环境（包括其他根目录的环境）的“名字”就是路径，不用再获取环境列表
+        if os.path.isabs(env_name):
+            if not os.path.isdir(os.path.join(env_name, 'conda-meta')):
+                return None
+            packages = self.get_packages_in_env(env_name, env_name)
+            return [env_name, packages] if packages is not None else None
+
+        envs = self.get_conda_envs()
+        if not envs:
+            return None
+
+        # 有名字的环境按名字查找
+        env_path = None
+        for name, path in zip(envs[0], envs[1]):
+            if name == env_name or path == env_name:
+                env_path = path
+                break
+        if env_path is None:
+            return None
+
+        packages = self.get_packages_in_env(env_name, env_path)
+        if packages is None:
+            return None     # 环境还在，但这次没获取到包列表，不能当作空环境
+        return [env_path, packages]
+
+    # 指定目标环境的参数
+    def _target_args(self, env_name: str) -> list:
+        """
+        无名环境（如其他根目录中的环境）用路径指定（-p），其他用名称指定（-n）
+        """
+        if os.path.isabs(env_name):
+            return ["-p", env_name]
+        return ["-n", env_name]
+
     # 创建环境
-    def create_env(self, env_name: str, python_version: str = None):
+    def create_env(self, env_name: str, python_version: str = None, backend: str = None):
         """
         创建一个新的环境
         
         参数:
             env_name (str): 环境名称
             python_version (str, optional): Python版本，默认为None
+            backend (str, optional): 本次操作使用的后端，默认为全局后端
         
         返回值:
             bool: 创建成功返回True，否则返回False
@@ -164,36 +520,60 @@ class CondaEnvManager:
 
         # 判断是否传入Python版本，没有则默认为最新版
         if not python_version:
-            command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "create", "-n", env_name, "python", "-y"]
+            args = ["create", "-n", env_name, "python", "-y"]
         else:
-            command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "create", "-n", env_name, "python=" + python_version, "-y"]
+            args = ["create", "-n", env_name, "python=" + python_version, "-y"]
         
-        result = self.run_command(command)
+        result = self.executor.execute('create', args, backend, env_name)
         if result[2] == 0:
             return True
         else:
             return False
         
+    # 从锁定文件创建环境
+    def create_env_from_lockfile(self, env_name: str, lockfile: str, backend: str = None):
+        """
+        用锁定文件重建环境：显式锁定文件（@EXPLICIT）直接按地址下载链接，不经过求解器；
+        environment.yml 则通过 conda env create 创建（会经过求解器）
+
+        参数:
+            env_name (str): 新环境名称
+            lockfile (str): 锁定文件路径（envLockfile 导出的 .txt 或 environment.yml）
+            backend (str, optional): 本次操作使用的后端，默认为全局后端
+
+        返回值:
+            bool: 创建成功返回True，否则返回False
+        """
+        if is_explicit(lockfile):
+            # 操作名不属于 SOLVING_OPERATIONS，libmamba 后端也不会追加 --solver 参数
+            result = self.executor.execute('create_explicit', ["create", "-n", env_name, "--file", lockfile, "-y"],
+                                           backend, env_name)
+        else:
+            result = self.executor.execute('create', ["env", "create", "-n", env_name, "-f", lockfile],
+                                           backend, env_name)
+        return result[2] == 0
+
     # 删除环境
-    def remove_env(self, env_name: str):
+    def remove_env(self, env_name: str, backend: str = None):
         """
         删除指定的环境
         
         参数:
             env_name (str): 环境名称
+            backend (str, optional): 本次操作使用的后端，默认为全局后端
         
         返回值:
             bool: 删除成功返回True，否则返回False
         """
-        command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "remove", "-n", env_name, "--all", "-y"]
-        result = self.run_command(command)
+        args = ["remove"] + self._target_args(env_name) + ["--all", "-y"]
+        result = self.executor.execute('remove', args, backend, env_name)
         if result[2] == 0:
             return True
         else:
             return False
         
     # 安装包
-    def install_package(self, env_name: str, package: str, version: str = None):
+    def install_package(self, env_name: str, package: str, version: str = None, backend: str = None):
         """
         在指定环境中安装包
         
@@ -201,6 +581,7 @@ class CondaEnvManager:
             env_name (str): 环境名称
             package (str): 要安装的包名称
             version (str, optional): 包版本，默认为None
+            backend (str, optional): 本次操作使用的后端，默认为全局后端
         
         返回值:
             bool: 安装成功返回True，否则返回False
@@ -209,31 +590,32 @@ class CondaEnvManager:
         #判断包是否输入及是否包含版本
         if not package: return False
         if not version:
-            command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "install", "-n", env_name, package, "-y"]
+            args = ["install"] + self._target_args(env_name) + [package, "-y"]
         else:
-            command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "install", "-n", env_name, package, "=" + version, "-y"]
+            args = ["install"] + self._target_args(env_name) + [package + "=" + version, "-y"]
         
-        result = self.run_command(command)
+        result = self.executor.execute('install', args, backend, env_name)
         if result[2] == 0:
             return True
         else:
             return False
 
     # 卸载包
-    def uninstall_package(self, env_name: str, package: str):
+    def uninstall_package(self, env_name: str, package: str, backend: str = None):
         """
         在指定环境中卸载包
         
         参数:
             env_name (str): 环境名称
             package (str): 要卸载的包名称
+            backend (str, optional): 本次操作使用的后端，默认为全局后端
         
         返回值:
             bool: 卸载成功返回True，否则返回False
         """
         if not package: return False
-        command = [os.path.join(self.conda_path, "Scripts", "conda.exe"), "remove", "-n", env_name, package, "-y"]
-        result = self.run_command(command)
+        args = ["remove"] + self._target_args(env_name) + [package, "-y"]
+        result = self.executor.execute('uninstall', args, backend, env_name)
         if result[2] == 0:
             return True
         else:
@@ -0,0 +1,169 @@
+# condaScheduler.py
+"""
+conda 命令的调度：按操作对共享资源的占用分成几个队列，每个队列限制同时运行的命令数，队列内按优先级排队
+
+队列:
+    pkgs    写包缓存（<root>/pkgs）的操作：create / install / uninstall。conda 下载、解压包时会给包缓存加锁，
+            同时运行多个只会互相等锁、争抢磁盘，因此串行执行
+    io      只删除文件、不写包缓存的操作：remove，限制并发数，避免大量删除占满磁盘
+    read    只读的查询：conda list / conda env list 等，主要消耗 CPU（每次都要启动 python），按 CPU 核数限制；
+            发给常驻查询辅助进程（condaApi）的请求也在这里排队，按调用线程的优先级
+
+优先级:
+    INTERACTIVE（默认）  用户在界面或命令行发起的操作
+    BACKGROUND           后台刷新（文件监视触发的局部刷新、预取、收集器），只在没有交互操作排队时运行
+同一队列中优先级高的先运行，同一优先级先到先运行；在某个线程中用 with scheduler.background(): 可以把
+该线程之后的命令都标记为后台
+
+只在一个进程内调度（同一进程的界面和各工作线程共享一个执行器）；其他进程的 conda 仍由 conda 自己的锁协调
+"""
+import contextlib
+import heapq
+import itertools
+import os
+import threading
+import time
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# 各操作使用的队列，未列出的修改类操作按最保守的 pkgs 处理
+OPERATION_QUEUES = {
+    'create': 'pkgs',
+    'install': 'pkgs',
+    'uninstall': 'pkgs',
+    'remove': 'io',
+}
+
+# 各队列的默认并发数
+DEFAULT_LIMITS = {
+    'pkgs': 1,
+    'io': 2,
+    'read': max(2, (os.cpu_count() or 2) // 2),
+}
+
+
+# 操作使用的队列
+def queue_for(operation: str) -> str:
+    return OPERATION_QUEUES.get(operation, 'pkgs')
+
+
+# 一个队列的状态和统计
+class _Queue:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.running = 0
+        self.waiting = []           # 堆：(优先级, 序号)
+        self.peak_running = 0
+        self.completed = 0
+        self.wait_total = 0.0       # 累计排队时间（秒）
+        self.wait_max = 0.0
+        self.run_total = 0.0        # 累计运行时间（秒）
+        self.by_priority = {INTERACTIVE: 0, BACKGROUND: 0}
+
+
+class OperationScheduler:
+    def __init__(self, limits: dict = None):
+        """
+        参数:
+            limits: 各队列的并发数，{队列名: 并发数}，未指定的使用 DEFAULT_LIMITS
+        """
+        limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self._cond = threading.Condition()
+        self._queues = {name: _Queue(limit) for name, limit in limits.items()}
+        self._counter = itertools.count()
+        self._local = threading.local()
+
+    # 修改队列的并发数
+    def set_limit(self, queue: str, limit: int):
+        with self._cond:
+            self._queue(queue).limit = max(1, limit)
+            self._cond.notify_all()
+
+    # 获取队列（未知的队列按 1 个并发创建）
+    def _queue(self, name: str) -> _Queue:
+        queue = self._queues.get(name)
+        if queue is None:
+            queue = self._queues[name] = _Queue(1)
+        return queue
+
+    # 当前线程默认的优先级
+    def current_priority(self) -> int:
+        return getattr(self._local, "priority", INTERACTIVE)
+
+    # 把当前线程之后的命令标记为后台
+    @contextlib.contextmanager
+    def background(self):
+        previous = self.current_priority()
+        self._local.priority = BACKGROUND
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    # 占用队列中的一个位置
+    @contextlib.contextmanager
+    def slot(self, queue: str, priority: int = None):
+        """
+        排队直到队列有空位且前面没有优先级更高（或同优先级先到）的命令，运行结束后释放
+
+        用法:
+            with scheduler.slot('pkgs') as info:
+                subprocess.run(...)
+            info["wait"] 为排队的秒数
+
+        参数:
+            queue: 队列名
+            priority: INTERACTIVE 或 BACKGROUND，默认为当前线程的优先级
+        """
+        priority = self.current_priority() if priority is None else priority
+        ticket = (priority, next(self._counter))
+        enqueued = time.perf_counter()
+        with self._cond:
+            state = self._queue(queue)
+            heapq.heappush(state.waiting, ticket)
+            while state.running >= state.limit or state.waiting[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(state.waiting)
+            state.running += 1
+            state.peak_running = max(state.peak_running, state.running)
+            wait = time.perf_counter() - enqueued
+            state.wait_total += wait
+            state.wait_max = max(state.wait_max, wait)
+            # 出队后队首变了，唤醒其他等待者检查是否轮到自己
+            self._cond.notify_all()
+
+        started = time.perf_counter()
+        try:
+            yield {"queue": queue, "priority": priority, "wait": wait}
+        finally:
+            with self._cond:
+                state.running -= 1
+                state.completed += 1
+                state.run_total += time.perf_counter() - started
+                state.by_priority[priority] = state.by_priority.get(priority, 0) + 1
+                self._cond.notify_all()
+
+    # 各队列的统计
+    def metrics(self) -> dict:
+        """
+        返回值:
+            dict: {队列名: {"limit", "running", "waiting", "peak_running", "completed",
+                           "interactive", "background", "wait_mean", "wait_max", "run_mean"}}（时间单位为秒）
+        """
+        with self._cond:
+            result = {}
+            for name, state in self._queues.items():
+                result[name] = {
+                    "limit": state.limit,
+                    "running": state.running,
+                    "waiting": len(state.waiting),
+                    "peak_running": state.peak_running,
+                    "completed": state.completed,
+                    "interactive": state.by_priority.get(INTERACTIVE, 0),
+                    "background": state.by_priority.get(BACKGROUND, 0),
+                    "wait_mean": state.wait_total / state.completed if state.completed else 0.0,
+                    "wait_max": state.wait_max,
+                    "run_mean": state.run_total / state.completed if state.completed else 0.0,
+                }
+            return result
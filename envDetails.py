@@ -0,0 +1,178 @@
+# envDetails.py
+"""
+环境详情（简介、包数量、磁盘占用、最后修改时间）的加载和缓存
+
+这些信息都要访问环境目录，环境在网络盘上时可能很慢，因此由后台线程调用 EnvDetailLoader.load，
+按从快到慢的顺序逐步产生结果，界面收到一部分就显示一部分；选中了别的环境时可以中途停止；
+结果按文件的 mtime 缓存，文件没有变化时不再读取（磁盘占用只在 conda-meta 或 site-packages 变化后重新统计）
+"""
+import os
+
+from lruCache import LRUCache
+from sitePackagesScanner import merge_pip_packages, site_packages_dirs
+
+# 最多缓存多少个环境的详情
+DETAIL_CACHE_SIZE = 64
+# 简介文件名
+INTRODUCTION_FILE = "introduction.txt"
+
+
+# 读取文件或目录的 mtime
+def _mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+# 环境的包签名
+def package_signature(env_path: str) -> tuple:
+    """
+    conda-meta 和 site-packages 目录的 mtime，安装/卸载包都会改变其中之一
+    """
+    return tuple([_mtime(os.path.join(env_path, "conda-meta"))] +
+                 [_mtime(directory) for directory in site_packages_dirs(env_path)])
+
+
+# 读取简介
+def read_introduction(env_path: str):
+    """
+    返回值:
+        str: introduction.txt 的内容，不存在时返回None
+    """
+    try:
+        with open(os.path.join(env_path, INTRODUCTION_FILE), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# 统计包数量
+def count_packages(env_path: str) -> int:
+    """
+    conda-meta 中的记录数加上 pip 安装的包数（与包列表的统计方式一致，不调用 conda）
+    """
+    names = []
+    try:
+        for entry in os.scandir(os.path.join(env_path, "conda-meta")):
+            if entry.name.endswith(".json"):
+                names.append(entry.name[:-5].rsplit("-", 2)[0])   # 文件名为 名称-版本-构建.json
+    except OSError:
+        pass
+    packages = merge_pip_packages([names, [""] * len(names), [""] * len(names), ["conda"] * len(names)], env_path)
+    return len(packages[0])
+
+
+# 统计磁盘占用
+def disk_usage(env_path: str, exclusive: bool = False, should_stop=None):
+    """
+    遍历环境目录累加文件大小，不跟随符号链接，硬链接到同一文件的只计一次；
+    根目录下的 envs/ 和 pkgs/ 属于其他环境和包缓存，不计入（base 环境就是 conda 根目录）
+
+    参数:
+        env_path: 环境路径
+        exclusive: 只统计没有硬链接的文件（与 pkgs 缓存或其他环境共享的文件删除环境后不会释放空间）
+        should_stop: 可选的无参函数，每进入一个目录前调用一次，返回True时停止统计
+
+    返回值:
+        int: 字节数，被 should_stop 中途停止时返回None
+    """
+    total = 0
+    seen = set()
+    stack = [env_path]
+    while stack:
+        if should_stop is not None and should_stop():
+            return None
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if directory is env_path and entry.name in ("envs", "pkgs"):
+                            continue
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        info = entry.stat(follow_symlinks=False)
+                        if info.st_nlink > 1:
+                            if exclusive:
+                                continue
+                            key = (info.st_dev, info.st_ino)
+                            if key in seen:
+                                continue
+                            seen.add(key)
+                        total += info.st_size
+                except OSError:
+                    continue
+    return total
+
+
+class EnvDetailLoader:
+    def __init__(self, capacity: int = DETAIL_CACHE_SIZE):
+        """
+        参数:
+            capacity: 最多缓存多少个环境的详情
+        """
+        # key: 环境路径, value: {"introduction", "introduction_mtime", "signature", "package_count", "size", "modified"}
+        self.cache = LRUCache(capacity)
+
+    # 缓存中的详情（不访问磁盘，可在界面线程中调用；可能已过期，由 load 校验后更新）
+    def cached(self, env_path: str) -> dict:
+        return dict(self.cache.get(env_path) or {})
+
+    # 加载详情
+    def load(self, env_path: str, should_stop=None):
+        """
+        按从快到慢的顺序加载，缓存仍然有效的部分直接使用
+
+        参数:
+            env_path: 环境路径
+            should_stop: 可选的无参函数，返回True时在阶段之间（以及统计磁盘占用的过程中）停止，
+                         未完成的字段不写入缓存
+
+        返回值:
+            生成器，每次产生一个包含已加载字段的字典（后产生的包含前面的字段）:
+                introduction: 简介文本，没有简介时为None
+                modified: 最后修改时间（conda-meta 的 mtime，秒），无法读取时为None
+                package_count: 包数量
+                size: 磁盘占用（字节）
+        """
+        entry = dict(self.cache.get(env_path) or {})
+
+        # 1. 简介（一次 stat，变化时再读取）
+        introduction_mtime = _mtime(os.path.join(env_path, INTRODUCTION_FILE))
+        if "introduction" not in entry or entry.get("introduction_mtime") != introduction_mtime:
+            try:
+                entry["introduction"] = read_introduction(env_path) if introduction_mtime is not None else None
+            except (OSError, UnicodeDecodeError):
+                entry["introduction"] = "读取简介失败"
+            entry["introduction_mtime"] = introduction_mtime
+        signature = package_signature(env_path)
+        entry["modified"] = signature[0] / 1e9 if signature[0] is not None else None
+        self.cache.put(env_path, dict(entry))
+        yield dict(entry)
+
+        # 包没有变化时，包数量和磁盘占用都沿用缓存
+        if entry.get("signature") == signature and "size" in entry:
+            return
+        entry.pop("size", None)
+
+        # 2. 包数量（读 conda-meta 目录和 site-packages）
+        if should_stop is not None and should_stop():
+            return
+        entry["package_count"] = count_packages(env_path)
+        yield dict(entry)
+
+        # 3. 磁盘占用（遍历整个环境目录，最慢）
+        if should_stop is not None and should_stop():
+            return
+        size = disk_usage(env_path, should_stop=should_stop)
+        if size is None:
+            return
+        entry["size"] = size
+        entry["signature"] = signature
+        self.cache.put(env_path, dict(entry))
+        yield dict(entry)
@@ -0,0 +1,184 @@
+# envDiscovery.py
+"""
+多个 conda 根目录的环境发现：不调用 conda，直接枚举文件系统，各根目录在线程池中并发扫描，
+总耗时取决于最慢的根目录，而不是所有根目录耗时之和
+
+每个根目录的环境来源:
+    1. 根目录本身（base）
+    2. envs_dirs 中含有 conda-meta 的子目录：<root>/envs、~/.conda/envs，
+       以及 .condarc（~/.condarc、~/.conda/.condarc、<root>/.condarc）和 CONDA_ENVS_PATH 中配置的目录
+    3. ~/.conda/environments.txt 中登记的其他位置的环境（conda create -p 创建的）
+
+同一个环境可能被多个来源找到（如共享的 envs_dirs、符号链接），按规范化后的真实路径去重，
+归属于第一个找到它的根目录（在某个根目录之下的环境优先归属该根目录）
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# .condarc 中的环境目录配置项
+ENVS_DIRS_KEYS = ("envs_dirs", "envs_path")
+
+
+# 规范化路径，用于去重
+def prefix_key(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+
+# 是否为 conda 环境
+def is_prefix(path: str) -> bool:
+    return os.path.isdir(os.path.join(path, "conda-meta"))
+
+
+# 读取 .condarc 中的 envs_dirs
+def _condarc_envs_dirs(path: str) -> list:
+    """
+    只解析 envs_dirs 这一个列表（不依赖 YAML 库），支持
+        envs_dirs:
+          - D:/envs
+    和 envs_dirs: [D:/envs, E:/envs] 两种写法
+    """
+    dirs = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return dirs
+
+    in_list = False
+    for line in lines:
+        stripped = line.split(" #")[0].strip()
+        if in_list:
+            if stripped.startswith("- "):
+                dirs.append(stripped[2:].strip().strip("'\""))
+                continue
+            if not stripped:
+                continue
+            in_list = False
+        key, sep, value = stripped.partition(":")
+        if sep and key.strip() in ENVS_DIRS_KEYS:
+            value = value.strip()
+            if value.startswith("[") and value.endswith("]"):
+                dirs += [item.strip().strip("'\"") for item in value[1:-1].split(",") if item.strip()]
+            elif not value:
+                in_list = True
+    return [os.path.expandvars(os.path.expanduser(d)) for d in dirs]
+
+
+# 根目录的 envs_dirs
+def envs_dirs_of(conda_path: str) -> list:
+    """
+    返回值:
+        list: 去重后的环境目录（不检查是否存在）
+    """
+    home = os.path.expanduser("~")
+    dirs = []
+    for variable in ("CONDA_ENVS_PATH", "CONDA_ENVS_DIRS"):
+        dirs += [d for d in os.environ.get(variable, "").split(os.pathsep) if d]
+    for condarc in (os.path.join(home, ".condarc"), os.path.join(home, ".conda", ".condarc"),
+                    os.path.join(conda_path, ".condarc")):
+        dirs += _condarc_envs_dirs(condarc)
+    dirs += [os.path.join(conda_path, "envs"), os.path.join(home, ".conda", "envs")]
+
+    unique = []
+    seen = set()
+    for d in dirs:
+        key = os.path.normcase(os.path.abspath(d))
+        if key not in seen:
+            seen.add(key)
+            unique.append(os.path.abspath(d))
+    return unique
+
+
+# ~/.conda/environments.txt 中登记的环境
+def registered_prefixes() -> list:
+    path = os.path.join(os.path.expanduser("~"), ".conda", "environments.txt")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except (OSError, UnicodeDecodeError):
+        return []
+
+
+# 扫描单个根目录
+def discover_root(conda_path: str) -> list:
+    """
+    返回值:
+        list: [(环境名称, 环境路径)]，base 为根目录本身，envs_dirs 中的环境用目录名作为名称
+    """
+    envs = []
+    if is_prefix(conda_path):
+        envs.append(("base", os.path.abspath(conda_path)))
+    for envs_dir in envs_dirs_of(conda_path):
+        try:
+            entries = sorted(os.scandir(envs_dir), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir() and is_prefix(entry.path):
+                envs.append((entry.name, entry.path))
+    return envs
+
+
+# 并发扫描多个根目录
+def discover_envs(roots: list, max_workers: int = None) -> dict:
+    """
+    参数:
+        roots: conda 根目录列表，第一个为主根目录
+        max_workers: 线程数，默认每个根目录一个线程
+
+    返回值:
+        dict: 按根目录分组的环境 {根目录: {环境名称: 环境路径}}，
+        环境名称规则与在主根目录运行 conda env list 一致：其他根目录中的环境和重名的环境用路径作为名称
+    """
+    roots = [os.path.abspath(root) for root in roots]
+    if not roots:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(roots)) as pool:
+        # environments.txt 与根目录的扫描一起并发读取
+        registered = pool.submit(lambda: [p for p in registered_prefixes() if is_prefix(p)])
+        results = list(pool.map(discover_root, roots))
+        registered = registered.result()
+
+    inventory = {root: {} for root in roots}
+    seen = set()
+    names = set()
+    # 创建/安装等操作使用主根目录的 conda，它只能按名称找到自己 envs_dirs 中的环境
+    primary_dirs = {os.path.normcase(d) for d in envs_dirs_of(roots[0])}
+
+    def add(root, name, path):
+        key = prefix_key(path)
+        if key in seen:
+            return
+        seen.add(key)
+        if root != roots[0] and os.path.normcase(os.path.dirname(os.path.abspath(path))) not in primary_dirs:
+            name = path     # 其他根目录的环境与无名环境一样用路径作为名称
+        if name in names:
+            name = path     # 重名时也用路径作为名称
+        names.add(name)
+        inventory[root][name] = path
+
+    for root, envs in zip(roots, results):
+        for name, path in envs:
+            add(root, name, path)
+
+    # 登记的其他位置的环境：位于某个根目录之下的归属该根目录，否则归属主根目录
+    root_keys = [(prefix_key(root), root) for root in roots]
+    for path in registered:
+        key = prefix_key(path)
+        owner = next((root for root_key, root in root_keys if key.startswith(root_key + os.sep)), roots[0])
+        add(owner, path, path)
+    return inventory
+
+
+# 合并为环境列表
+def flatten(inventory: dict) -> list:
+    """
+    返回值:
+        list: [环境名称列表, 环境路径列表]，格式与 CondaEnvManager.get_conda_envs 相同
+    """
+    names, paths = [], []
+    for envs in inventory.values():
+        for name, path in envs.items():
+            names.append(name)
+            paths.append(path)
+    return [names, paths]
@@ -0,0 +1,177 @@
+# envLockfile.py
+"""
+从 conda-meta 记录直接生成环境的锁定文件，不需要运行 conda env export（不启动 conda、不联网）
+
+- 显式锁定文件（@EXPLICIT）：每行一个包的完整下载地址 + md5（或 sha256），
+  conda create --file 使用这种文件时不经过求解器，直接下载并链接这些包，结果与原环境完全一致
+- environment.yml：name / channels / dependencies（name=version=build），pip 安装的包放在 pip 小节中，
+  便于阅读和跨平台使用（会经过求解器）
+"""
+import json
+import os
+import re
+
+from sitePackagesScanner import merge_pip_packages
+
+EXPLICIT_HEADER = "@EXPLICIT"
+
+_SUBDIR_SUFFIX = re.compile(r'/(noarch|(linux|win|osx|zos|freebsd|emscripten|wasi)-[a-z0-9_]+)/?$')
+
+
+# 读取环境中所有包的 conda-meta 记录
+def read_records(env_path: str) -> list:
+    """
+    返回值:
+        list: conda-meta/*.json 解析后的字典列表（去掉体积较大的 files / paths_data 字段）
+    """
+    records = []
+    meta_dir = os.path.join(env_path, 'conda-meta')
+    try:
+        entries = sorted(e.path for e in os.scandir(meta_dir) if e.name.endswith('.json'))
+    except OSError:
+        return records
+    for path in entries:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        record.pop('files', None)
+        record.pop('paths_data', None)
+        records.append(record)
+    return records
+
+
+# 按依赖关系排序
+def dependency_order(records: list) -> list:
+    """
+    依赖在前、被依赖者在后（与 conda list --explicit 的顺序一致），环内的包按名称排序
+
+    返回值:
+        list: 排序后的记录
+    """
+    by_name = {record['name']: record for record in records}
+    ordered = []
+    state = {}      # 包名 -> 1 访问中 / 2 已完成
+
+    def visit(name):
+        if state.get(name):
+            return      # 已完成或在依赖环中
+        state[name] = 1
+        for spec in by_name[name].get('depends') or []:
+            dep = spec.split()[0]
+            if dep in by_name:
+                visit(dep)
+        state[name] = 2
+        ordered.append(by_name[name])
+
+    for name in sorted(by_name):
+        visit(name)
+    return ordered
+
+
+# 环境的平台
+def platform_of(records: list) -> str:
+    for record in records:
+        subdir = record.get('subdir')
+        if subdir and subdir != 'noarch':
+            return subdir
+    return 'noarch'
+
+
+# 生成显式锁定文件
+def export_explicit(env_path: str, hash_type: str = 'md5') -> tuple:
+    """
+    参数:
+        env_path: 环境路径
+        hash_type: md5 或 sha256（sha256 需要较新版本的 conda 才能识别）
+
+    返回值:
+        tuple: (锁定文件文本, 缺少下载地址而未写入的包名列表)
+    """
+    records = dependency_order(read_records(env_path))
+    lines = [
+        "# This file may be used to create an environment using:",
+        "# $ conda create --name <env> --file <this file>",
+        f"# platform: {platform_of(records)}",
+        EXPLICIT_HEADER,
+    ]
+    skipped = []
+    for record in records:
+        url = record.get('url')
+        if not url:
+            # 本地构建或 conda-meta 不完整的包没有下载地址
+            skipped.append(record['name'])
+            continue
+        digest = record.get(hash_type)
+        if digest:
+            url += f"#{digest}" if hash_type == 'md5' else f"#sha256:{digest}"
+        lines.append(url)
+    return "\n".join(lines) + "\n", skipped
+
+
+# 渠道名称
+def _channel_of(record: dict) -> str:
+    channel = record.get('channel') or ''
+    # 新版本 conda 记录的是完整地址（https://conda.anaconda.org/conda-forge/linux-64），只保留渠道部分
+    for prefix in ('https://conda.anaconda.org/', 'http://conda.anaconda.org/'):
+        if channel.startswith(prefix):
+            channel = channel[len(prefix):]
+    # 去掉末尾的平台目录（同一渠道的 noarch 包和平台包记录的 subdir 不同）
+    channel = _SUBDIR_SUFFIX.sub('', channel)
+    if channel == 'https://repo.anaconda.com/pkgs/main':
+        channel = 'defaults'
+    return channel
+
+
+# 生成 environment.yml
+def export_environment_yml(env_path: str, env_name: str, with_builds: bool = True) -> str:
+    """
+    参数:
+        env_path: 环境路径
+        env_name: 写入 name 字段的环境名称
+        with_builds: 依赖是否带上 build 字符串（name=version=build）
+
+    返回值:
+        str: environment.yml 文本
+    """
+    records = sorted(read_records(env_path), key=lambda r: r['name'])
+
+    # 渠道按包数从多到少排列
+    counts = {}
+    for record in records:
+        channel = _channel_of(record)
+        if channel:
+            counts[channel] = counts.get(channel, 0) + 1
+    channels = sorted(counts, key=lambda c: -counts[c])
+
+    # 用与包列表相同的规则找出 pip 安装的包
+    packages = merge_pip_packages(
+        [[r['name'] for r in records], [r['version'] for r in records], [''] * len(records), ['conda'] * len(records)],
+        env_path
+    )
+    pip_packages = sorted(
+        (name, version) for name, version, source in zip(packages[0], packages[1], packages[3]) if source == 'pip'
+    )
+
+    lines = [f"name: {env_name}", "channels:"]
+    lines += [f"  - {channel}" for channel in channels]
+    lines.append("dependencies:")
+    for record in records:
+        spec = f"{record['name']}={record['version']}"
+        if with_builds and record.get('build'):
+            spec += f"={record['build']}"
+        lines.append(f"  - {spec}")
+    if pip_packages:
+        lines.append("  - pip:")
+        lines += [f"    - {name}=={version}" for name, version in pip_packages]
+    return "\n".join(lines) + "\n"
+
+
+# 是否为显式锁定文件
+def is_explicit(path: str) -> bool:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return any(line.strip() == EXPLICIT_HEADER for line in f)
+    except OSError:
+        return False
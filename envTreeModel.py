@@ -0,0 +1,159 @@
+# envTreeModel.py
+"""
+环境列表的数据模型：QStandardItemModel 保存每个环境一行（名称、Python 版本、路径、包数量、安装大小），
+QSortFilterProxyModel 负责排序和按名称/路径/Python 版本过滤
+
+刷新时按环境名称逐行比较，只插入新增的行、更新变化的单元格、删除消失的行，
+视图的选中状态和滚动位置不受影响
+"""
+from PySide6.QtCore import Qt, QSortFilterProxyModel
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+
+# 列
+COLUMN_NAME = 0
+COLUMN_PYTHON = 1
+COLUMN_PATH = 2
+COLUMN_PACKAGES = 3
+COLUMN_SIZE = 4
+HEADERS = ["环境名称", "Python 版本", "路径", "包数量", "安装大小"]
+# 安装大小与详情中的“磁盘占用”统计方式不同，在表头提示中说明
+SIZE_TOOLTIP = "conda-meta 中记录的包安装大小之和（不含 pip 包和其他文件）；详情中的磁盘占用为实际遍历环境目录的结果"
+
+# 排序使用的数据（数字列按数值排序，而不是按显示的文本）
+SORT_ROLE = Qt.UserRole + 1
+# 参与过滤的列
+FILTER_COLUMNS = (COLUMN_NAME, COLUMN_PYTHON, COLUMN_PATH)
+
+
+# 格式化字节数
+def format_size(size) -> str:
+    if size is None:
+        return ""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+# 按 Python 版本排序时使用的键（3.10 排在 3.9 之后）
+def _version_sort_key(version) -> str:
+    if not version:
+        return ""
+    return ".".join(part.zfill(6) if part.isdigit() else part for part in version.split("."))
+
+
+class EnvTreeModel(QStandardItemModel):
+    def __init__(self, parent=None):
+        super().__init__(0, len(HEADERS), parent)
+        self.setHorizontalHeaderLabels(HEADERS)
+        self.setHeaderData(COLUMN_SIZE, Qt.Horizontal, SIZE_TOOLTIP, Qt.ToolTipRole)
+        self._rows = {}     # 环境名称 -> 该行名称列的 QStandardItem（行号会随增删变化，用 item.row() 获取）
+
+    # 环境所在的行号
+    def row_of(self, env_name: str) -> int:
+        item = self._rows.get(env_name)
+        return item.row() if item is not None else -1
+
+    # 某行的环境名称
+    def env_name_at(self, row: int):
+        item = self.item(row, COLUMN_NAME)
+        return item.text() if item is not None else None
+
+    # 设置单元格（值未变化时不发出 dataChanged）
+    def _set_cell(self, row: int, column: int, text: str, sort_value):
+        item = self.item(row, column)
+        if item.text() != text:
+            item.setText(text)
+        if item.data(SORT_ROLE) != sort_value:
+            item.setData(sort_value, SORT_ROLE)
+
+    # 新增或更新一个环境
+    def update_env(self, env_name: str, env_path: str, python_version: str = None,
+                   package_count: int = None, size: int = None):
+        """
+        参数:
+            env_name: 环境名称
+            env_path: 环境路径
+            python_version: Python 版本，未知时为 None
+            package_count: 包数量，未加载时为 None
+            size: 安装大小（字节），未计算时为 None
+        """
+        row = self.row_of(env_name)
+        if row < 0:
+            items = [QStandardItem() for _ in HEADERS]
+            for item in items:
+                item.setEditable(False)
+            items[COLUMN_NAME].setText(env_name)
+            items[COLUMN_NAME].setData(env_name.lower(), SORT_ROLE)
+            self.appendRow(items)
+            self._rows[env_name] = items[COLUMN_NAME]
+            row = items[COLUMN_NAME].row()
+
+        self._set_cell(row, COLUMN_PYTHON, python_version or "未知", _version_sort_key(python_version))
+        self._set_cell(row, COLUMN_PATH, env_path, env_path.lower())
+        self._set_cell(row, COLUMN_PACKAGES, "" if package_count is None else str(package_count),
+                       -1 if package_count is None else package_count)
+        self._set_cell(row, COLUMN_SIZE, format_size(size), -1 if size is None else size)
+
+    # 只更新包数量
+    def set_package_count(self, env_name: str, package_count: int):
+        row = self.row_of(env_name)
+        if row >= 0:
+            self._set_cell(row, COLUMN_PACKAGES, str(package_count), package_count)
+
+    # 只更新大小
+    def set_size(self, env_name: str, size: int):
+        row = self.row_of(env_name)
+        if row >= 0:
+            self._set_cell(row, COLUMN_SIZE, format_size(size), -1 if size is None else size)
+
+    # 删除一个环境
+    def remove_env(self, env_name: str):
+        item = self._rows.pop(env_name, None)
+        if item is not None:
+            self.removeRow(item.row())
+
+    # 用完整的环境列表同步
+    def sync(self, envdir: dict, python_version: dict, package_counts: dict, sizes: dict):
+        """
+        只对有差异的行做增删改
+
+        参数:
+            envdir: {环境名称: [环境路径, ...]}
+            python_version: {环境名称: Python 版本}
+            package_counts: {环境名称: 包数量}
+            sizes: {环境名称: 安装大小}
+        """
+        for env_name in [name for name in self._rows if name not in envdir]:
+            self.remove_env(env_name)
+        for env_name, inf in envdir.items():
+            self.update_env(env_name, inf[0], python_version.get(env_name),
+                            package_counts.get(env_name), sizes.get(env_name))
+
+
+class EnvFilterProxyModel(QSortFilterProxyModel):
+    """
+    按名称、路径、Python 版本过滤（不区分大小写的子串匹配），数字列按数值排序
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+        self._pattern = ""
+
+    # 设置过滤文本
+    def set_pattern(self, text: str):
+        self._pattern = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent) -> bool:
+        if not self._pattern:
+            return True
+        model = self.sourceModel()
+        for column in FILTER_COLUMNS:
+            text = model.index(source_row, column, source_parent).data()
+            if text and self._pattern in text.lower():
+                return True
+        return False
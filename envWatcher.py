@@ -0,0 +1,164 @@
+# envWatcher.py
+import os
+from PySide6.QtCore import QObject, QTimer, QFileSystemWatcher, Signal
+
+from sitePackagesScanner import site_packages_dirs
+
+# envs/ 下没有 conda-meta 的目录最多重新检查的次数
+MAX_INCOMPLETE_RETRIES = 10
+
+# 文件系统监视类 EnvWatcher
+class EnvWatcher(QObject):
+    """
+    监视 conda 根目录的 envs/ 以及每个环境的 conda-meta/ 和 site-packages/，
+    用于发现在图形界面之外（如终端里 conda install / pip install）对环境做的修改
+
+    一段时间内的连续事件会被合并（防抖），最后按环境各发一次信号，
+    QFileSystemWatcher 底层使用 inotify / ReadDirectoryChangesW，上百个环境常开也没有负担
+    """
+    envsChanged = Signal(list)          # 定义信号 envsChanged(内容有变化的环境名列表)
+    envAdded = Signal(str, str)         # 定义信号 envAdded(环境名, 环境路径)
+    envRemoved = Signal(str)            # 定义信号 envRemoved(环境名)
+
+    # 构造函数，传入conda安装路径和防抖间隔
+    def __init__(self, conda_path: str, debounce_ms: int = 1500, parent=None):
+        super().__init__(parent)
+        self.conda_path = conda_path
+        self.envs_dir = os.path.join(conda_path, "envs")
+        self.env_paths = {}             # dict，key: 环境名称, value: 环境路径
+        self._dir_to_env = {}           # dict，key: 被监视的目录, value: 环境名称
+        self._pending = set()           # 等待防抖结束后刷新的环境名
+        self._envs_dir_dirty = False    # envs/ 目录本身是否有变化（新增/删除环境）
+        self._held = set()              # 暂时忽略事件的环境（界面自己正在操作的环境）
+        self._incomplete = {}           # envs/ 下还没有 conda-meta 的目录及其重试次数
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        # 防抖定时器：每来一个事件就重新计时，安静一段时间后才真正处理
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._flush)
+
+    # 开始监视
+    def start(self, env_paths: dict):
+        """
+        开始（或重新）监视给定的环境
+
+        参数:
+            env_paths: {环境名称: 环境路径}
+        """
+        self.stop()
+        if os.path.isdir(self.envs_dir):
+            self._watcher.addPath(self.envs_dir)
+        for env_name, env_path in env_paths.items():
+            self.add_env(env_name, env_path)
+
+    # 停止监视
+    def stop(self):
+        self._timer.stop()
+        paths = self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        self.env_paths.clear()
+        self._dir_to_env.clear()
+        self._pending.clear()
+        self._envs_dir_dirty = False
+
+    # 添加一个环境的监视
+    def add_env(self, env_name: str, env_path: str):
+        """
+        监视环境的 conda-meta/（conda 的安装记录）和 site-packages/（pip 安装的包）
+        """
+        self.env_paths[env_name] = env_path
+        for directory in [os.path.join(env_path, "conda-meta")] + site_packages_dirs(env_path):
+            if os.path.isdir(directory) and directory not in self._dir_to_env:
+                self._dir_to_env[directory] = env_name
+                self._watcher.addPath(directory)
+
+    # 移除一个环境的监视
+    def remove_env(self, env_name: str):
+        self.env_paths.pop(env_name, None)
+        for directory in [d for d, name in self._dir_to_env.items() if name == env_name]:
+            del self._dir_to_env[directory]
+            self._watcher.removePath(directory)
+        self._pending.discard(env_name)
+
+    # 暂停某个环境的事件
+    def hold(self, env_name: str):
+        """
+        界面自己修改某个环境时调用，期间该环境的事件被忽略，避免重复刷新
+        """
+        self._held.add(env_name)
+        self._pending.discard(env_name)
+
+    # 恢复某个环境的事件
+    def release(self, env_name: str):
+        self._held.discard(env_name)
+        self._pending.discard(env_name)
+        # 新建的环境在操作完成后才有 conda-meta，这里补上监视
+        env_path = self.env_paths.get(env_name)
+        if env_path:
+            self.add_env(env_name, env_path)
+
+    # 目录变化回调
+    def _on_directory_changed(self, path: str):
+        if path == self.envs_dir:
+            self._envs_dir_dirty = True
+        else:
+            env_name = self._dir_to_env.get(path)
+            if env_name is None or env_name in self._held:
+                return
+            if not os.path.isdir(path):
+                # 目录被删掉后 QFileSystemWatcher 会自动停止监视，这里同步一下
+                del self._dir_to_env[path]
+                self._envs_dir_dirty = True
+            self._pending.add(env_name)
+        self._timer.start()     # 重新计时
+
+    # 防抖结束，统一处理
+    def _flush(self):
+        if self._envs_dir_dirty:
+            self._envs_dir_dirty = False
+            self._scan_envs_dir()
+
+        changed = sorted(name for name in self._pending if name in self.env_paths and name not in self._held)
+        self._pending.clear()
+        if changed:
+            self.envsChanged.emit(changed)
+
+    # 重新对比 envs/ 目录，找出新增和删除的环境
+    def _scan_envs_dir(self):
+        # 目录被重建时需要重新加入监视
+        if os.path.isdir(self.envs_dir) and self.envs_dir not in self._watcher.directories():
+            self._watcher.addPath(self.envs_dir)
+
+        # 已删除的环境（环境目录或 conda-meta 不存在了）
+        for env_name, env_path in list(self.env_paths.items()):
+            if env_name in self._held:
+                continue
+            if not os.path.isdir(os.path.join(env_path, "conda-meta")):
+                self.remove_env(env_name)
+                self.envRemoved.emit(env_name)
+
+        # 新增的环境（envs/ 下出现了带 conda-meta 的目录）
+        known_paths = {os.path.normcase(os.path.abspath(p)) for p in self.env_paths.values()}
+        try:
+            entries = os.listdir(self.envs_dir)
+        except OSError:
+            return
+        for name in entries:
+            env_path = os.path.join(self.envs_dir, name)
+            if name in self._held or os.path.normcase(os.path.abspath(env_path)) in known_paths:
+                continue
+            if os.path.isdir(os.path.join(env_path, "conda-meta")):
+                self._incomplete.pop(name, None)
+                self.add_env(name, env_path)
+                self._pending.discard(name)
+                self.envAdded.emit(name, env_path)
+            elif os.path.isdir(env_path) and self._incomplete.get(name, 0) < MAX_INCOMPLETE_RETRIES:
+                # 正在创建中，conda-meta 还没出现，稍后再看一次（不是环境的目录最多重试几次）
+                self._incomplete[name] = self._incomplete.get(name, 0) + 1
+                self._envs_dir_dirty = True
+                self._timer.start()
@@ -0,0 +1,250 @@
+# gcReport.py
+"""
+环境回收报告：找出长期不用、与其他环境几乎相同、或已经损坏的环境，按可回收的空间排序，并支持并发批量删除
+
+每个环境的指标:
+    最后活动时间    conda-meta/history 的 mtime（每次 conda 修改环境都会追加记录），没有时用 conda-meta 目录的 mtime
+    独占大小        只统计没有硬链接的文件（与 pkgs 缓存共享的文件删除环境后不会释放空间）
+    近似重复        包集合（名称==版本）的 Jaccard 相似度；先用 MinHash + LSH 分桶找出候选对，再精确计算相似度，
+                    环境很多时不用两两比较
+    损坏            没有 conda-meta、conda-meta 中没有任何记录、装了 python 包但解释器不存在
+
+base 环境（conda 根目录本身，包括其他根目录的 base）不会出现在回收列表中
+"""
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from envDetails import disk_usage
+
+# 超过多少天没有活动视为长期不用
+STALE_DAYS = 90
+# 包集合相似度不低于该值视为近似重复
+SIMILARITY = 0.9
+# MinHash 签名长度 = 分桶数 × 每桶行数
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+# 环境的最后活动时间
+def last_activity(env_path: str):
+    """
+    返回值:
+        float: 时间戳（秒），环境不存在时返回None
+    """
+    for path in (os.path.join(env_path, "conda-meta", "history"), os.path.join(env_path, "conda-meta"), env_path):
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            continue
+    return None
+
+
+# 是否为 conda 根目录（base 环境，删除它就是卸载 conda）
+def is_conda_root(env_path: str) -> bool:
+    return os.path.isdir(os.path.join(env_path, "condabin"))
+
+
+# python 解释器路径
+def _python_executable(env_path: str) -> str:
+    if os.name == "nt":
+        return os.path.join(env_path, "python.exe")
+    return os.path.join(env_path, "bin", "python")
+
+
+# 检查环境是否损坏
+def broken_reasons(env_path: str, packages) -> list:
+    """
+    参数:
+        env_path: 环境路径
+        packages: [packages_name, packages_version, ...]，可以为 None（不检查 python）
+
+    返回值:
+        list: 损坏原因，正常时为空列表
+    """
+    meta_dir = os.path.join(env_path, "conda-meta")
+    if not os.path.isdir(env_path):
+        return ["环境目录不存在"]
+    try:
+        records = [name for name in os.listdir(meta_dir) if name.endswith(".json")]
+    except OSError:
+        return ["没有 conda-meta"]
+    reasons = []
+    if not records:
+        reasons.append("conda-meta 为空")
+    names = packages[0] if packages else [name.rsplit("-", 2)[0] for name in records]
+    if "python" in names and not os.path.exists(_python_executable(env_path)):
+        reasons.append("python 解释器不存在")
+    return reasons
+
+
+# MinHash 签名
+def minhash_signature(tokens, num_perm: int = MINHASH_BANDS * MINHASH_ROWS) -> tuple:
+    """
+    参数:
+        tokens: 字符串集合（如 "numpy==1.26.4"）
+
+    返回值:
+        tuple: num_perm 个最小哈希值；空集合返回全为最大值的签名
+    """
+    hashes = [int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+              for token in set(tokens)]
+    signature = []
+    for i in range(num_perm):
+        # 第 i 个哈希函数 h(x) = (a*x + b) mod p，a/b 由 i 确定，保证每次运行结果相同
+        a = 1 + (i * 0x9E3779B1) % (_MERSENNE_PRIME - 1)
+        b = (i * 0x85EBCA77 + 0xC2B2AE3D) % _MERSENNE_PRIME
+        signature.append(min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in hashes) if hashes else _MAX_HASH)
+    return tuple(signature)
+
+
+# 找出近似重复的环境
+def near_duplicates(package_sets: dict, threshold: float = SIMILARITY) -> list:
+    """
+    参数:
+        package_sets: {环境名称: 包集合}
+        threshold: Jaccard 相似度阈值
+
+    返回值:
+        list: [(环境A, 环境B, 相似度)]，按相似度从高到低排列
+    """
+    buckets = {}
+    for env_name, tokens in package_sets.items():
+        if not tokens:
+            continue
+        signature = minhash_signature(tokens)
+        for band in range(MINHASH_BANDS):
+            key = (band,) + signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]
+            buckets.setdefault(key, []).append(env_name)
+
+    # 同一个桶里的环境是候选对，再精确计算相似度
+    candidates = set()
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                candidates.add((a, b) if a < b else (b, a))
+
+    pairs = []
+    for a, b in candidates:
+        set_a, set_b = package_sets[a], package_sets[b]
+        similarity = len(set_a & set_b) / len(set_a | set_b)
+        if similarity >= threshold:
+            pairs.append((a, b, similarity))
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return pairs
+
+
+# 生成回收报告
+def build_report(env_data: dict, stale_days: float = STALE_DAYS, similarity: float = SIMILARITY,
+                 workers: int = None, now: float = None) -> dict:
+    """
+    参数:
+        env_data: {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]}
+        stale_days: 超过多少天没有活动视为长期不用
+        similarity: 近似重复的相似度阈值
+        workers: 统计独占大小的线程数（主要是等待磁盘），默认由线程池决定
+        now: 当前时间（测试用）
+
+    返回值:
+        dict: {
+            "environments": {环境名: {"path", "last_activity", "idle_days", "exclusive_size", "broken", "duplicate_of"}},
+            "duplicates": [{"envs": [A, B], "similarity"}],
+            "reclaim": [{"env_name", "path", "reasons", "idle_days", "exclusive_size", "score"}]（按 score 从高到低）,
+            "summary": {"environments", "reclaimable", "reclaimable_bytes"}
+        }
+    """
+    now = time.time() if now is None else now
+    envs = {name: info for name, info in env_data.items() if name != "base" and not is_conda_root(info[0])}
+
+    # 独占大小要遍历整个环境目录，在线程池中并发统计
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        sizes = dict(zip(envs, pool.map(lambda info: disk_usage(info[0], exclusive=True), envs.values())))
+
+    environments = {}
+    package_sets = {}
+    for env_name, env_info in envs.items():
+        env_path = env_info[0]
+        packages = env_info[1] if len(env_info) > 1 else None
+        activity = last_activity(env_path)
+        environments[env_name] = {
+            "path": env_path,
+            "last_activity": activity,
+            "idle_days": (now - activity) / 86400 if activity is not None else None,
+            "exclusive_size": sizes[env_name],
+            "broken": broken_reasons(env_path, packages),
+            "duplicate_of": None,
+        }
+        if packages:
+            package_sets[env_name] = {f"{name}=={version}" for name, version in zip(packages[0], packages[1])}
+
+    # 近似重复的一对中，较久没有活动的那个作为回收候选
+    duplicates = near_duplicates(package_sets, similarity)
+    for a, b, _ in duplicates:
+        older, newer = sorted((a, b), key=lambda name: environments[name]["last_activity"] or 0)
+        if environments[older]["duplicate_of"] is None:
+            environments[older]["duplicate_of"] = newer
+
+    reclaim = []
+    for env_name, info in environments.items():
+        reasons = []
+        if info["broken"]:
+            reasons += info["broken"]
+        if info["idle_days"] is not None and info["idle_days"] >= stale_days:
+            reasons.append(f"{info['idle_days']:.0f} 天没有活动")
+        if info["duplicate_of"]:
+            reasons.append(f"与 {info['duplicate_of']} 近似重复")
+        if not reasons:
+            continue
+        # 可回收空间越大、闲置越久越靠前；损坏的环境无论大小都排在同等条件的前面
+        idle_days = info["idle_days"] or 0
+        score = (info["exclusive_size"] / 2 ** 20 + 1) * (1 + idle_days / 30) * (2 if info["broken"] else 1)
+        reclaim.append({
+            "env_name": env_name,
+            "path": info["path"],
+            "reasons": reasons,
+            "idle_days": info["idle_days"],
+            "exclusive_size": info["exclusive_size"],
+            "score": round(score, 2),
+        })
+    reclaim.sort(key=lambda item: (-item["score"], item["env_name"]))
+
+    return {
+        "environments": environments,
+        "duplicates": [{"envs": [a, b], "similarity": round(s, 4)} for a, b, s in duplicates],
+        "reclaim": reclaim,
+        "summary": {
+            "environments": len(environments),
+            "reclaimable": len(reclaim),
+            "reclaimable_bytes": sum(item["exclusive_size"] for item in reclaim),
+        },
+    }
+
+
+# 并发删除环境
+def remove_envs(manager, env_names: list, workers: int = 4, callback=None) -> dict:
+    """
+    参数:
+        manager: CondaEnvManager
+        env_names: 要删除的环境名称（无名环境为路径）
+        workers: 同时运行的删除命令数
+        callback: 每删除完一个环境调用 callback(环境名称, 是否成功)
+
+    返回值:
+        dict: {环境名称: 是否成功}
+    """
+    results = {}
+
+    def remove(env_name):
+        ok = manager.remove_env(env_name)
+        if callback is not None:
+            callback(env_name, ok)
+        return ok
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for env_name, ok in zip(env_names, pool.map(remove, env_names)):
+            results[env_name] = ok
+    return results
@@ -0,0 +1,320 @@
+# importUsage.py
+"""
+环境中包的使用情况统计：记录各环境实际导入了哪些顶层模块，汇总到数据库，找出装了却从未被导入的包
+
+采集（可选，按环境安装）:
+    在环境的 site-packages 中放入 conda_manager_usage.pth 和 _conda_manager_usage.py，
+    该环境的每个 Python 进程启动时由 .pth 导入钩子模块（不修改、也不覆盖环境中已有的 sitecustomize）。
+    钩子只注册一个 atexit 函数，进程退出时把 sys.modules 中的顶层模块名（去掉标准库）
+    一次性追加写入本地日志文件（一行 JSON，O_APPEND 写入），运行期间没有任何额外开销；
+    进程被强制结束时这一次的记录会丢失
+
+汇总:
+    aggregate() 从上次读到的位置继续读取各环境的日志，累加到数据库的 module_usage 表，
+    写入成功后才保存读取位置（日志只追加，不会被修改）
+
+报告:
+    模块名与包名的对应关系来自 conda-meta 中记录的文件列表和 pip 包的 RECORD；
+    不安装任何可导入模块的包（如 openssl、python 本身、命令行工具）不计入“未使用”
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from condaEnvManager import conda_path_file
+from sitePackagesScanner import normalize_name, site_packages_dirs
+
+# 钩子模块名和 .pth 文件名
+HOOK_MODULE = "_conda_manager_usage"
+PTH_FILE = "conda_manager_usage.pth"
+
+# 钩子模块的源码，{log_path} 在安装时替换为该环境的日志文件
+HOOK_SOURCE = '''# 由 Miniconda 环境管理器生成（importUsage.install_hook），删除本文件和 {pth_file} 即可停用
+import atexit
+import sys
+
+_LOG = {log_path!r}
+
+
+def _flush():
+    try:
+        import json
+        import os
+        import time
+        skip = set(getattr(sys, "stdlib_module_names", ())) | set(sys.builtin_module_names)
+        skip.update(("__main__", "__mp_main__", __name__))
+        names = sorted({{name.partition(".")[0] for name in list(sys.modules)}} - skip)
+        line = json.dumps({{"time": time.time(), "modules": names}}, separators=(",", ":")) + "\\n"
+        fd = os.open(_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except Exception:
+        pass
+
+
+atexit.register(_flush)
+'''
+
+
+# 日志目录
+def usage_dir() -> str:
+    """
+    与 conda_path.txt 放在同一目录下的 conda_usage/
+    """
+    return os.path.join(os.path.dirname(conda_path_file()), "conda_usage")
+
+
+# 环境的日志文件
+def log_file(env_path: str, log_dir: str = None) -> str:
+    """
+    文件名为 环境目录名-路径哈希.log，不同根目录下的同名环境不会冲突
+    """
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(env_path)).encode("utf-8")).hexdigest()[:12]
+    name = os.path.basename(os.path.normpath(env_path)) or "env"
+    return os.path.join(log_dir or usage_dir(), f"{name}-{key}.log")
+
+
+# 安装钩子
+def install_hook(env_path: str, log_dir: str = None) -> bool:
+    """
+    参数:
+        env_path: 环境路径
+        log_dir: 日志目录，默认为 usage_dir()
+
+    返回值:
+        bool: 是否安装成功（没有 site-packages 的环境返回False）
+    """
+    dirs = site_packages_dirs(env_path)
+    if not dirs:
+        return False
+    log_path = log_file(env_path, log_dir)
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        for site_dir in dirs:
+            with open(os.path.join(site_dir, HOOK_MODULE + ".py"), "w", encoding="utf-8") as f:
+                f.write(HOOK_SOURCE.format(log_path=log_path, pth_file=PTH_FILE))
+            with open(os.path.join(site_dir, PTH_FILE), "w", encoding="utf-8") as f:
+                f.write(f"import {HOOK_MODULE}\n")
+        return True
+    except OSError as e:
+        print(f"安装导入统计钩子失败 {env_path}: {e}")
+        return False
+
+
+# 卸载钩子
+def uninstall_hook(env_path: str) -> bool:
+    """
+    返回值:
+        bool: 是否已全部删除（钩子本来就不存在也返回True）
+    """
+    ok = True
+    for site_dir in site_packages_dirs(env_path):
+        for name in (PTH_FILE, HOOK_MODULE + ".py"):
+            try:
+                os.remove(os.path.join(site_dir, name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"删除导入统计钩子失败 {site_dir}: {e}")
+                ok = False
+    return ok
+
+
+# 是否已安装钩子
+def hook_installed(env_path: str) -> bool:
+    return any(os.path.exists(os.path.join(site_dir, PTH_FILE)) for site_dir in site_packages_dirs(env_path))
+
+
+# 读取汇总进度
+def load_offsets(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# 保存汇总进度
+def save_offsets(path: str, offsets: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(offsets, f)
+    os.replace(tmp_path, path)
+
+
+# 读取日志的新增部分
+def read_new_records(path: str, offset: int = 0):
+    """
+    只处理完整的行（进程可能正在写入最后一行），日志变短（被删除后重建）时从头读取
+
+    返回值:
+        tuple: ([{"time", "modules"}], 新的读取位置)
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return [], 0
+    if size < offset:
+        offset = 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(size - offset)
+    end = data.rfind(b"\n") + 1
+    records = []
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue    # 损坏的行（如磁盘写满时）跳过
+        if isinstance(record, dict) and isinstance(record.get("modules"), list):
+            records.append(record)
+    return records, offset + end
+
+
+# 汇总日志到数据库
+def aggregate(controller, env_paths: dict, log_dir: str = None) -> dict:
+    """
+    参数:
+        controller: MySQLController
+        env_paths: {env_name: env_path}，日志按环境路径对应到环境
+        log_dir: 日志目录，默认为 usage_dir()
+
+    返回值:
+        dict: {"envs": 有新记录的环境数, "runs": 新增的进程记录数, "saved": 是否写入成功}
+    """
+    log_dir = log_dir or usage_dir()
+    state_path = os.path.join(log_dir, "offsets.json")
+    offsets = load_offsets(state_path)
+    new_offsets = dict(offsets)
+    usage = {}
+    runs = 0
+    for env_name, env_path in env_paths.items():
+        path = log_file(env_path, log_dir)
+        key = os.path.basename(path)
+        records, new_offsets[key] = read_new_records(path, offsets.get(key, 0))
+        for record in records:
+            runs += 1
+            imported_at = datetime.fromtimestamp(record.get("time") or 0)
+            modules = usage.setdefault(env_name, {})
+            for module_name in record["modules"]:
+                count, last = modules.get(module_name, (0, imported_at))
+                modules[module_name] = (count + 1, max(last, imported_at))
+
+    saved = controller.save_module_usage(usage)
+    if saved:
+        save_offsets(state_path, new_offsets)
+    return {"envs": len(usage), "runs": runs, "saved": bool(saved)}
+
+
+# 顶层模块名
+def _top_level(relative_path: str):
+    """
+    site-packages 下的相对路径 -> 顶层模块名，不是模块的（元数据目录、.pth、脚本等）返回None
+    """
+    first = relative_path.replace("\\", "/").split("/", 1)
+    name = first[0]
+    if not name or name == "__pycache__" or name.endswith((".dist-info", ".egg-info", ".pth", ".egg-link")):
+        return None
+    if len(first) == 1:
+        # 单文件模块：foo.py、foo.cpython-311-x86_64-linux-gnu.so、foo.pyd
+        if not name.endswith((".py", ".so", ".pyd")):
+            return None
+        return name.split(".", 1)[0]
+    return name
+
+
+# 模块名 -> 提供该模块的包
+def module_owners(env_path: str) -> dict:
+    """
+    返回值:
+        dict: {顶层模块名: {规范化的包名}}，同一个模块可能由多个包提供（如命名空间包）
+    """
+    owners = {}
+
+    def add(package_name, relative_path):
+        module_name = _top_level(relative_path)
+        if module_name:
+            owners.setdefault(module_name, set()).add(normalize_name(package_name))
+
+    # conda 包：conda-meta 中记录的文件列表
+    meta_dir = os.path.join(env_path, "conda-meta")
+    try:
+        records = [entry.path for entry in os.scandir(meta_dir) if entry.name.endswith(".json")]
+    except OSError:
+        records = []
+    for record_path in records:
+        try:
+            with open(record_path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for path in record.get("files", ()):
+            marker = path.find("site-packages/")
+            if marker >= 0:
+                add(record.get("name", ""), path[marker + len("site-packages/"):])
+
+    # pip 包：dist-info 中的 RECORD（conda 安装的 python 包也有，结果相同）
+    for site_dir in site_packages_dirs(env_path):
+        try:
+            entries = list(os.scandir(site_dir))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.endswith(".dist-info"):
+                continue
+            package_name = entry.name[:-len(".dist-info")].rsplit("-", 1)[0]
+            try:
+                with open(os.path.join(entry.path, "RECORD"), "r", encoding="utf-8", errors="replace") as f:
+                    for line in f:
+                        add(package_name, line.split(",", 1)[0])
+            except OSError:
+                continue
+    return owners
+
+
+# 未使用的包报告
+def unused_report(env_data: dict, usage: dict) -> dict:
+    """
+    参数:
+        env_data: {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]}
+        usage: MySQLController.get_module_usage() 的结果
+
+    返回值:
+        dict: {env_name: {"observed": 是否有导入记录, "last_imported", "used": [包名], "unused": [包名],
+                          "no_modules": 不提供可导入模块的包数}}
+        没有导入记录（未安装钩子或还没运行过）的环境 unused 为空列表，不能据此判断
+    """
+    report = {}
+    for env_name, env_info in env_data.items():
+        env_path = env_info[0]
+        packages = env_info[1] if len(env_info) > 1 and env_info[1] else [[]]
+        modules = usage.get(env_name, {})
+        imported = set(modules)
+
+        provided = {}       # 规范化的包名 -> 该包提供的模块
+        for module_name, package_names in module_owners(env_path).items():
+            for package_name in package_names:
+                provided.setdefault(package_name, set()).add(module_name)
+
+        used, unused, no_modules = [], [], 0
+        for package_name in packages[0]:
+            package_modules = provided.get(normalize_name(package_name))
+            if not package_modules:
+                no_modules += 1
+            elif package_modules & imported:
+                used.append(package_name)
+            elif modules:
+                unused.append(package_name)
+        last_imported = max((info["last_imported"] for info in modules.values()), default=None)
+        report[env_name] = {
+            "observed": bool(modules),
+            "last_imported": last_imported.isoformat(sep=" ", timespec="seconds") if last_imported else None,
+            "used": sorted(used),
+            "unused": sorted(unused),
+            "no_modules": no_modules,
+        }
+    return report
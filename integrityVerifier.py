@@ -0,0 +1,275 @@
+# integrityVerifier.py
+"""
+按 conda-meta/*.json 中记录的 sha256 / size_in_bytes 校验环境中的文件，找出缺失、被修改和多出来的文件
+
+- 先比较文件大小，大小不对的直接判定为已修改，不再计算哈希
+- 需要计算哈希的文件分批交给进程池，每个文件分块读取
+- 每个文件的校验结果按 (大小, mtime) 缓存，再次校验时只重新计算变化过的文件
+- 含前缀占位符的文件安装时会被改写，记录中的 sha256 是改写前的值：有 sha256_in_prefix 时用它，否则只检查是否存在
+
+多出来的文件：只在"只包含某一个包的文件"的目录中查找（如 site-packages/numpy/），
+这样的目录中不属于任何包的文件记为该包的多余文件；bin/、site-packages/ 等多个包共用的目录不检查
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from condaEnvManager import conda_path_file
+from tracing import span
+
+# 分块读取大小
+CHUNK_SIZE = 1024 * 1024
+# 每个进程任务处理的文件数，减少进程间通信次数
+BATCH_SIZE = 64
+# 待哈希的数据量小于该值时在当前进程中计算，避免启动进程池的开销
+INLINE_BYTES = 8 * 1024 * 1024
+
+# 不参与多余文件检查的文件（Python 运行时生成的缓存）
+IGNORED_SUFFIXES = ('.pyc', '.pyo')
+IGNORED_DIRS = ('__pycache__',)
+
+
+# 校验缓存文件路径
+def cache_file(env_path: str) -> str:
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(env_path)).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(os.path.dirname(conda_path_file()), 'conda_verify_cache', key + '.json')
+
+
+# 读取校验缓存
+def load_cache(env_path: str) -> dict:
+    """
+    返回值:
+        dict: {相对路径: [size, mtime_ns, 期望的sha256, 是否一致]}
+    """
+    try:
+        with open(cache_file(env_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# 保存校验缓存
+def save_cache(env_path: str, cache: dict):
+    path = cache_file(env_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"保存校验缓存时出错: {e}")
+
+
+# 计算一批文件的 sha256（在子进程中运行）
+def hash_files(paths: list) -> list:
+    """
+    返回值:
+        list: 与 paths 对应的十六进制摘要，读取失败为 None
+    """
+    digests = []
+    for path in paths:
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            digests.append(digest.hexdigest())
+        except OSError:
+            digests.append(None)
+    return digests
+
+
+# 读取环境中所有包的文件记录
+def read_package_records(env_path: str) -> dict:
+    """
+    返回值:
+        dict: {包名: [(相对路径, 期望大小或None, 期望sha256或None), ...]}
+    """
+    meta_dir = os.path.join(env_path, 'conda-meta')
+    records = {}
+    try:
+        entries = [e for e in os.scandir(meta_dir) if e.name.endswith('.json')]
+    except OSError:
+        return records
+
+    for entry in entries:
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        files = []
+        paths = (record.get('paths_data') or {}).get('paths')
+        if paths:
+            for item in paths:
+                if item.get('path_type') in ('softlink', 'directory'):
+                    files.append((item['_path'], None, None))
+                elif item.get('prefix_placeholder'):
+                    # 安装时被改写过，只有新版本 conda 记录的 sha256_in_prefix 可信
+                    files.append((item['_path'], item.get('size_in_prefix'), item.get('sha256_in_prefix')))
+                else:
+                    files.append((item['_path'], item.get('size_in_bytes'), item.get('sha256')))
+        else:
+            files = [(path, None, None) for path in record.get('files', [])]
+        records[record.get('name', entry.name)] = files
+    return records
+
+
+# 查找多余的文件
+def find_extra_files(env_path: str, records: dict) -> dict:
+    """
+    在只包含某一个包的文件的目录中，找出不属于任何包的文件
+
+    返回值:
+        dict: {包名: [相对路径, ...]}
+    """
+    owners = {}     # 目录 -> 包名，多个包共用的目录为 None
+    owned = set()
+    for package_name, files in records.items():
+        for rel_path, _, _ in files:
+            rel_path = rel_path.replace('\\', '/')
+            owned.add(rel_path)
+            directory = rel_path.rpartition('/')[0]
+            if not directory:
+                continue
+            if owners.get(directory, package_name) != package_name:
+                owners[directory] = None
+            else:
+                owners[directory] = package_name
+
+    extra = {}
+    for directory, package_name in owners.items():
+        if package_name is None or directory.rpartition('/')[2] in IGNORED_DIRS:
+            continue
+        try:
+            entries = list(os.scandir(os.path.join(env_path, *directory.split('/'))))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False) or entry.name.endswith(IGNORED_SUFFIXES):
+                continue
+            rel_path = f"{directory}/{entry.name}"
+            if rel_path not in owned:
+                extra.setdefault(package_name, []).append(rel_path)
+    return extra
+
+
+# 校验单个环境
+def verify_env(env_path: str, pool: ProcessPoolExecutor = None, workers: int = None, use_cache: bool = True) -> dict:
+    """
+    校验单个环境
+
+    参数:
+        env_path: 环境路径
+        pool: 共享的进程池（校验多个环境时复用），不传则按需创建
+        workers: 新建进程池时的进程数
+        use_cache: 是否使用按 mtime 缓存的校验结果
+
+    返回值:
+        dict: {
+            "env_path": 路径,
+            "packages": {包名: {"missing": [...], "modified": [...], "extra": [...]}}（只包含有问题的包）,
+            "files": 检查的文件数, "hashed": 本次计算哈希的文件数, "cached": 命中缓存的文件数, "seconds": 耗时
+        }
+    """
+    start = time.perf_counter()
+    with span("verify.env", env_path=env_path) as s:
+        records = read_package_records(env_path)
+        cache = load_cache(env_path) if use_cache else {}
+        new_cache = {}
+        problems = {}
+        pending = []        # (包名, 相对路径, 完整路径, 期望sha256, size, mtime_ns)
+        pending_bytes = 0
+        file_count = 0
+        cached_count = 0
+
+        for package_name, files in records.items():
+            for rel_path, size, sha256 in files:
+                file_count += 1
+                full_path = os.path.join(env_path, *rel_path.replace('\\', '/').split('/'))
+                try:
+                    st = os.lstat(full_path)
+                except OSError:
+                    problems.setdefault(package_name, {}).setdefault("missing", []).append(rel_path)
+                    continue
+                if size is not None and st.st_size != size:
+                    problems.setdefault(package_name, {}).setdefault("modified", []).append(rel_path)
+                    continue
+                if not sha256:
+                    continue    # 没有哈希记录（软链接、目录、被改写的文件），存在即可
+
+                cached = cache.get(rel_path)
+                if cached and cached[:3] == [st.st_size, st.st_mtime_ns, sha256]:
+                    cached_count += 1
+                    new_cache[rel_path] = cached
+                    if not cached[3]:
+                        problems.setdefault(package_name, {}).setdefault("modified", []).append(rel_path)
+                    continue
+                pending.append((package_name, rel_path, full_path, sha256, st.st_size, st.st_mtime_ns))
+                pending_bytes += st.st_size
+
+        # 计算哈希：数据量小时直接在本进程计算
+        paths = [item[2] for item in pending]
+        if pending_bytes < INLINE_BYTES:
+            digests = hash_files(paths)
+        else:
+            batches = [paths[i:i + BATCH_SIZE] for i in range(0, len(paths), BATCH_SIZE)]
+            own_pool = pool is None
+            if own_pool:
+                pool = ProcessPoolExecutor(max_workers=workers)
+            try:
+                digests = [digest for batch in pool.map(hash_files, batches) for digest in batch]
+            finally:
+                if own_pool:
+                    pool.shutdown()
+
+        for (package_name, rel_path, _, sha256, size, mtime_ns), digest in zip(pending, digests):
+            if digest is None:
+                problems.setdefault(package_name, {}).setdefault("missing", []).append(rel_path)
+                continue
+            ok = digest == sha256
+            new_cache[rel_path] = [size, mtime_ns, sha256, ok]
+            if not ok:
+                problems.setdefault(package_name, {}).setdefault("modified", []).append(rel_path)
+
+        for package_name, rel_paths in find_extra_files(env_path, records).items():
+            problems.setdefault(package_name, {})["extra"] = sorted(rel_paths)
+
+        if use_cache:
+            save_cache(env_path, new_cache)
+        s.set(files=file_count, hashed=len(pending), cached=cached_count, problems=len(problems))
+
+    return {
+        "env_path": env_path,
+        "packages": {name: problems[name] for name in sorted(problems)},
+        "files": file_count,
+        "hashed": len(pending),
+        "cached": cached_count,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# 校验多个环境
+def verify_envs(env_paths: dict, workers: int = None, use_cache: bool = True, callback=None) -> dict:
+    """
+    校验多个环境，共用一个进程池
+
+    参数:
+        env_paths: {环境名称: 环境路径}
+        workers: 进程数，默认为 CPU 核数
+        use_cache: 是否使用校验缓存
+        callback: 每个环境校验完成后调用 callback(env_name, report)，用于界面逐个显示
+
+    返回值:
+        dict: {环境名称: verify_env 的返回值}
+    """
+    reports = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for env_name, env_path in env_paths.items():
+            reports[env_name] = verify_env(env_path, pool, use_cache=use_cache)
+            if callback is not None:
+                callback(env_name, reports[env_name])
+    return reports
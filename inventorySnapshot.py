@@ -0,0 +1,339 @@
+# inventorySnapshot.py
+"""
+清单快照的导出和导入：把全部环境和包（主机、环境、路径、Python 版本、包名、版本、build/渠道、来源、大小）
+按列存储到一个压缩文件中，便于导入分析工具，也可以在新机器上导入到本地数据库，首次启动直接读数据库
+
+格式（按文件扩展名选择，读取时按文件头自动识别）:
+    .parquet            Parquet（zstd 压缩），需要 pyarrow
+    .arrow / .feather   Arrow IPC 文件，需要 pyarrow
+    其他                 内置的紧凑二进制格式（不依赖第三方库）：
+                        文件头 CMSNAP1\\n + 列定义(JSON) ，之后是若干个块，
+                        每块为 [uint32 压缩后长度][zlib(行数 + 每列数据)]，长度为 0 表示结束；
+                        字符串列在块内做字典编码（去重后的字符串表 + uint32 下标），整数列为 int64
+
+导出和导入都按块流式处理，内存占用只与块大小有关
+"""
+import array
+import json
+import os
+import struct
+import sys
+import zlib
+
+# 快照中的列及类型
+COLUMNS = (
+    ('host_name', 'str'),
+    ('env_name', 'str'),
+    ('path', 'str'),
+    ('python_version', 'str'),
+    ('package_name', 'str'),
+    ('version', 'str'),
+    ('build_channel', 'str'),
+    ('source', 'str'),
+    ('size_bytes', 'int'),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+# 每块的行数
+CHUNK_ROWS = 20000
+
+MAGIC = b'CMSNAP1\n'
+_NULL_INDEX = 0xFFFFFFFF
+_NULL_INT = -1
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:     # 没有安装 pyarrow 时只能使用内置格式
+    pyarrow = None
+
+
+# 根据扩展名确定格式
+def format_of(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        return 'parquet'
+    if ext in ('.arrow', '.feather'):
+        return 'arrow'
+    return 'binary'
+
+
+# === 数据来源 ===
+
+# 读取环境中每个 conda 包的安装大小
+def conda_package_sizes(env_path: str) -> dict:
+    """
+    返回值:
+        dict: {包名: 安装后的大小（字节）}，没有 paths_data 的记录使用包文件大小
+    """
+    sizes = {}
+    meta_dir = os.path.join(env_path, 'conda-meta')
+    try:
+        entries = [e for e in os.scandir(meta_dir) if e.name.endswith('.json')]
+    except OSError:
+        return sizes
+    for entry in entries:
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        paths = (record.get('paths_data') or {}).get('paths')
+        if paths:
+            sizes[record.get('name')] = sum(item.get('size_in_bytes') or 0 for item in paths)
+        elif record.get('size') is not None:
+            sizes[record.get('name')] = record['size']
+    return sizes
+
+
+# 把内存中的环境数据转换为行
+def rows_from_env_data(env_data: dict, host_name: str, with_sizes: bool = True, chunk_rows: int = CHUNK_ROWS):
+    """
+    参数:
+        env_data: {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]}
+        host_name: 写入快照的主机名
+        with_sizes: 是否读取 conda-meta 计算每个包的大小
+
+    返回值:
+        生成器，每次产生一个按 COLUMNS 排列的元组列表
+    """
+    chunk = []
+    for env_name in sorted(env_data):
+        env_path, packages = env_data[env_name][0], env_data[env_name][1]
+        python_version = dict(zip(packages[0], packages[1])).get('python') if packages else None
+        sizes = conda_package_sizes(env_path) if with_sizes else {}
+        if not packages or not packages[0]:
+            chunk.append((host_name, env_name, env_path, python_version, None, None, None, None, None))
+        else:
+            sources = packages[3] if len(packages) > 3 else ['conda'] * len(packages[0])
+            for name, version, build, source in zip(packages[0], packages[1], packages[2], sources):
+                size = sizes.get(name) if source != 'pip' else None
+                chunk.append((host_name, env_name, env_path, python_version, name, version, build, source, size))
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# 数据库中的行补上大小列
+def rows_from_database(controller, all_hosts: bool = False, chunk_rows: int = CHUNK_ROWS):
+    for rows in controller.iter_inventory_rows(chunk_rows, all_hosts):
+        yield [row + (None,) for row in rows]
+
+
+# === 内置二进制格式 ===
+
+# 文件中的整数统一为小端序，大端机器上读写时需要交换
+def _little_endian(values: array.array) -> array.array:
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+# 编码一个块
+def _encode_chunk(rows: list) -> bytes:
+    parts = [struct.pack('<I', len(rows))]
+    for i, (_, kind) in enumerate(COLUMNS):
+        if kind == 'int':
+            values = array.array('q', (_NULL_INT if row[i] is None else row[i] for row in rows))
+            parts.append(_little_endian(values).tobytes())
+            continue
+        # 字符串列做块内字典编码
+        table = {}
+        indices = array.array('I')
+        for row in rows:
+            value = row[i]
+            if value is None:
+                indices.append(_NULL_INDEX)
+            else:
+                indices.append(table.setdefault(value, len(table)))
+        strings = '\0'.join(table).encode('utf-8')
+        parts.append(struct.pack('<II', len(table), len(strings)))
+        parts.append(strings)
+        parts.append(_little_endian(indices).tobytes())
+    return zlib.compress(b''.join(parts), 6)
+
+
+# 解码一个块
+def _decode_chunk(data: bytes) -> dict:
+    data = memoryview(zlib.decompress(data))
+    count = struct.unpack_from('<I', data, 0)[0]
+    offset = 4
+    columns = {}
+    for name, kind in COLUMNS:
+        if kind == 'int':
+            values = array.array('q')
+            values.frombytes(data[offset:offset + count * 8])
+            _little_endian(values)
+            offset += count * 8
+            columns[name] = [None if v == _NULL_INT else v for v in values]
+            continue
+        table_size, strings_size = struct.unpack_from('<II', data, offset)
+        offset += 8
+        table = bytes(data[offset:offset + strings_size]).decode('utf-8').split('\0') if table_size else []
+        offset += strings_size
+        indices = array.array('I')
+        indices.frombytes(data[offset:offset + count * 4])
+        _little_endian(indices)
+        offset += count * 4
+        columns[name] = [None if index == _NULL_INDEX else table[index] for index in indices]
+    return columns
+
+
+# === 导出 ===
+
+# 导出快照
+def write_snapshot(path: str, row_chunks, fmt: str = None) -> int:
+    """
+    参数:
+        path: 输出文件
+        row_chunks: 产生按 COLUMNS 排列的元组列表的可迭代对象（rows_from_database / rows_from_env_data）
+        fmt: parquet / arrow / binary，不传则按扩展名确定
+
+    返回值:
+        int: 写出的行数
+    """
+    fmt = fmt or format_of(path)
+    if fmt in ('parquet', 'arrow') and pyarrow is None:
+        raise RuntimeError(f"导出 {fmt} 格式需要安装 pyarrow（pip install pyarrow），或使用 .cmsnap 扩展名导出内置格式")
+
+    total = 0
+    tmp_path = path + '.tmp'
+    if fmt == 'binary':
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            header = json.dumps({"columns": COLUMNS}).encode('utf-8')
+            f.write(struct.pack('<I', len(header)) + header)
+            for rows in row_chunks:
+                if not rows:
+                    continue
+                block = _encode_chunk(rows)
+                f.write(struct.pack('<I', len(block)) + block)
+                total += len(rows)
+            f.write(struct.pack('<I', 0))
+    else:
+        schema = pyarrow.schema([
+            (name, pyarrow.int64() if kind == 'int' else pyarrow.string()) for name, kind in COLUMNS
+        ])
+        if fmt == 'parquet':
+            writer = pyarrow.parquet.ParquetWriter(tmp_path, schema, compression='zstd')
+            write = writer.write_table
+        else:
+            sink = pyarrow.OSFile(tmp_path, 'wb')
+            writer = pyarrow.ipc.new_file(sink, schema, options=pyarrow.ipc.IpcWriteOptions(compression='zstd'))
+            write = writer.write_table
+        try:
+            for rows in row_chunks:
+                if not rows:
+                    continue
+                columns = list(zip(*rows))
+                write(pyarrow.Table.from_arrays([pyarrow.array(c, t) for c, t in zip(columns, schema.types)],
+                                                schema=schema))
+                total += len(rows)
+        finally:
+            writer.close()
+            if fmt == 'arrow':
+                sink.close()
+    os.replace(tmp_path, path)
+    return total
+
+
+# === 导入 ===
+
+# 流式读取快照
+def read_snapshot(path: str):
+    """
+    返回值:
+        生成器，每次产生一个 {列名: 值列表} 的块
+    """
+    with open(path, 'rb') as f:
+        head = f.read(8)
+
+    if head == MAGIC:
+        with open(path, 'rb') as f:
+            f.seek(len(MAGIC))
+            header_size = struct.unpack('<I', f.read(4))[0]
+            header = json.loads(f.read(header_size))
+            if [name for name, _ in header["columns"]] != list(COLUMN_NAMES):
+                raise ValueError("快照的列与当前版本不一致")
+            while True:
+                size = struct.unpack('<I', f.read(4))[0]
+                if size == 0:
+                    break
+                yield _decode_chunk(f.read(size))
+        return
+
+    if pyarrow is None:
+        raise RuntimeError("读取 Parquet / Arrow 快照需要安装 pyarrow")
+    if head[:4] == b'PAR1':
+        batches = pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=CHUNK_ROWS)
+        for batch in batches:
+            yield batch.to_pydict()
+    else:
+        with pyarrow.OSFile(path, 'rb') as source:
+            reader = pyarrow.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pydict()
+
+
+# 把快照按环境分组
+def iter_snapshot_envs(path: str):
+    """
+    按 (host_name, env_name) 分组产生环境数据；快照按主机和环境排序写出，同一环境的行是连续的，
+    因此只需要保存当前这一个环境的包
+
+    返回值:
+        生成器，每次产生 (host_name, env_name, [env_path, [names, versions, builds, sources]])
+    """
+    current = None
+    env_info = None
+    for columns in read_snapshot(path):
+        for row in zip(*(columns[name] for name in COLUMN_NAMES)):
+            host_name, env_name, env_path, _, package_name, version, build, source, _ = row
+            if (host_name, env_name) != current:
+                if current is not None:
+                    yield current[0], current[1], env_info
+                current = (host_name, env_name)
+                env_info = [env_path, [[], [], [], []]]
+            if package_name is not None:
+                packages = env_info[1]
+                packages[0].append(package_name)
+                packages[1].append(version or '')
+                packages[2].append(build or '')
+                packages[3].append(source or 'conda')
+    if current is not None:
+        yield current[0], current[1], env_info
+
+
+# 导入快照到数据库
+def import_snapshot(path: str, controller_for_host, host_name: str = None, batch_envs: int = 50) -> dict:
+    """
+    把快照导入数据库，每 batch_envs 个环境提交一次事务
+
+    参数:
+        path: 快照文件
+        controller_for_host: 根据主机名返回 MySQLController 的函数
+        host_name: 指定后所有环境都导入到该主机名下（如在新机器上用别的机器的快照预热本地数据库）
+
+    返回值:
+        dict: {主机名: 导入的环境数}，导入失败的批次不计入
+    """
+    imported = {}
+    pending = {}
+    pending_host = None
+
+    def flush():
+        if pending and controller_for_host(pending_host).apply_delta(pending, [], scope="snapshot-import"):
+            imported[pending_host] = imported.get(pending_host, 0) + len(pending)
+        pending.clear()
+
+    for snapshot_host, env_name, env_info in iter_snapshot_envs(path):
+        target_host = host_name or snapshot_host
+        if target_host != pending_host or len(pending) >= batch_envs:
+            flush()
+            pending_host = target_host
+        pending[env_name] = env_info
+    flush()
+    return imported
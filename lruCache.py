@@ -0,0 +1,67 @@
+# lruCache.py
+"""
+线程安全的 LRU 缓存：超过容量时淘汰最久未使用的条目
+
+用于按环境缓存包列表、详情面板数据和数据库查询结果
+"""
+import threading
+from collections import OrderedDict
+
+# 缺省值标记（区分"没有缓存"和"缓存的值为 None"）
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, capacity: int = 32):
+        """
+        参数:
+            capacity: 最多保存的条目数
+        """
+        self.capacity = capacity
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # 读取（命中的条目移到最新）
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    # 写入，超过容量时淘汰最旧的条目
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+    # 删除单个条目
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    # 清空
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    # 当前缓存的键（旧的在前）
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
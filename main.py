@@ -1,27 +1,43 @@
 # main.py
+import startupProfiler      # 最先导入，启动耗时从这里开始计算
 import sys
 import os
 import time
-from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTreeWidget, QTreeWidgetItem, QTabWidget, QLabel, QTextEdit,
-    QPushButton, QToolBar, QStatusBar, QMessageBox, QLineEdit, QFormLayout, QFileDialog, QInputDialog
-)
-from PySide6.QtCore import Qt, QSize, Slot, QObject, QThread, Signal
-
-from condaEnvManager import CondaEnvManager
-from mysqlcontroller import MySQLController
-import mysqlcontroller
+import threading
+import contextlib
+
+# 只在模块级导入显示窗口必需的模块；数据库驱动（pymysql）、文件监视、校验、版本索引、锁定文件等
+# 在窗口显示之后、第一次用到时才导入
+with startupProfiler.phase("import.qt"):
+    from PySide6.QtWidgets import (
+        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+        QTreeWidget, QTreeWidgetItem, QTreeView, QAbstractItemView, QTabWidget, QLabel, QTextEdit,
+        QPushButton, QToolBar, QStatusBar, QMessageBox, QLineEdit, QFormLayout, QFileDialog, QInputDialog,
+        QComboBox, QCheckBox
+    )
+    from PySide6.QtCore import Qt, QSize, Slot, QObject, QThread, Signal, QTimer
+
+with startupProfiler.phase("import.project"):
+    from condaEnvManager import CondaEnvManager, CondaExecutor, SOLVER_BACKENDS, load_saved_conda_path, load_saved_conda_paths, save_conda_path
+    from condaApi import CondaApiClient
+    from lruCache import LRUCache, MISSING
+    from envTreeModel import EnvTreeModel, EnvFilterProxyModel, COLUMN_NAME, format_size
+    from envDetails import EnvDetailLoader
+    import tracing
+    from tracing import span
 
 # 高耗时后台任务类 CondaWorker 
 class CondaWorker(QObject):
     """
     在子线程中执行，用来执行 conda 创建/删除环境操作，安装/卸载包操作
     """
-    finished = Signal(bool, str)  # 定义信号 finished(是否成功, 环境名/包名)
+    # 定义信号 finished(是否成功, 环境名/包名, 操作类型, 受影响的环境名, 该环境的最新信息)
+    # 环境最新信息为 [env_path, packages]，环境被删除时为 None
+    finished = Signal(bool, str, str, str, object)
 
     # 构造函数，传入conda安装路径、环境名、Python版本、操作类型
-    def __init__(self, conda_path, env_name, py_version=None, operation=None, package_name=None, package_version=None):
+    def __init__(self, conda_path, env_name, py_version=None, operation=None, package_name=None, package_version=None,
+                 executor=None, backend=None, lockfile=None):
         super().__init__()
         self.conda_path = conda_path
         self.env_name = env_name
@@ -29,32 +45,223 @@ class CondaWorker(QObject):
         self.operation = operation
         self.package_name = package_name
         self.package_version = package_version
+        self.executor = executor        # 共享的执行器，用于记录耗时
+        self.backend = backend          # 本次操作使用的后端，None 则使用执行器的全局后端
+        self.lockfile = lockfile        # 创建环境时使用的锁定文件，None 则按 Python 版本创建
 
     # 运行函数
     def run(self):
         """
         根据传入的操作类型执行对应指令
         """
-        conda_manager = CondaEnvManager(self.conda_path)    # 创建CondaEnvManager对象
+        conda_manager = CondaEnvManager(self.conda_path, executor=self.executor)    # 创建CondaEnvManager对象
         success = False
         
-        if self.operation == 'create':       # 创建环境
-            success = conda_manager.create_env(self.env_name, self.py_version)
+        if self.operation == 'create' and self.lockfile:    # 从锁定文件创建环境
+            success = conda_manager.create_env_from_lockfile(self.env_name, self.lockfile, self.backend)
+            result_name = self.env_name
+        elif self.operation == 'create':     # 创建环境
+            success = conda_manager.create_env(self.env_name, self.py_version, self.backend)
             result_name = self.env_name
         elif self.operation == 'remove':     # 删除环境
-            success = conda_manager.remove_env(self.env_name)
+            success = conda_manager.remove_env(self.env_name, self.backend)
             result_name = self.env_name
         elif self.operation == 'install':    # 安装包
-            success = conda_manager.install_package(self.env_name, self.package_name, self.package_version)
+            success = conda_manager.install_package(self.env_name, self.package_name, self.package_version, self.backend)
             result_name = self.package_name
         elif self.operation == 'uninstall':  # 卸载包
-            success = conda_manager.uninstall_package(self.env_name, self.package_name)
+            success = conda_manager.uninstall_package(self.env_name, self.package_name, self.backend)
             result_name = self.package_name
         else:
             success = False
             result_name = ""
 
-        self.finished.emit(success, result_name)  # 运行完成，发送信号
+        # 只重新获取受影响的这一个环境，删除环境则不需要获取
+        env_info = None
+        if success and self.operation in ('create', 'install', 'uninstall'):
+            env_info = conda_manager.get_env_inventory(self.env_name)
+
+        self.finished.emit(success, result_name, self.operation or "", self.env_name, env_info)  # 运行完成，发送信号
+
+
+# 后台局部刷新任务类 InventoryWorker
+class InventoryWorker(QObject):
+    """
+    在子线程中执行，重新获取若干个环境的包信息（由文件监视触发，不弹出运行对话框）
+    """
+    envInventoried = Signal(str, object)    # 定义信号 envInventoried(环境名, [env_path, packages] 或 None 表示已删除)
+    finished = Signal()
+
+    # 构造函数，传入conda安装路径和 {环境名: 已知路径}
+    def __init__(self, conda_path, env_paths: dict, executor=None):
+        super().__init__()
+        self.conda_path = conda_path
+        self.env_paths = env_paths
+        self.executor = executor
+
+    # 运行函数
+    def run(self):
+        conda_manager = CondaEnvManager(self.conda_path, executor=self.executor)
+        # 文件监视触发的刷新按后台优先级排队，不挡住用户的操作
+        with conda_manager.executor.scheduler.background():
+            for env_name, env_path in self.env_paths.items():
+                env_info = conda_manager.get_env_inventory(env_name)
+                if env_info is None and env_path and os.path.isdir(os.path.join(env_path, "conda-meta")):
+                    continue    # 环境还在，只是这次没获取到（如 conda 被占用），跳过
+                self.envInventoried.emit(env_name, env_info)
+        self.finished.emit()
+
+
+# 最多缓存多少个环境的包列表
+PACKAGE_CACHE_SIZE = 16
+# 选中环境时预取上下各几个相邻环境的包列表
+PREFETCH_NEIGHBOURS = 2
+
+
+# 后台包列表加载任务类 PackageLoadWorker
+class PackageLoadWorker(QObject):
+    """
+    在子线程中执行，按需从数据库加载若干个环境的包列表（数据库不可用时退回调用 conda）
+    """
+    packagesLoaded = Signal(str, object)    # 定义信号 packagesLoaded(环境名, 包信息列表 或 None 表示加载失败)
+    finished = Signal()
+
+    # 构造函数，传入conda安装路径、{环境名: 环境路径} 和后台写入器（还没写入数据库的数据以它为准）
+    def __init__(self, conda_path, env_paths: dict, executor=None, persister=None):
+        super().__init__()
+        self.conda_path = conda_path
+        self.env_paths = env_paths
+        self.executor = executor
+        self.persister = persister
+
+    # 运行函数
+    def run(self):
+        from queryCache import CachedMySQLController
+        controller = CachedMySQLController()    # 与界面共用进程内缓存，重复选中同一环境时不再查询数据库
+        conda_manager = None
+        for index, (env_name, env_path) in enumerate(self.env_paths.items()):
+            pending = self.persister.pending(env_name) if self.persister is not None else MISSING
+            if pending is not MISSING and pending is not None:
+                self.packagesLoaded.emit(env_name, pending[1])
+                continue
+            packages = controller.load_env_packages(env_name)
+            if packages is None and self.conda_path:
+                if conda_manager is None:
+                    conda_manager = CondaEnvManager(self.conda_path, executor=self.executor)
+                # 第一个是选中的环境，其余是预取的相邻环境，按后台优先级排队
+                scheduler = conda_manager.executor.scheduler
+                with scheduler.background() if index else contextlib.nullcontext():
+                    packages = conda_manager.get_packages_in_env(env_name, env_path)
+            self.packagesLoaded.emit(env_name, packages)
+        self.finished.emit()
+
+
+# 后台完整性校验任务类 VerifyWorker
+class VerifyWorker(QObject):
+    """
+    在子线程中执行，按 conda-meta 记录校验若干个环境的文件（哈希计算在进程池中进行）
+    """
+    envVerified = Signal(str, object)       # 定义信号 envVerified(环境名, 校验报告)
+    finished = Signal()
+
+    # 构造函数，传入 {环境名: 环境路径}
+    def __init__(self, env_paths: dict):
+        super().__init__()
+        self.env_paths = env_paths
+
+    # 运行函数
+    def run(self):
+        from integrityVerifier import verify_envs
+        verify_envs(self.env_paths, callback=self.envVerified.emit)
+        self.finished.emit()
+
+
+# 后台可用版本索引刷新任务类 RepodataWorker
+class RepodataWorker(QObject):
+    """
+    在子线程中执行，解析 pkgs/cache 中变化过的 repodata 文件并更新可用版本索引
+    """
+    finished = Signal(bool)     # 定义信号 finished(索引是否有变化)
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+
+    # 运行函数
+    def run(self):
+        self.finished.emit(self.index.refresh())
+
+
+# 后台环境大小计算任务类 EnvSizeWorker
+class EnvSizeWorker(QObject):
+    """
+    在子线程中执行，按 conda-meta 记录的文件大小汇总若干个环境的安装大小（不遍历环境目录）
+    """
+    envSized = Signal(str, object)      # 定义信号 envSized(环境名, 大小（字节）)
+    finished = Signal()
+
+    # 构造函数，传入 {环境名: 环境路径}
+    def __init__(self, env_paths: dict):
+        super().__init__()
+        self.env_paths = env_paths
+
+    # 运行函数
+    def run(self):
+        from inventorySnapshot import conda_package_sizes
+        for env_name, env_path in self.env_paths.items():
+            self.envSized.emit(env_name, sum(conda_package_sizes(env_path).values()))
+        self.finished.emit()
+
+
+# 后台环境详情加载任务类 EnvDetailWorker
+class EnvDetailWorker(QObject):
+    """
+    在子线程中执行，加载选中环境的简介、包数量、磁盘占用和最后修改时间，每加载一部分就发出一次信号；
+    cancel 事件被设置（选中了别的环境）时在阶段之间或统计磁盘占用的过程中停止
+    """
+    detailLoaded = Signal(str, object)  # 定义信号 detailLoaded(环境名, 已加载的详情字典)
+    finished = Signal()
+
+    # 构造函数，传入共享的详情加载器、环境名称、路径和取消事件（threading.Event）
+    def __init__(self, loader: EnvDetailLoader, env_name: str, env_path: str, cancel):
+        super().__init__()
+        self.loader = loader
+        self.env_name = env_name
+        self.env_path = env_path
+        self.cancel = cancel
+
+    # 运行函数
+    def run(self):
+        for details in self.loader.load(self.env_path, should_stop=self.cancel.is_set):
+            self.detailLoaded.emit(self.env_name, details)
+        self.finished.emit()
+
+
+# 后台表结构检查任务类 SchemaWorker
+class SchemaWorker(QObject):
+    """
+    在子线程中执行，启动时检查（必要时创建/升级）数据库表结构，数据库连接慢或不可用时不阻塞窗口
+    """
+    finished = Signal(object)   # 定义信号 finished(环境表是否已存在，None 表示数据库不可用)
+
+    # 运行函数
+    def run(self):
+        import mysqlcontroller
+        with startupProfiler.phase("db.schema"):
+            result = mysqlcontroller.ensure_schema()
+        self.finished.emit(result)
+
+
+# 后台写入结果通知 PersistNotifier
+class PersistNotifier(QObject):
+    """
+    把后台写入线程的回调转为信号，在界面线程中处理
+    """
+    persisted = Signal(bool, object)    # 定义信号 persisted(是否成功, 环境名称列表)
+
+
+# 窗口没有收到绘制事件时，最迟多久后开始启动流程（毫秒）
+BOOT_FALLBACK_MS = 1000
 
 
 # 主窗口类
@@ -85,21 +292,105 @@ class CondaEnvManagerGUI(QMainWindow):
 
         # 全局变量
         self.conda_path = None                      # str，存储conda安装路径
-        self.envdir = {}                            # dict，存储环境信息 —— key: 环境名称, value: 环境信息
+        self.envdir = {}                            # dict，存储环境信息 —— key: 环境名称, value: [环境路径, None]（包列表按需加载到 package_cache）
+        self.package_cache = LRUCache(PACKAGE_CACHE_SIZE)   # 按环境缓存的包列表 —— key: 环境名称, value: 包信息列表
+        self.package_failed = set()                 # set，上次加载包列表失败的环境（不缓存，下次选中时重试）
+        self.package_counts = {}                    # dict，每个环境的包数量 —— key: 环境名称, value: int
+        self.package_pending = {}                   # dict，等待加载包列表的环境 —— key: 环境名称, value: 环境路径
+        self.package_thread = None                  # 后台包列表加载线程
+        self.env_sizes = {}                         # dict，每个环境的安装大小 —— key: 环境名称, value: 字节数
+        self.size_pending = {}                      # dict，等待计算大小的环境 —— key: 环境名称, value: 环境路径
+        self.size_thread = None                     # 后台大小计算线程
+        self.detail_loader = EnvDetailLoader()      # 环境详情（简介、包数量、磁盘占用）的加载器，按 mtime 缓存
+        self.detail_pending = None                  # tuple，等待加载详情的环境 (环境名称, 环境路径)，只保留最后一次选中的
+        self.detail_thread = None                   # 后台详情加载线程
+        self.detail_cancel = None                   # threading.Event，选中别的环境时设置，让正在进行的详情加载尽快停止
+        self.detail_loading = None                  # str，正在加载详情的环境路径
         self.python_version = {}                    # dict，存储Python版本 —— key:环境名称, value:Python版本
         self.running_dialog = None                  # 用于“运行中”弹窗
-        self.sql_controller = MySQLController()     # 数据库控制对象
+        self.sql_controller = None                  # 数据库控制对象（重复的查询由进程内缓存回答），窗口显示后创建
+        self.persist_notifier = PersistNotifier()   # 后台写入结果通知
+        self.persist_notifier.persisted.connect(self._on_persisted)
+        self.persister = None                       # 后台写入器，窗口显示后创建
+        self.executor = CondaExecutor()             # conda 执行器，所有操作共享以便比较各后端耗时
+        self.env_watcher = None                     # 文件系统监视器，在首次获得conda路径后创建
+        self.inventory_pending = {}                 # dict，等待后台局部刷新的环境 —— key:环境名称, value:环境路径
+        self.inventory_thread = None                # 后台局部刷新线程
+        self.verify_thread = None                   # 后台完整性校验线程
+        self.repodata_index = None                  # 可用版本索引（pkgs/cache 中的 repodata）
+        self.repodata_ready = False                 # bool，索引是否已刷新完成，可用于查询
+        self.repodata_thread = None                 # 后台索引刷新线程
         self.read_DataBase = False                  # bool，判断是否要读数据库 —— 数据不存在或落后，就设定False
-        
-        # 判断是否为第一次运行
-        if mysqlcontroller.env_table_exist() == False:
-            self.read_DataBase = False
-            mysqlcontroller.create_databaseANDTable()   # 创建空数据库和表
-        else:
-            self.read_DataBase = True
+        self.schema_thread = None                   # 启动时的表结构检查线程
+        self.booted = False                         # bool，是否已开始启动流程
+
+        # 先显示窗口：数据库检查和环境加载在首次绘制之后进行，期间按钮不可用
+        self._disable_all_buttons()
+        self.refresh_btn.setEnabled(False)
+        self.verify_btn.setEnabled(False)
+        self.status_bar.showMessage("正在启动...")
+        # 正常情况下由首次绘制触发启动流程；窗口没有收到绘制事件（如最小化启动）时超时后也会启动
+        QTimer.singleShot(BOOT_FALLBACK_MS, self._boot)
+
+    # 首次绘制后开始启动流程
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.booted:
+            startupProfiler.mark("first_paint")
+            QTimer.singleShot(0, self._boot)
+
+    # 启动流程（窗口已显示）
+    def _boot(self):
+        """
+        导入数据库模块、创建后台写入器，在后台检查表结构，检查完成后再加载环境
+        """
+        if self.booted:
+            return
+        self.booted = True
+        with startupProfiler.phase("import.deferred"):
+            from queryCache import CachedMySQLController
+            from writeBehind import WriteBehindPersister
+        self.sql_controller = CachedMySQLController()
+        # 后台写入器：扫描结果先更新界面，数据库在写入线程中追上（合并同一环境的多次更新，失败时退避重试）
+        self.persister = WriteBehindPersister(self.sql_controller, callback=self.persist_notifier.persisted.emit)
+
+        self.status_bar.showMessage("正在检查数据库...")
+        self.schema_thread = QThread()
+        self.schema_worker = SchemaWorker()
+        self.schema_worker.moveToThread(self.schema_thread)
+        self.schema_thread.started.connect(self.schema_worker.run)
+        self.schema_worker.finished.connect(self._on_schema_checked)
+        self.schema_worker.finished.connect(self.schema_thread.quit)
+        self.schema_worker.finished.connect(self.schema_worker.deleteLater)
+        self.schema_thread.finished.connect(self.schema_thread.deleteLater)
+        self.schema_thread.start()
+
+    # 表结构检查完成
+    def _on_schema_checked(self, table_existed):
+        """
+        参数:
+            table_existed: 环境表是否已存在（True 从数据库读取，False 为首次运行），None 表示数据库不可用
+        """
+        self.schema_thread = None
+        # 首次运行或数据库不可用时调用 conda 获取环境（数据库不可用时写入会在后台重试）
+        self.read_DataBase = bool(table_existed)
+        self.refresh_btn.setEnabled(True)
+        self.verify_btn.setEnabled(True)
+        self._enable_all_buttons()
+        self.status_bar.showMessage("就绪" if table_existed is not None else "数据库不可用，环境信息不会保存")
 
         # 初始化树
-        self.on_refresh_envsList()
+        with startupProfiler.phase("data.load"):
+            self.on_refresh_envsList()
+        startupProfiler.mark("ready")
+        if startupProfiler.enabled:
+            text = startupProfiler.format_report()
+            print(text)
+            self.log_text.append(text)
+        else:
+            first_paint = startupProfiler.mark_ms("first_paint")
+            if first_paint is not None and first_paint > startupProfiler.FIRST_PAINT_TARGET_MS:
+                self.log_text.append(f"启动较慢：首次绘制用了 {first_paint:.0f} ms，可用 --profile-startup 查看各阶段耗时")
 
     # 界面布局
     def UIConstruct(self):
@@ -115,15 +406,33 @@ class CondaEnvManagerGUI(QMainWindow):
         self.setCentralWidget(central_widget)
         main_layout = QHBoxLayout(central_widget)
 
-        # === 左侧：环境树形列表 ===
-        self.env_tree = QTreeWidget()
-        self.env_tree.setHeaderLabels(["环境名称", "Python 版本", "路径"])
+        # === 左侧：过滤框和环境列表 ===
+        left_layout = QVBoxLayout()
+        self.env_filter_input = QLineEdit()
+        self.env_filter_input.setPlaceholderText("按环境名称、路径或 Python 版本过滤..")
+        self.env_filter_input.setClearButtonEnabled(True)
+        left_layout.addWidget(self.env_filter_input)
+
+        # 环境列表由模型驱动，刷新时只增删改有变化的行，选中状态和滚动位置保持不变
+        self.env_model = EnvTreeModel(self)
+        self.env_proxy = EnvFilterProxyModel(self)
+        self.env_proxy.setSourceModel(self.env_model)
+        self.env_filter_input.textChanged.connect(self.env_proxy.set_pattern)
+
+        self.env_tree = QTreeView()
+        self.env_tree.setModel(self.env_proxy)
+        self.env_tree.setRootIsDecorated(False)
+        self.env_tree.setUniformRowHeights(True)
+        self.env_tree.setSortingEnabled(True)
+        self.env_tree.sortByColumn(COLUMN_NAME, Qt.AscendingOrder)
         self.env_tree.setColumnWidth(0, 180)
         self.env_tree.setColumnWidth(1, 100)
         self.env_tree.setAlternatingRowColors(True)
-        self.env_tree.setSelectionMode(QTreeWidget.SingleSelection)
-        self.env_tree.itemSelectionChanged.connect(self.on_env_selected_showDetail)
-        main_layout.addWidget(self.env_tree, 2)
+        self.env_tree.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.env_tree.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.env_tree.selectionModel().selectionChanged.connect(lambda selected, deselected: self.on_env_selected_showDetail())
+        left_layout.addWidget(self.env_tree)
+        main_layout.addLayout(left_layout, 2)
 
         # === 右侧：搜索栏和详情面板 ===
         # 创建右侧的垂直布局
@@ -158,9 +467,16 @@ class CondaEnvManagerGUI(QMainWindow):
         self.path_label = QLabel()
         self.python_version_label = QLabel()
         self.introduction_label = QLabel()
+        self.package_count_label = QLabel()
+        self.disk_size_label = QLabel()
+        self.modified_label = QLabel()
         info_layout.addRow("环境名称:", self.name_label)
         info_layout.addRow("路径:", self.path_label)
         info_layout.addRow("Python 版本:", self.python_version_label)
+        info_layout.addRow("包数量:", self.package_count_label)
+        self.disk_size_label.setToolTip("遍历环境目录统计的实际占用（硬链接的文件只计一次）；环境列表中的安装大小只统计 conda-meta 中记录的包")
+        info_layout.addRow("磁盘占用:", self.disk_size_label)
+        info_layout.addRow("最后修改:", self.modified_label)
         info_layout.addRow("简介:", self.introduction_label)
         self.detail_tabs.addTab(self.info_widget, "基本信息")
 
@@ -174,6 +490,47 @@ class CondaEnvManagerGUI(QMainWindow):
         self.log_text.setReadOnly(True)
         self.detail_tabs.addTab(self.log_text, "操作日志")
 
+        # 标签页4：诊断（耗时追踪）
+        self.diagnostics_widget = QWidget()
+        diagnostics_layout = QVBoxLayout(self.diagnostics_widget)
+        diagnostics_bar = QHBoxLayout()
+        self.trace_checkbox = QCheckBox("启用耗时追踪")
+        self.trace_checkbox.setChecked(tracing.is_enabled())
+        self.trace_checkbox.toggled.connect(self.on_trace_toggled)
+        self.trace_refresh_btn = QPushButton("刷新")
+        self.trace_clear_btn = QPushButton("清空")
+        self.trace_export_btn = QPushButton("导出 Chrome trace")
+        self.trace_refresh_btn.clicked.connect(self.on_refresh_diagnostics)
+        self.trace_clear_btn.clicked.connect(self.on_clear_diagnostics)
+        self.trace_export_btn.clicked.connect(self.on_export_trace)
+        diagnostics_bar.addWidget(self.trace_checkbox)
+        diagnostics_bar.addStretch()
+        diagnostics_bar.addWidget(self.trace_refresh_btn)
+        diagnostics_bar.addWidget(self.trace_clear_btn)
+        diagnostics_bar.addWidget(self.trace_export_btn)
+        diagnostics_layout.addLayout(diagnostics_bar)
+        self.trace_tree = QTreeWidget()
+        self.trace_tree.setHeaderLabels(["名称", "耗时 (ms)", "线程", "属性"])
+        self.trace_tree.setColumnWidth(0, 200)
+        self.trace_tree.setRootIsDecorated(False)
+        diagnostics_layout.addWidget(self.trace_tree)
+        # conda 命令调度队列的统计
+        self.scheduler_tree = QTreeWidget()
+        self.scheduler_tree.setHeaderLabels(["队列", "并发上限", "运行中", "排队中", "已完成（交互/后台）",
+                                             "平均排队 (ms)", "最长排队 (ms)", "平均运行 (s)"])
+        self.scheduler_tree.setRootIsDecorated(False)
+        self.scheduler_tree.setMaximumHeight(110)
+        diagnostics_layout.addWidget(self.scheduler_tree)
+        self.detail_tabs.addTab(self.diagnostics_widget, "诊断")
+
+        # 标签页5：完整性校验结果（环境 → 包 → 缺失/修改/多余的文件）
+        self.verify_tree = QTreeWidget()
+        self.verify_tree.setHeaderLabels(["环境 / 包 / 文件", "状态"])
+        self.verify_tree.setColumnWidth(0, 420)
+        self.detail_tabs.addTab(self.verify_tree, "完整性校验")
+        self.detail_tabs.currentChanged.connect(
+            lambda index: index == self.detail_tabs.indexOf(self.diagnostics_widget) and self.on_refresh_diagnostics())
+
         # === 顶部工具栏 ===
         toolbar = QToolBar("操作")
         toolbar.setIconSize(QSize(16, 16))
@@ -184,18 +541,35 @@ class CondaEnvManagerGUI(QMainWindow):
         self.remove_btn = QPushButton("删除环境")
         self.installPAK_btn = QPushButton("安装包")
         self.uninstallAPK_btn = QPushButton("卸载包")
+        self.verify_btn = QPushButton("校验文件")
+        self.export_lock_btn = QPushButton("导出锁定文件")
+        self.create_from_lock_btn = QPushButton("从锁定文件创建")
 
         self.refresh_btn.clicked.connect(self.on_force_refresh_dataBase)
         self.create_btn.clicked.connect(self.on_create_env)
         self.remove_btn.clicked.connect(self.on_remove_env)
         self.installPAK_btn.clicked.connect(self.on_install_package)
         self.uninstallAPK_btn.clicked.connect(self.on_uninstall_package)
+        self.verify_btn.clicked.connect(self.on_verify_envs)
+        self.export_lock_btn.clicked.connect(self.on_export_lockfile)
+        self.create_from_lock_btn.clicked.connect(self.on_create_env_from_lockfile)
 
         toolbar.addWidget(self.refresh_btn)
         toolbar.addWidget(self.create_btn)
         toolbar.addWidget(self.remove_btn)
         toolbar.addWidget(self.installPAK_btn)
         toolbar.addWidget(self.uninstallAPK_btn)
+        toolbar.addWidget(self.verify_btn)
+        toolbar.addWidget(self.export_lock_btn)
+        toolbar.addWidget(self.create_from_lock_btn)
+
+        # 求解/执行后端选择（全局生效）
+        toolbar.addSeparator()
+        toolbar.addWidget(QLabel(" 执行后端: "))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(SOLVER_BACKENDS)
+        self.backend_combo.currentTextChanged.connect(self.on_backend_changed)
+        toolbar.addWidget(self.backend_combo)
 
     # 显示运行窗口
     def show_running_dialog(self, operation):
@@ -235,10 +609,9 @@ class CondaEnvManagerGUI(QMainWindow):
             bool: 获取成功返回True，否则返回False
         """
         # 开始运行时，获取conda安装路径
-        target_path = os.path.join(os.environ['USERPROFILE'], 'Documents', 'conda_path.txt')
-        if os.path.exists(target_path):     # 存在文件则读取
-            with open(target_path, 'r') as f:
-                self.conda_path = f.read().strip()
+        saved_path = load_saved_conda_path()
+        if saved_path:     # 存在文件则读取
+            self.conda_path = saved_path
         elif not self.conda_path or not os.path.exists(self.conda_path):    # 否则，让用户选择
             QMessageBox.information(self, "提示", "请选择conda(miniconda)的根目录")
             self.conda_path = QFileDialog.getExistingDirectory(None, "选择conda的安装路径", "", QFileDialog.ShowDirsOnly)
@@ -248,34 +621,54 @@ class CondaEnvManagerGUI(QMainWindow):
                 return False
 
             #保存 conda安装路径信息到用户文档的.txt文件中
-            with open(target_path, 'w') as f:
-                f.write(self.conda_path)
+            save_conda_path(self.conda_path)
+
+        self.executor.conda_path = self.conda_path
+        # conda_path.txt 中配置了多个根目录时，各根目录的环境并发枚举后合并显示
+        self.executor.roots = load_saved_conda_paths() or [self.conda_path]
+        # 环境列表和包列表通过常驻的查询辅助进程获取，所有工作线程共享（辅助进程不可用时自动改用 conda 命令）
+        if self.executor.api is None or self.executor.api.conda_path != self.conda_path:
+            if self.executor.api is not None:
+                self.executor.api.close()
+            self.executor.api = CondaApiClient(self.conda_path)
 
         # 创建运行对话框
         self.show_running_dialog("获取环境信息中，可能耗时较长，请不要关闭窗口")
 
         # 是否要从数据库中读取数据
         if self.read_DataBase:
-            self.envdir = self.sql_controller.load_environments()
-            self.python_version = self.sql_controller.get_python_versions()
+            # 只加载环境行（一次查询），包列表在选中环境时再加载
+            rows = self.sql_controller.list_environments() or []
+            self.envdir = {row['env_name']: [row['path'], None] for row in rows}
+            self.python_version = {row['env_name']: row['python_version'] for row in rows if row['python_version']}
+            self.package_counts = {row['env_name']: row['package_count'] for row in rows}
+            self.package_cache.clear()
         else:
             # 创建conda环境管理器，并获取环境信息
-            conda_manager = CondaEnvManager(self.conda_path)
+            conda_manager = CondaEnvManager(self.conda_path, executor=self.executor)
             self.envdir = conda_manager.get_all_envs_and_packages()
             if not self.envdir:
                 QMessageBox.warning(self, "错误", "无法获取环境信息")
                 return False
-            self.python_version = conda_manager.get_python_version()
-            if not self.python_version:
-                QMessageBox.warning(self, "错误", "无法获取Python版本")
-                return False
-            
-            # 将数据写入数据库
-            result = self.sql_controller.save_environments(self.envdir)
-            if not result:
-                QMessageBox.warning(self, "错误", "数据写入数据库失败")
-            else:
-                self.read_DataBase = True   # 设置读取数据库标志为True
+            # Python 版本直接从扫描结果中取，不再重新获取一遍所有环境的包
+            from mysqlcontroller import python_version_of
+            self.python_version = {}
+            for env_name, env_info in self.envdir.items():
+                py_version = python_version_of(env_info[1])
+                if py_version:
+                    self.python_version[env_name] = py_version
+
+            # 在后台写入数据库（写入失败会在状态栏提示并自动重试），界面不用等待
+            self.persister.replace_all({env_name: [env_info[0], env_info[1]] for env_name, env_info in self.envdir.items()})
+            self.read_DataBase = True   # 设置读取数据库标志为True
+
+            # 包列表移入 LRU 缓存，环境字典只保留路径
+            self.package_cache.clear()
+            self.package_counts = {}
+            self.env_sizes = {}     # 重新扫描时大小也重新计算
+            for env_name, env_info in self.envdir.items():
+                self._cache_env_packages(env_name, env_info[1])
+                env_info[1] = None
 
         # 如果对话框还存在（运行），则关闭运行对话框，并弹出提示
         self.close_running_dialog()
@@ -288,14 +681,29 @@ class CondaEnvManagerGUI(QMainWindow):
         self.path_label.setText("")
         self.python_version_label.setText("")
         self.introduction_label.setText("")
+        self.package_count_label.setText("")
+        self.disk_size_label.setText("")
+        self.modified_label.setText("")
         self.packages_text.clear()
 
+    # 当前选中的环境名称
+    def _current_env_name(self):
+        """
+        返回值:
+            str: 当前选中行的环境名称，没有选中（或选中的行被过滤掉）时返回None
+        """
+        rows = self.env_tree.selectionModel().selectedRows(COLUMN_NAME)
+        if not rows:
+            return None
+        return self.env_model.env_name_at(self.env_proxy.mapToSource(rows[0]).row())
+
     # 根据是否选中环境更新按钮状态
     def update_button_states(self):
-        has_selection = bool(self.env_tree.selectedItems())
+        has_selection = self._current_env_name() is not None
         self.remove_btn.setEnabled(has_selection)
         self.installPAK_btn.setEnabled(has_selection)
         self.uninstallAPK_btn.setEnabled(has_selection)
+        self.export_lock_btn.setEnabled(has_selection)
 
     # === 按钮事件===
 
@@ -328,13 +736,215 @@ class CondaEnvManagerGUI(QMainWindow):
             QMessageBox.warning(self, "错误", "刷新环境树error：无法获取环境信息")
             return
 
-        # 更新环境树
-        self.env_tree.clear()
+        # 更新环境列表（只增删改有变化的行）
+        with span("ui.render_tree", rows=len(self.envdir)):
+            self.env_model.sync(self.envdir, self.python_version, self.package_counts, self.env_sizes)
+        self.update_button_states()
+
+        # 在后台计算还没有大小的环境
         for env, inf in self.envdir.items():
-            item = QTreeWidgetItem(self.env_tree)
-            item.setText(0, env)
-            item.setText(1, self.python_version.get(env, "未知"))
-            item.setText(2, inf[0])
+            if env not in self.env_sizes:
+                self.size_pending[env] = inf[0]
+        self._start_size_load()
+
+        # 开始（重新）监视环境目录
+        self._start_env_watcher()
+
+        # 在后台更新可用版本索引
+        self._start_repodata_refresh()
+
+    # 启动文件系统监视
+    def _start_env_watcher(self):
+        """
+        监视 envs/ 和各环境的 conda-meta/、site-packages/，在界面外的修改也能自动局部刷新
+        """
+        if not self.conda_path:
+            return
+        if self.env_watcher is None or self.env_watcher.conda_path != self.conda_path:
+            if self.env_watcher is not None:
+                self.env_watcher.stop()
+                self.env_watcher.deleteLater()
+            from envWatcher import EnvWatcher
+            self.env_watcher = EnvWatcher(self.conda_path, parent=self)
+            self.env_watcher.envsChanged.connect(self._on_watched_envs_changed)
+            self.env_watcher.envAdded.connect(lambda name, path: self._on_watched_envs_changed([name], {name: path}))
+            self.env_watcher.envRemoved.connect(lambda name: self._apply_env_update(name, None))
+        self.env_watcher.start({env: inf[0] for env, inf in self.envdir.items()})
+
+    # 监视到环境变化
+    def _on_watched_envs_changed(self, env_names: list, env_paths: dict = None):
+        """
+        把变化的环境加入待刷新队列，后台线程空闲时逐个重新获取
+        """
+        for env_name in env_names:
+            path = (env_paths or {}).get(env_name) or self.envdir.get(env_name, [None])[0]
+            self.inventory_pending[env_name] = path
+        self._start_inventory_refresh()
+
+    # 启动后台局部刷新
+    def _start_inventory_refresh(self):
+        if self.inventory_thread is not None or not self.inventory_pending:
+            return  # 已有刷新在进行，结束后会继续处理队列
+
+        env_paths, self.inventory_pending = self.inventory_pending, {}
+        self.status_bar.showMessage(f"检测到环境变化，正在刷新: {', '.join(env_paths)}")
+
+        self.inventory_thread = QThread()
+        self.inventory_worker = InventoryWorker(self.conda_path, env_paths, self.executor)
+        self.inventory_worker.moveToThread(self.inventory_thread)
+        self.inventory_thread.started.connect(self.inventory_worker.run)
+        self.inventory_worker.envInventoried.connect(self._apply_env_update)
+        self.inventory_worker.finished.connect(self.inventory_thread.quit)
+        self.inventory_worker.finished.connect(self.inventory_worker.deleteLater)
+        self.inventory_thread.finished.connect(self.inventory_thread.deleteLater)
+        self.inventory_thread.finished.connect(self._on_inventory_refresh_finished)
+        self.inventory_thread.start()
+
+    # 后台局部刷新完成
+    def _on_inventory_refresh_finished(self):
+        self.inventory_thread = None
+        self.status_bar.showMessage("就绪")
+        self._start_inventory_refresh()     # 处理刷新期间新到的变化
+
+    # 启动可用版本索引刷新
+    def _start_repodata_refresh(self):
+        """
+        只解析变化过的 repodata 缓存文件，conda 没有重新下载时几乎没有开销
+        """
+        if not self.conda_path or self.repodata_thread is not None:
+            return
+        if self.repodata_index is None or self.repodata_index.conda_path != self.conda_path:
+            from repodataIndex import RepodataIndex
+            self.repodata_index = RepodataIndex(self.conda_path)
+            self.repodata_ready = False
+
+        self.repodata_thread = QThread()
+        self.repodata_worker = RepodataWorker(self.repodata_index)
+        self.repodata_worker.moveToThread(self.repodata_thread)
+        self.repodata_thread.started.connect(self.repodata_worker.run)
+        self.repodata_worker.finished.connect(self._on_repodata_refreshed)
+        self.repodata_worker.finished.connect(self.repodata_thread.quit)
+        self.repodata_worker.finished.connect(self.repodata_worker.deleteLater)
+        self.repodata_thread.finished.connect(self.repodata_thread.deleteLater)
+        self.repodata_thread.start()
+
+    # 可用版本索引刷新完成
+    def _on_repodata_refreshed(self, changed: bool):
+        self.repodata_thread = None
+        self.repodata_ready = True
+        # 第一次可用或有更新时，刷新当前详情中的"有新版本"提示
+        env_name = self._current_env_name()
+        if changed and env_name is not None:
+            self._show_env_packages(env_name)
+
+    # === 诊断标签页 ===
+
+    # 打开/关闭耗时追踪
+    def on_trace_toggled(self, checked: bool):
+        if checked:
+            tracing.enable()
+        else:
+            tracing.disable()
+
+    # 刷新诊断列表
+    def on_refresh_diagnostics(self):
+        """
+        显示环形缓冲区中最近的 span（新的在上）和 conda 命令调度队列的统计
+        """
+        self.trace_tree.clear()
+        for record in reversed(tracing.recent_spans(500)):
+            item = QTreeWidgetItem(self.trace_tree)
+            item.setText(0, record["name"])
+            item.setText(1, f"{record['duration_ns'] / 1e6:.2f}")
+            item.setText(2, str(record["tid"]))
+            item.setText(3, ", ".join(f"{k}={v}" for k, v in record["attrs"].items()))
+
+        self.scheduler_tree.clear()
+        for queue, metrics in self.executor.scheduler.metrics().items():
+            item = QTreeWidgetItem(self.scheduler_tree)
+            item.setText(0, queue)
+            item.setText(1, str(metrics["limit"]))
+            item.setText(2, str(metrics["running"]))
+            item.setText(3, str(metrics["waiting"]))
+            item.setText(4, f"{metrics['completed']}（{metrics['interactive']}/{metrics['background']}）")
+            item.setText(5, f"{metrics['wait_mean'] * 1000:.1f}")
+            item.setText(6, f"{metrics['wait_max'] * 1000:.1f}")
+            item.setText(7, f"{metrics['run_mean']:.2f}")
+
+    # 清空诊断记录
+    def on_clear_diagnostics(self):
+        tracing.clear()
+        self.trace_tree.clear()
+
+    # 导出 Chrome trace
+    def on_export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出 Chrome trace", "conda_manager_trace.json", "JSON (*.json)")
+        if not path:
+            return
+        count = tracing.export_chrome_trace(path)
+        QMessageBox.information(self, "提示", f"已导出 {count} 条记录，可在 chrome://tracing 或 ui.perfetto.dev 中打开")
+
+    # === 完整性校验 ===
+
+    # 校验选中的环境（未选中则校验全部环境）
+    def on_verify_envs(self):
+        if self.verify_thread is not None:
+            return
+        env_name = self._current_env_name()
+        if env_name is not None:
+            env_paths = {env_name: self.envdir[env_name][0]}
+        else:
+            env_paths = {env: inf[0] for env, inf in self.envdir.items()}
+        if not env_paths:
+            return
+
+        self.verify_tree.clear()
+        self.verify_btn.setEnabled(False)
+        self.detail_tabs.setCurrentWidget(self.verify_tree)
+        self.status_bar.showMessage(f"正在校验 {len(env_paths)} 个环境的文件...")
+
+        self.verify_thread = QThread()
+        self.verify_worker = VerifyWorker(env_paths)
+        self.verify_worker.moveToThread(self.verify_thread)
+        self.verify_thread.started.connect(self.verify_worker.run)
+        self.verify_worker.envVerified.connect(self._on_env_verified)
+        self.verify_worker.finished.connect(self.verify_thread.quit)
+        self.verify_worker.finished.connect(self.verify_worker.deleteLater)
+        self.verify_thread.finished.connect(self.verify_thread.deleteLater)
+        self.verify_thread.finished.connect(self._on_verify_finished)
+        self.verify_thread.start()
+
+    # 单个环境校验完成
+    def _on_env_verified(self, env_name: str, report: dict):
+        labels = {"missing": "缺失", "modified": "已修改", "extra": "多余"}
+        env_item = QTreeWidgetItem(self.verify_tree)
+        env_item.setText(0, env_name)
+        env_item.setText(1, f"{len(report['packages'])} 个包有问题 / {report['files']} 个文件，"
+                            f"计算哈希 {report['hashed']}，缓存 {report['cached']}，耗时 {report['seconds']:.2f}s")
+        for package_name, problems in report["packages"].items():
+            package_item = QTreeWidgetItem(env_item)
+            package_item.setText(0, package_name)
+            package_item.setText(1, "，".join(f"{labels[k]} {len(v)}" for k, v in problems.items()))
+            for kind, rel_paths in problems.items():
+                for rel_path in rel_paths:
+                    file_item = QTreeWidgetItem(package_item)
+                    file_item.setText(0, rel_path)
+                    file_item.setText(1, labels[kind])
+        env_item.setExpanded(bool(report["packages"]))
+
+    # 全部校验完成
+    def _on_verify_finished(self):
+        self.verify_thread = None
+        self.verify_btn.setEnabled(True)
+        self.status_bar.showMessage("文件校验完成")
+
+    # 切换执行后端
+    def on_backend_changed(self, backend: str):
+        """
+        切换全局的执行后端，之后的创建/删除/安装/卸载操作都使用该后端
+        """
+        self.executor.backend = backend
+        self.status_bar.showMessage(f"执行后端已切换为 {backend}")
 
     # 搜索包名
     def on_search_pak(self):
@@ -389,6 +999,54 @@ class CondaEnvManagerGUI(QMainWindow):
         # 启动线程——创建环境
         self._start_conda_operation('create', env_name, py_version)
 
+    # 导出锁定文件
+    def on_export_lockfile(self):
+        """
+        从选中环境的 conda-meta 生成显式锁定文件（.txt）或 environment.yml，不调用 conda
+        """
+        env_name = self._current_env_name()
+        if env_name is None:
+            return
+        env_path = self.envdir[env_name][0]
+
+        path, _ = QFileDialog.getSaveFileName(self, "导出锁定文件", f"{env_name}-explicit.txt",
+                                              "显式锁定文件 (*.txt);;environment.yml (*.yml *.yaml)")
+        if not path:
+            return
+        from envLockfile import export_explicit, export_environment_yml
+        skipped = []
+        if path.lower().endswith(('.yml', '.yaml')):
+            text = export_environment_yml(env_path, env_name)
+        else:
+            text, skipped = export_explicit(env_path)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            QMessageBox.warning(self, "错误", f"写入锁定文件失败: {e}")
+            return
+        if skipped:
+            QMessageBox.warning(self, "提示", f"以下包没有下载地址，未写入锁定文件：\n{', '.join(skipped)}")
+        else:
+            QMessageBox.information(self, "提示", f"已导出到 {path}")
+
+    # 从锁定文件创建环境
+    def on_create_env_from_lockfile(self):
+        if not self.conda_path:
+            QMessageBox.warning(self, "错误", "请先刷新并选择 conda 路径！")
+            return
+
+        lockfile, _ = QFileDialog.getOpenFileName(self, "选择锁定文件", "",
+                                                  "锁定文件 (*.txt *.yml *.yaml);;所有文件 (*)")
+        if not lockfile:
+            return
+        env_name, ok = QInputDialog.getText(self, "从锁定文件创建", "请输入新环境名称：")
+        if not ok or not env_name.strip():
+            return
+
+        # 启动线程——从锁定文件创建环境
+        self._start_conda_operation('create', env_name.strip(), lockfile=lockfile)
+
     # 移除环境
     def on_remove_env(self):
         # 检查conda路径
@@ -397,12 +1055,11 @@ class CondaEnvManagerGUI(QMainWindow):
             return
 
         # 获取当前选中环境
-        item = self.env_tree.currentItem()
-        if not item:
+        env_name = self._current_env_name()
+        if env_name is None:
             return
 
         # 确认删除
-        env_name = item.text(0)
         reply = QMessageBox.question(
             self, "确认删除",
             f"确定要删除环境 '{env_name}' 吗？此操作不可逆！",
@@ -422,10 +1079,9 @@ class CondaEnvManagerGUI(QMainWindow):
             return
         
         # 获取当前选中环境名称
-        item = self.env_tree.currentItem()
-        if not item:
+        env_name = self._current_env_name()
+        if env_name is None:
             return
-        env_name = item.text(0)
             
         # 获取包名称
         package_name, ok = QInputDialog.getText(self, "安装包", "请输入包名称：")
@@ -437,7 +1093,12 @@ class CondaEnvManagerGUI(QMainWindow):
         reply = QMessageBox.question(self, "确认", f"您需要指定 {package_name} 版本吗？")
         pak_version = None
         if reply == QMessageBox.Yes:
-            pak_version, ok = QInputDialog.getText(self, f"{package_name} 版本", "请输入版本：")
+            # 有本地索引时提供可用版本的下拉补全（可编辑，也可以输入列表外的版本）
+            versions = self.repodata_index.available_versions(package_name.strip()) if self.repodata_ready else []
+            if versions:
+                pak_version, ok = QInputDialog.getItem(self, f"{package_name} 版本", "请选择或输入版本：", versions, 0, True)
+            else:
+                pak_version, ok = QInputDialog.getText(self, f"{package_name} 版本", "请输入版本：")
             if not ok or not pak_version.strip():
                 return
         
@@ -452,10 +1113,9 @@ class CondaEnvManagerGUI(QMainWindow):
             return
     
         # 获取当前选中环境名称
-        item = self.env_tree.currentItem()
-        if not item:
+        env_name = self._current_env_name()
+        if env_name is None:
             return
-        env_name = item.text(0)
 
         # 获取包名称
         package_name, ok = QInputDialog.getText(self, "卸载包", "请输入包名称：")
@@ -476,7 +1136,7 @@ class CondaEnvManagerGUI(QMainWindow):
 
     # 启动线程
     def _start_conda_operation(self, op_type: str, env_name: str, py_version: str = None, 
-                            package_name: str = None, package_version: str = None):
+                            package_name: str = None, package_version: str = None, lockfile: str = None):
         """启动 conda 操作线程
         
             参数：
@@ -485,12 +1145,19 @@ class CondaEnvManagerGUI(QMainWindow):
                 py_version: Python版本        
                 package_name: 包名称
                 package_version: 包版本
+                lockfile: 创建环境时使用的锁定文件
         """
         # 禁用所有按钮
         self._disable_all_buttons()
 
+        # 操作期间忽略该环境的文件变化事件，结束后由回调局部刷新
+        if self.env_watcher:
+            self.env_watcher.hold(env_name)
+
         # 创建运行对话框
-        if op_type == 'create':
+        if op_type == 'create' and lockfile:
+            operation_text = "从锁定文件创建环境"
+        elif op_type == 'create':
             operation_text = "创建环境"
         elif op_type == 'remove':
             operation_text = "删除环境"
@@ -507,7 +1174,8 @@ class CondaEnvManagerGUI(QMainWindow):
         self.thread = QThread()
         
         # 创建CondaWorker工作对象，以负责具体的conda环境操作
-        self.worker = CondaWorker(self.conda_path, env_name, py_version, op_type, package_name, package_version)
+        self.worker = CondaWorker(self.conda_path, env_name, py_version, op_type, package_name, package_version,
+                                  executor=self.executor, lockfile=lockfile)
         
         # 将worker对象移动到新创建的线程中执行
         self.worker.moveToThread(self.thread)
@@ -530,81 +1198,355 @@ class CondaEnvManagerGUI(QMainWindow):
         self.thread.start()
 
     # 操作完成回调
-    def _on_operation_finished(self, success: bool, name: str):
+    def _on_operation_finished(self, success: bool, name: str, op_type: str = "", env_name: str = "", env_info=None):
         """操作完成回调
         
-            参数：接收 finished 信号传来的两个参数
+            参数：接收 finished 信号传来的参数
                 success: 操作是否成功
                 name: 环境名称或包名称
+                op_type: 操作类型
+                env_name: 受影响的环境名称
+                env_info: 受影响环境的最新信息 [env_path, packages]，环境已删除时为 None
         """
         # 如果对话框还存在（运行），则关闭运行对话框
         self.close_running_dialog()
 
+        # 记录本次操作的耗时到操作日志
+        timing = self.executor.last_timing()
+        if timing:
+            self.log_text.append(
+                f"[{time.strftime('%H:%M:%S', time.localtime(timing['finished_at']))}] "
+                f"{timing['operation']} '{name}' 后端={timing['backend']} "
+                f"耗时={timing['seconds']:.2f}s 排队={timing['queued_seconds']:.2f}s 返回码={timing['returncode']}"
+            )
+
+        if success:
+            # 只更新受影响的环境（树节点 + 数据库行），不再全量重新扫描
+            if op_type == 'remove':
+                self._apply_env_update(env_name, None)
+            elif env_info:
+                self._apply_env_update(env_name, env_info)
+            else:
+                # 没拿到该环境的信息（如 conda 输出异常），退回全量刷新
+                self.read_DataBase = False
+                self.on_refresh_envsList()
+        if self.env_watcher:
+            self.env_watcher.release(env_name)
+        # 安装/创建时 conda 可能重新下载了 repodata
+        if success and op_type in ('create', 'install'):
+            self._start_repodata_refresh()
+
         if success:
-            self.read_DataBase = False  # 有数据更新，数据库的数据过期，设置标志为不读
-            self.on_refresh_envsList()  # 自动刷新，同时更新数据库
             QMessageBox.information(self, "成功", f"操作 '{name}' 成功！")
         else:
             QMessageBox.critical(self, "失败", f"操作 '{name}' 失败！请检查权限或网络。")
 
         self._enable_all_buttons()  # 启用所有按钮
 
+    # 局部更新单个环境
+    def _apply_env_update(self, env_name: str, env_info):
+        """
+        用单个环境的最新信息就地更新环境字典、环境树节点和数据库
+
+        参数:
+            env_name: 环境名称
+            env_info: [env_path, packages]，为 None 表示环境已被删除
+        """
+        if env_info is None:
+            # 环境已删除：移除字典项、列表行和数据库行
+            self.envdir.pop(env_name, None)
+            self.python_version.pop(env_name, None)
+            self.package_cache.pop(env_name)
+            self.package_counts.pop(env_name, None)
+            self.env_sizes.pop(env_name, None)
+            self.env_model.remove_env(env_name)
+            if self.env_watcher:
+                self.env_watcher.remove_env(env_name)
+            self.persister.submit(removed=[env_name])
+            self.update_button_states()
+            return
+
+        # 新建或更新环境
+        self.envdir[env_name] = [env_info[0], None]
+        self._cache_env_packages(env_name, env_info[1])
+        from mysqlcontroller import python_version_of
+        py_version = python_version_of(env_info[1])
+        if py_version:
+            self.python_version[env_name] = py_version
+        else:
+            self.python_version.pop(env_name, None)
+
+        # 包变了，大小也要重新计算
+        self.env_sizes.pop(env_name, None)
+        self.env_model.update_env(env_name, env_info[0], self.python_version.get(env_name),
+                                  self.package_counts.get(env_name))
+        self.size_pending[env_name] = env_info[0]
+        self._start_size_load()
+
+        if self.env_watcher:
+            self.env_watcher.add_env(env_name, env_info[0])
+        self.persister.submit({env_name: env_info})
+
+        # 当前选中的正是该环境，则刷新详情（环境目录变了，正在进行的详情加载作废）
+        if self._current_env_name() == env_name:
+            self.on_env_selected_showDetail(reload=True)
+
+    # 后台写入完成
+    def _on_persisted(self, success: bool, env_names: list):
+        if success:
+            if not self.persister.has_pending():
+                self.status_bar.showMessage(f"已写入数据库（{len(env_names)} 个环境）", 3000)
+        else:
+            self.status_bar.showMessage(f"写入数据库失败，稍后自动重试（{len(env_names)} 个环境）")
+
+    # 关闭窗口时把还没写入的数据写完
+    def closeEvent(self, event):
+        if self.persister is not None and self.persister.has_pending():
+            self.status_bar.showMessage("正在把剩余的数据写入数据库...")
+            if not self.persister.close(timeout=10):
+                print("退出时仍有数据未写入数据库，下次启动请点击“刷新数据库和列表”")
+        super().closeEvent(event)
+
+    # === 按需加载包列表 ===
+
+    # 缓存单个环境的包列表
+    def _cache_env_packages(self, env_name: str, packages):
+        self.package_cache.put(env_name, packages)
+        self.package_counts[env_name] = len(packages[0]) if packages else 0
+        self.env_model.set_package_count(env_name, self.package_counts[env_name])
+
+    # 加载选中环境及相邻环境的包列表
+    def _prefetch_packages(self, env_name: str):
+        """
+        选中的环境排在最前，其次是列表中（按当前排序和过滤）上下相邻的环境（用户通常会依次浏览）
+        """
+        candidates = [env_name]
+        source_row = self.env_model.row_of(env_name)
+        row = self.env_proxy.mapFromSource(self.env_model.index(source_row, COLUMN_NAME)).row() if source_row >= 0 else -1
+        if row >= 0:
+            for offset in range(1, PREFETCH_NEIGHBOURS + 1):
+                for neighbour in (row + offset, row - offset):
+                    if 0 <= neighbour < self.env_proxy.rowCount():
+                        source_index = self.env_proxy.mapToSource(self.env_proxy.index(neighbour, COLUMN_NAME))
+                        candidates.append(self.env_model.env_name_at(source_index.row()))
+
+        for env_name in candidates:
+            if env_name in self.envdir and env_name not in self.package_cache:
+                self.package_failed.discard(env_name)
+                self.package_pending.setdefault(env_name, self.envdir[env_name][0])
+        self._start_package_load()
+
+    # 启动后台包列表加载
+    def _start_package_load(self):
+        if self.package_thread is not None or not self.package_pending:
+            return  # 已有加载在进行，结束后会继续处理队列
+
+        env_paths, self.package_pending = self.package_pending, {}
+        self.package_thread = QThread()
+        self.package_worker = PackageLoadWorker(self.conda_path, env_paths, self.executor, self.persister)
+        self.package_worker.moveToThread(self.package_thread)
+        self.package_thread.started.connect(self.package_worker.run)
+        self.package_worker.packagesLoaded.connect(self._on_packages_loaded)
+        self.package_worker.finished.connect(self.package_thread.quit)
+        self.package_worker.finished.connect(self.package_worker.deleteLater)
+        self.package_thread.finished.connect(self.package_thread.deleteLater)
+        self.package_thread.finished.connect(self._on_package_load_finished)
+        self.package_thread.start()
+
+    # 单个环境的包列表加载完成
+    def _on_packages_loaded(self, env_name: str, packages):
+        if env_name not in self.envdir:
+            return  # 加载期间环境已被删除
+        if packages is None:
+            # 不缓存失败的结果，下次选中该环境时重新加载
+            self.status_bar.showMessage(f"加载环境 {env_name} 的包列表失败")
+            self.package_failed.add(env_name)
+        else:
+            self._cache_env_packages(env_name, packages)
+        if self._current_env_name() == env_name:
+            self._show_env_packages(env_name)
+
+    # 后台包列表加载结束
+    def _on_package_load_finished(self):
+        self.package_thread = None
+        self._start_package_load()     # 处理加载期间新到的请求
+
+    # === 环境详情 ===
+
+    # 启动后台详情加载
+    def _start_detail_load(self):
+        if self.detail_pending is None:
+            return
+        if self.detail_thread is not None:
+            # 让正在进行的加载（可能正在统计上一个环境的磁盘占用）尽快停止，结束后加载最后一次选中的环境
+            self.detail_cancel.set()
+            return
+
+        env_name, env_path = self.detail_pending
+        self.detail_pending = None
+        self.detail_loading = env_path
+        self.detail_cancel = threading.Event()
+        self.detail_thread = QThread()
+        self.detail_worker = EnvDetailWorker(self.detail_loader, env_name, env_path, self.detail_cancel)
+        self.detail_worker.moveToThread(self.detail_thread)
+        self.detail_thread.started.connect(self.detail_worker.run)
+        self.detail_worker.detailLoaded.connect(self._show_env_details)
+        self.detail_worker.finished.connect(self.detail_thread.quit)
+        self.detail_worker.finished.connect(self.detail_worker.deleteLater)
+        self.detail_thread.finished.connect(self.detail_thread.deleteLater)
+        self.detail_thread.finished.connect(self._on_detail_load_finished)
+        self.detail_thread.start()
+
+    # 显示已加载的详情
+    def _show_env_details(self, env_name: str, details: dict):
+        """
+        参数:
+            env_name: 环境名称（已不是当前选中的环境时忽略）
+            details: 已加载的字段，缺少的字段显示为"加载中..."
+        """
+        if self._current_env_name() != env_name:
+            return
+        if "introduction" in details:
+            self.introduction_label.setText(details["introduction"] if details["introduction"] is not None else "无")
+        else:
+            self.introduction_label.setText("加载中...")
+        package_count = details.get("package_count", self.package_counts.get(env_name))
+        self.package_count_label.setText(str(package_count) if package_count is not None else "加载中...")
+        self.disk_size_label.setText(format_size(details["size"]) if "size" in details else "计算中...")
+        if details.get("modified"):
+            self.modified_label.setText(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(details["modified"])))
+        else:
+            self.modified_label.setText("未知" if "introduction" in details else "加载中...")
+
+    # 后台详情加载结束
+    def _on_detail_load_finished(self):
+        self.detail_thread = None
+        self.detail_loading = None
+        self._start_detail_load()   # 加载期间又选中了别的环境
+
+    # === 环境大小 ===
+
+    # 启动后台大小计算
+    def _start_size_load(self):
+        if self.size_thread is not None or not self.size_pending:
+            return  # 已有计算在进行，结束后会继续处理队列
+
+        env_paths, self.size_pending = self.size_pending, {}
+        self.size_thread = QThread()
+        self.size_worker = EnvSizeWorker(env_paths)
+        self.size_worker.moveToThread(self.size_thread)
+        self.size_thread.started.connect(self.size_worker.run)
+        self.size_worker.envSized.connect(self._on_env_sized)
+        self.size_worker.finished.connect(self.size_thread.quit)
+        self.size_worker.finished.connect(self.size_worker.deleteLater)
+        self.size_thread.finished.connect(self.size_thread.deleteLater)
+        self.size_thread.finished.connect(self._on_size_load_finished)
+        self.size_thread.start()
+
+    # 单个环境的大小计算完成
+    def _on_env_sized(self, env_name: str, size):
+        if env_name not in self.envdir:
+            return  # 计算期间环境已被删除
+        self.env_sizes[env_name] = size
+        self.env_model.set_size(env_name, size)
+
+    # 后台大小计算结束
+    def _on_size_load_finished(self):
+        self.size_thread = None
+        self._start_size_load()     # 处理计算期间新到的请求
+
     # 禁用所有按钮
     def _disable_all_buttons(self):
         self.create_btn.setEnabled(False)
         self.remove_btn.setEnabled(False)
         self.installPAK_btn.setEnabled(False)
         self.uninstallAPK_btn.setEnabled(False)
+        self.create_from_lock_btn.setEnabled(False)
 
     # 启用所有按钮
     def _enable_all_buttons(self):
         self.create_btn.setEnabled(True)
+        self.create_from_lock_btn.setEnabled(True)
         self.update_button_states()
 
     # 显示当前选中环境的详情信息
-    def on_env_selected_showDetail(self):
+    def on_env_selected_showDetail(self, reload: bool = False):
             """更新右侧详情信息
+
+            参数:
+                reload: 环境已变化，即使正在加载的就是该环境也重新加载详情
             """
             self.clear_details()    # 先清空详情
 
             # 获取当前选中环境名称
-            item = self.env_tree.currentItem()
-            if item:
-                env_name = item.text(0)
-                env_path = self.envdir[env_name][0]
-
-                # 读取简介
-                intro_path = os.path.join(env_path, "introduction.txt")
-                if os.path.exists(intro_path):
-                    try:
-                        with open(intro_path, "r", encoding="utf-8") as f:
-                            self.introduction_label.setText(f.read())
-                    except Exception:
-                        self.introduction_label.setText("读取简介失败")
-                else:
-                    self.introduction_label.setText("无")
-
-                # 更新环境信息
-                self.name_label.setText(env_name)
-                self.path_label.setText(env_path)
-                self.python_version_label.setText(self.python_version.get(env_name, "未知"))
-
-                # 更新包信息
-                packages = self.envdir[env_name][1]
-                if packages and len(packages) >= 3:
-                    names, versions, _ = packages
-                    self.packages_text.clear()  # 先清空
-                    for name, ver in zip(names, versions):
-                        self.packages_text.append(f"{name} = {ver}")
-                else:
-                    self.packages_text.setPlainText("无包信息")
+            env_name = self._current_env_name()
+            if env_name is not None:
+                with span("ui.show_detail", env=env_name) as s:
+                    env_path = self.envdir[env_name][0]
+
+                    # 简介、包数量、磁盘占用不在界面线程中读取：先显示缓存的结果，再由后台校验并逐步补全
+                    self._show_env_details(env_name, self.detail_loader.cached(env_path))
+                    self._request_detail_load(env_name, env_path, reload)
+
+                    # 更新环境信息
+                    self.name_label.setText(env_name)
+                    self.path_label.setText(env_path)
+                    self.python_version_label.setText(self.python_version.get(env_name, "未知"))
+
+                    # 更新包信息（未缓存时在后台加载，加载完成后只刷新包列表）
+                    self._prefetch_packages(env_name)
+                    packages = self._show_env_packages(env_name)
+                    s.set(rows=len(packages[0]) if packages else 0, cached=packages is not None)
 
             self.update_button_states()  # 更新按钮状态
 
+    # 请求加载环境详情
+    def _request_detail_load(self, env_name: str, env_path: str, reload: bool = False):
+        """
+        已在排队或正在加载（且没有被取消）的是同一个环境时不重新开始，避免中断它的磁盘占用统计
+        """
+        if not reload:
+            if self.detail_pending is not None and self.detail_pending[1] == env_path:
+                return
+            if self.detail_loading == env_path and not self.detail_cancel.is_set():
+                self.detail_pending = None     # 之后又选回了正在加载的环境
+                return
+        self.detail_pending = (env_name, env_path)
+        self._start_detail_load()
+
+    # 显示环境的包列表（标注可更新的版本）
+    def _show_env_packages(self, env_name: str):
+        """
+        返回值:
+            缓存中的包信息列表，还没有加载时返回None
+        """
+        packages = self.package_cache.get(env_name)
+        if packages is None:
+            self.packages_text.setPlainText("加载包列表失败" if env_name in self.package_failed else "加载中...")
+        elif packages and len(packages) >= 3:
+            names, versions = packages[0], packages[1]
+            sources = packages[3] if len(packages) > 3 else ["conda"] * len(names)
+            # 本地索引中有更新版本的 conda 包
+            newer = {}
+            if self.repodata_ready:
+                newer = self.repodata_index.newer_versions(
+                    {name: ver for name, ver, source in zip(names, versions, sources) if source != "pip"})
+            self.packages_text.clear()  # 先清空
+            for name, ver, source in zip(names, versions, sources):
+                if source == "pip":
+                    self.packages_text.append(f"{name} = {ver}  (pip)")
+                elif name in newer:
+                    self.packages_text.append(f"{name} = {ver}  (可更新: {newer[name]})")
+                else:
+                    self.packages_text.append(f"{name} = {ver}")
+        else:
+            self.packages_text.setPlainText("无包信息")
+        return packages
 
 # === 启动应用 ===
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = CondaEnvManagerGUI()
+    with startupProfiler.phase("ui.construct"):
+        window = CondaEnvManagerGUI()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -1,95 +1,264 @@
 # mysqlcontroller.py
 import pymysql
+import socket
+from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 
-# 检查是否存在环境表
-def env_table_exist() -> bool:
+from tracing import traced
+
+# 变更历史表（只追加，不设外键，环境删除后历史仍然保留）
+HISTORY_TABLES = [
+    """CREATE TABLE IF NOT EXISTS snapshots (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        host_name VARCHAR(128) NOT NULL DEFAULT '',
+        scope VARCHAR(255) NOT NULL,
+        change_count INT NOT NULL DEFAULT 0,
+        created_at DATETIME(6) NOT NULL,
+        INDEX idx_created_at (created_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;""",
+    """CREATE TABLE IF NOT EXISTS package_history (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        snapshot_id INT NOT NULL,
+        host_name VARCHAR(128) NOT NULL DEFAULT '',
+        env_name VARCHAR(255) NOT NULL,
+        package_name VARCHAR(255) NOT NULL,
+        old_version VARCHAR(100),
+        new_version VARCHAR(100),
+        changed_at DATETIME(6) NOT NULL,
+        INDEX idx_host_env_package_time (host_name, env_name, package_name, changed_at),
+        INDEX idx_package_time (package_name, changed_at),
+        INDEX idx_changed_at (changed_at),
+        INDEX idx_snapshot (snapshot_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;""",
+]
+
+# 模块导入统计表（由 importUsage 汇总各环境的导入日志写入，不设外键）
+USAGE_TABLE = """CREATE TABLE IF NOT EXISTS module_usage (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    host_name VARCHAR(128) NOT NULL,
+    env_name VARCHAR(255) NOT NULL,
+    module_name VARCHAR(255) NOT NULL,
+    import_count INT NOT NULL DEFAULT 0,
+    last_imported DATETIME NOT NULL,
+    UNIQUE KEY uk_host_env_module (host_name, env_name, module_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;"""
+
+# iter_inventory_rows 返回的列
+INVENTORY_COLUMNS = ('host_name', 'env_name', 'path', 'python_version', 'package_name', 'version', 'build_channel', 'source')
+
+# 本机的主机名，多台机器共用一个数据库时用来区分各自的环境
+LOCAL_HOST_NAME = socket.gethostname()
+
+# 变更历史默认保留天数（更早的记录会被压缩为每个包一条基线记录）
+HISTORY_RETENTION_DAYS = 180
+
+# 创建数据库和表
+def _create_schema(cursor, database: str):
+    # 创建数据库（使用utf8mb4字符集）
+    sql = f"CREATE DATABASE IF NOT EXISTS `{database}` DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+    cursor.execute(sql)
+
+    # 使用数据库
+    cursor.execute(f"USE `{database}`")
+
+    # 创建环境表
+    create_env_table = """CREATE TABLE IF NOT EXISTS environments (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        host_name VARCHAR(128) NOT NULL,
+        env_name VARCHAR(255) NOT NULL,
+        path VARCHAR(512) NOT NULL,
+        python_version VARCHAR(50),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        UNIQUE KEY uk_host_env (host_name, env_name),
+        INDEX idx_env_python (env_name, python_version)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;"""
+    cursor.execute(create_env_table)
+
+    # 创建包表
+    create_package_table = """CREATE TABLE IF NOT EXISTS packages (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        host_name VARCHAR(128) NOT NULL,
+        env_name VARCHAR(255) NOT NULL,
+        package_name VARCHAR(255) NOT NULL,
+        version VARCHAR(100) NOT NULL,
+        build_channel VARCHAR(100),
+        source VARCHAR(20) NOT NULL DEFAULT 'conda',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        INDEX idx_package_name (package_name, version),
+        UNIQUE KEY uk_host_env_package_ver (host_name, env_name, package_name, version),
+        CONSTRAINT fk_packages_env FOREIGN KEY (host_name, env_name)
+            REFERENCES environments(host_name, env_name) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;"""
+    cursor.execute(create_package_table)
+
+    # 创建变更历史表
+    for create_history_table in HISTORY_TABLES:
+        cursor.execute(create_history_table)
+
+    # 创建模块导入统计表
+    cursor.execute(USAGE_TABLE)
+
+# 补上新增的列、索引和表
+def _upgrade_schema(cursor):
     """
-    检查是否存在环境表，以判断是否可以直接从数据库获取数据
+    为旧版本创建的表补上新增的部分（CREATE TABLE IF NOT EXISTS 不会修改已存在的表），调用方负责提交
+    - packages.source：包来源（conda / pip）
+    - packages.idx_package_name：按包名跨环境查询用的索引 (package_name, version)
+    - snapshots / package_history：变更历史表
+    - module_usage：模块导入统计表
+    - host_name：多主机维度，已有数据归到本机名下，唯一键和外键改为 (host_name, env_name)
+    """
+    cursor.execute("SHOW COLUMNS FROM packages LIKE 'source'")
+    if cursor.fetchone() is None:
+        cursor.execute("ALTER TABLE packages ADD COLUMN source VARCHAR(20) NOT NULL DEFAULT 'conda' AFTER build_channel")
+    # 旧版本的索引只有 package_name 一列，换成与新建表相同的 (package_name, version)
+    cursor.execute("SHOW INDEX FROM packages WHERE Key_name = 'idx_package_name' AND Column_name = 'version'")
+    if cursor.fetchone() is None:
+        cursor.execute("SHOW INDEX FROM packages WHERE Key_name = 'idx_package_name'")
+        if cursor.fetchone() is None:
+            cursor.execute("ALTER TABLE packages ADD INDEX idx_package_name (package_name, version)")
+        else:
+            cursor.execute("ALTER TABLE packages DROP INDEX idx_package_name, "
+                           "ADD INDEX idx_package_name (package_name, version)")
+    for create_history_table in HISTORY_TABLES:
+        cursor.execute(create_history_table)
+    cursor.execute(USAGE_TABLE)
+    _upgrade_host_dimension(cursor)
+
+# 当前版本的表结构应有的标记（表名, 列名/索引名），全部存在时不需要建表或升级
+SCHEMA_MARKERS = {
+    ('environments', ''),
+    ('environments', 'host_name'),
+    ('packages', 'host_name'),
+    ('packages', 'source'),
+    ('packages', 'idx_package_name'),
+    ('snapshots', 'host_name'),
+    ('package_history', 'host_name'),
+    ('module_usage', 'host_name'),
+}
+
+# 启动时的表结构检查
+@traced("db.ensure_schema")
+def ensure_schema(database: str = 'condaControlor', host: str = 'localhost') -> Optional[bool]:
+    """
+    唯一的建表/升级入口：一次连接、一条 information_schema 查询确认表结构已是最新，只有缺少表或列时才建表/升级
+
+    返回值:
+        bool: 启动前环境表是否已存在（True 可以直接从数据库读取，False 为首次运行，表刚刚创建）
+        None: 无法连接数据库或建表失败
     """
     try:
-        # 创建数据库连接
+        # 不指定数据库连接，数据库不存在时也能检查和创建
         connection = pymysql.connect(
-            host='localhost',            # 数据库地址
-            user='chiruno',              # 用户名
-            password='123456',           # 密码
-            database='condaControlor',   # 数据库名
-            charset='utf8mb4',           # 字符编码
+            host=host,              # 数据库地址
+            user='chiruno',         # 用户名
+            password='123456',      # 密码
+            charset='utf8mb4',      # 字符编码
         )
+    except Exception as e:
+        print(f"检查表结构时连接数据库出错: {e}")
+        return None
 
+    try:
         with connection.cursor() as cursor:
-            # 检查环境表是否存在
-            sql = "SHOW TABLES LIKE 'environments'"
-            cursor.execute(sql)
-            result = cursor.fetchone()
-            return result is not None
+            cursor.execute(
+                "SELECT TABLE_NAME, '' FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'environments' "
+                "UNION ALL "
+                "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = %s AND COLUMN_NAME IN ('host_name', 'source') "
+                "AND TABLE_NAME IN ('environments', 'packages', 'snapshots', 'package_history', 'module_usage') "
+                "UNION ALL "
+                "SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'packages' AND INDEX_NAME = 'idx_package_name' "
+                "AND COLUMN_NAME = 'version'",
+                (database, database, database)
+            )
+            found = {(table, name) for table, name in cursor.fetchall()}
+            if SCHEMA_MARKERS <= found:
+                return True     # 表结构已是最新，不执行任何 DDL
+
+            if ('environments', '') not in found:
+                _create_schema(cursor, database)
+                connection.commit()
+                return False
+
+            cursor.execute(f"USE `{database}`")
+            _upgrade_schema(cursor)
+            connection.commit()
+            return True
     except Exception as e:
-        print(f"检查表存在性时出错: {e}")
-        return False
+        print(f"检查表结构时出错: {e}")
+        return None
     finally:
+        connection.close()
+
+# 加上主机维度
+def _upgrade_host_dimension(cursor):
+    """
+    为单机版本的表加上 host_name 列，已有数据归到本机名下
+    """
+    cursor.execute("SHOW COLUMNS FROM environments LIKE 'host_name'")
+    if cursor.fetchone() is None:
+        # 旧外键只引用 env_name，需要先删掉才能修改唯一键
+        cursor.execute(
+            "SELECT DISTINCT CONSTRAINT_NAME FROM information_schema.KEY_COLUMN_USAGE "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'packages' AND REFERENCED_TABLE_NAME = 'environments'"
+        )
+        for (constraint_name,) in cursor.fetchall():
+            cursor.execute(f"ALTER TABLE packages DROP FOREIGN KEY `{constraint_name}`")
+
+        cursor.execute("ALTER TABLE environments ADD COLUMN host_name VARCHAR(128) NOT NULL DEFAULT '' AFTER id")
+        cursor.execute("UPDATE environments SET host_name = %s", (LOCAL_HOST_NAME,))
+        cursor.execute(
+            "ALTER TABLE environments DROP INDEX env_name, "
+            "ADD UNIQUE KEY uk_host_env (host_name, env_name), "
+            "ADD INDEX idx_env_python (env_name, python_version)"
+        )
+
+        cursor.execute("ALTER TABLE packages ADD COLUMN host_name VARCHAR(128) NOT NULL DEFAULT '' AFTER id")
+        cursor.execute("UPDATE packages SET host_name = %s", (LOCAL_HOST_NAME,))
+        cursor.execute(
+            "ALTER TABLE packages DROP INDEX uk_env_name_package_name_ver, DROP INDEX idx_env_name_package_name, "
+            "ADD UNIQUE KEY uk_host_env_package_ver (host_name, env_name, package_name, version), "
+            "ADD CONSTRAINT fk_packages_env FOREIGN KEY (host_name, env_name) "
+            "REFERENCES environments(host_name, env_name) ON DELETE CASCADE"
+        )
+
+    for table in ("snapshots", "package_history"):
+        cursor.execute(f"SHOW COLUMNS FROM {table} LIKE 'host_name'")
+        if cursor.fetchone() is None:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN host_name VARCHAR(128) NOT NULL DEFAULT '' AFTER id")
+            cursor.execute(f"UPDATE {table} SET host_name = %s", (LOCAL_HOST_NAME,))
+            if table == "package_history":
+                cursor.execute(
+                    "ALTER TABLE package_history DROP INDEX idx_env_package_time, "
+                    "ADD INDEX idx_host_env_package_time (host_name, env_name, package_name, changed_at)"
+                )
+
+# 从包信息中取出Python版本
+def python_version_of(packages: List) -> Optional[str]:
+    """
+    从包信息列表 [packages_name, packages_version, packages_BuildChannel] 中取出 python 的版本
+    """
+    if packages and len(packages) >= 3:
         try:
-            if 'connection' in locals():
-                connection.close()
-        except:
+            python_idx = packages[0].index('python')
+            return packages[1][python_idx]
+        except (ValueError, IndexError):
             pass
+    return None
 
-# 第一次运行则创建数据库和表
-def create_databaseANDTable():
+# 包信息转换为 包名->版本 字典
+def versions_of(packages: List) -> Dict[str, str]:
     """
-    创建数据库和表结构（首次运行时）
-    数据库名：condaControlor
-    表名：environments，包含环境名称、路径、Python版本等信息
+    把 [packages_name, packages_version, ...] 转换为 {package_name: version}
     """
-    # 连接MySQL服务器
-    connection = pymysql.connect(
-        host='localhost',       # 数据库地址
-        user='chiruno',         # 用户名
-        password='123456',      # 密码
-        charset='utf8mb4',      # 字符编码
-    )
-
-    try:
-        with connection.cursor() as cursor:
-            # 创建数据库（使用utf8mb4字符集）
-            sql = "CREATE DATABASE IF NOT EXISTS `condaControlor` DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
-            cursor.execute(sql)
-            connection.commit()
-            
-            # 使用数据库
-            cursor.execute("USE condaControlor")
-            
-            # 创建环境表
-            create_env_table = """CREATE TABLE IF NOT EXISTS environments (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                env_name VARCHAR(255) UNIQUE NOT NULL,
-                path VARCHAR(512) NOT NULL,
-                python_version VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;"""
-            cursor.execute(create_env_table)
-
-            # 创建包表
-            create_package_table = """CREATE TABLE IF NOT EXISTS packages (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                env_name VARCHAR(255) NOT NULL,
-                package_name VARCHAR(255) NOT NULL,
-                version VARCHAR(100) NOT NULL,
-                build_channel VARCHAR(100),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                INDEX idx_env_name_package_name (env_name, package_name),
-                UNIQUE KEY uk_env_name_package_name_ver (env_name, package_name, version),
-                FOREIGN KEY (env_name) REFERENCES environments(env_name) ON DELETE CASCADE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;"""
-            cursor.execute(create_package_table)
-            connection.commit()
-            
-    except Exception as e:
-        print(f"创建数据库时出错: {e}")
-        raise
-    finally:
-        connection.close()
+    if not packages or len(packages) < 2:
+        return {}
+    return dict(zip(packages[0], packages[1]))
 
 # 数据库控制器类
 class MySQLController:
@@ -97,10 +266,12 @@ class MySQLController:
     MySQL数据库控制器，用于管理conda环境信息
     """
     
-    def __init__(self, host='localhost', user='chiruno', password='123456', database='condaControlor'):
+    def __init__(self, host='localhost', user='chiruno', password='123456', database='condaControlor', host_name=None):
         """
         初始化数据库连接参数
+        host_name 为环境所在的机器名（默认本机），所有读写都只针对该机器的数据
         """
+        self.host_name = host_name or LOCAL_HOST_NAME
         self.host = host
         self.user = user
         self.password = password
@@ -141,12 +312,13 @@ class MySQLController:
             self.connection = None
 
     # 保存全部环境信息
+    @traced("db.save_environments")
     def save_environments(self, env_data: Dict[str, List]) -> bool:
         """
         保存环境信息到数据库
         
         参数:
-            env_data: 环境数据字典，格式为 {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel]]}
+            env_data: 环境数据字典，格式为 {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]}
         
         返回:
             bool: 操作是否成功
@@ -157,48 +329,24 @@ class MySQLController:
 
         try:
             with self.connection.cursor() as cursor:
-                # 判断表是否为空
-                cursor.execute("SELECT * FROM environments")
-                if cursor.fetchone() is not None:
-                    # 清空数据表内现有的数据，直接删母表，子表的外键连接会让它一起被删除
-                    cursor.execute("DELETE FROM environments")                   
+                # 记录变更历史用的旧版本
+                old_versions = self._current_versions(cursor)
+
+                # 清空本机现有的数据，直接删母表，子表的外键连接会让它一起被删除
+                cursor.execute("DELETE FROM environments WHERE host_name = %s", (self.host_name,))
                 
                 # 重新插入环境数据
                 for env_name, env_info in env_data.items():
                     env_path = env_info[0]  # 环境路径列表
                     packages = env_info[1] if len(env_info) > 1 else [[], [], []]   # 包信息列表
                     
-                    # 获取Python版本
-                    python_version = None
-                    if packages and len(packages) == 3:
-                        package_names = packages[0]
-                        package_versions = packages[1]
-                        try:
-                            python_idx = package_names.index('python')
-                            python_version = package_versions[python_idx]
-                        except (ValueError, IndexError):
-                            pass
-                    
-                    # 插入环境信息到环境表（先插母表）
-                    cursor.execute(
-                        "INSERT INTO environments (env_name, path, python_version) VALUES (%s, %s, %s)",
-                        (env_name, env_path, python_version)
-                    )
-                    
-                    # 插入包信息到包表
-                    if packages and len(packages) == 3:
-                        package_names = packages[0]
-                        package_versions = packages[1]
-                        package_channels = packages[2]
-                        
-                        for i in range(len(package_names)):
-                            cursor.execute(
-                                "INSERT INTO packages (env_name, package_name, version, build_channel) VALUES (%s, %s, %s, %s)",
-                                (env_name, package_names[i], 
-                                 package_versions[i] if i < len(package_versions) else None,
-                                 package_channels[i] if i < len(package_channels) else None)
-                            )
+                    self._insert_environment(cursor, env_name, env_path, packages)
                 
+                # 只把有变化的包追加到历史中（压缩旧历史见 compact_history）
+                new_versions = {env_name: versions_of(env_info[1] if len(env_info) > 1 else None)
+                                for env_name, env_info in env_data.items()}
+                self._record_changes(cursor, "full", old_versions, new_versions)
+
                 # 提交事务
                 self.connection.commit()
                 return True
@@ -215,13 +363,243 @@ class MySQLController:
         finally:
             self.disconnect()
     
+    # 读取当前数据库中的包版本（调用方负责事务）
+    def _current_versions(self, cursor, env_name: str = None) -> Dict[str, Dict[str, str]]:
+        """
+        返回:
+            Dict[str, Dict[str, str]]: {env_name: {package_name: version}}
+        """
+        if env_name is None:
+            cursor.execute("SELECT env_name, package_name, version FROM packages WHERE host_name = %s", (self.host_name,))
+        else:
+            cursor.execute("SELECT env_name, package_name, version FROM packages WHERE host_name = %s AND env_name = %s",
+                           (self.host_name, env_name))
+        versions = {}
+        for row in cursor.fetchall():
+            versions.setdefault(row['env_name'], {})[row['package_name']] = row['version']
+        return versions
+
+    # 追加变更历史（调用方负责事务）
+    def _record_changes(self, cursor, scope: str, old: Dict[str, Dict[str, str]], new: Dict[str, Dict[str, str]]) -> int:
+        """
+        对比新旧版本，只把新增/删除/版本变化的包写入 package_history，没有变化则不创建快照
+        
+        参数:
+            scope: 快照范围（full 或 环境名称）
+            old / new: {env_name: {package_name: version}}，新数据中不存在的环境视为已删除
+        
+        返回:
+            int: 写入的变更条数
+        """
+        now = datetime.now()
+        changes = []
+        for env_name in old.keys() | new.keys():
+            old_pkgs = old.get(env_name, {})
+            new_pkgs = new.get(env_name, {})
+            for package_name in old_pkgs.keys() | new_pkgs.keys():
+                old_version = old_pkgs.get(package_name)
+                new_version = new_pkgs.get(package_name)
+                if old_version != new_version:
+                    changes.append((env_name, package_name, old_version, new_version))
+        if not changes:
+            return 0
+
+        cursor.execute(
+            "INSERT INTO snapshots (host_name, scope, change_count, created_at) VALUES (%s, %s, %s, %s)",
+            (self.host_name, scope, len(changes), now)
+        )
+        snapshot_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO package_history (snapshot_id, host_name, env_name, package_name, old_version, new_version, changed_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            [(snapshot_id, self.host_name) + change + (now,) for change in changes]
+        )
+        return len(changes)
+
+    # 压缩旧历史（调用方负责事务）
+    def _compact_history(self, cursor, keep_days: int) -> int:
+        """
+        保留期之前的历史，每个 (环境, 包) 只保留最后一条记录作为基线，已删除的包不保留，
+        这样历史表的大小约为「当前包数 + 保留期内的变更数」；只处理本机（self.host_name）的历史
+        
+        返回:
+            int: 删除的历史条数
+        """
+        cutoff = datetime.now() - timedelta(days=keep_days)
+        cursor.execute(
+            "DELETE h FROM package_history h "
+            "JOIN (SELECT host_name, env_name, package_name, MAX(id) AS keep_id FROM package_history "
+            "      WHERE host_name = %s AND changed_at < %s GROUP BY host_name, env_name, package_name) k "
+            "  ON h.host_name = k.host_name AND h.env_name = k.env_name AND h.package_name = k.package_name "
+            "WHERE h.host_name = %s AND h.changed_at < %s AND (h.id <> k.keep_id OR h.new_version IS NULL)",
+            (self.host_name, cutoff, self.host_name, cutoff)
+        )
+        deleted = cursor.rowcount
+        if deleted:
+            cursor.execute(
+                "DELETE FROM snapshots WHERE host_name = %s AND created_at < %s "
+                "AND id NOT IN (SELECT DISTINCT snapshot_id FROM package_history WHERE host_name = %s)",
+                (self.host_name, cutoff, self.host_name)
+            )
+        return deleted
+
+    # 插入单个环境及其包（调用方负责事务）
+    def _insert_environment(self, cursor, env_name: str, env_path: str, packages: List):
+        """
+        向环境表和包表插入一个环境的数据，不提交事务
+        """
+        # 插入环境信息到环境表（先插母表）
+        cursor.execute(
+            "INSERT INTO environments (host_name, env_name, path, python_version) VALUES (%s, %s, %s, %s)",
+            (self.host_name, env_name, env_path, python_version_of(packages))
+        )
+        
+        # 插入包信息到包表
+        if packages and len(packages) >= 3:
+            package_names = packages[0]
+            package_versions = packages[1]
+            package_channels = packages[2]
+            package_sources = packages[3] if len(packages) > 3 else []
+            
+            rows = [
+                (self.host_name, env_name, package_names[i],
+                 package_versions[i] if i < len(package_versions) else None,
+                 package_channels[i] if i < len(package_channels) else None,
+                 package_sources[i] if i < len(package_sources) else 'conda')
+                for i in range(len(package_names))
+            ]
+            if rows:
+                cursor.executemany(
+                    "INSERT INTO packages (host_name, env_name, package_name, version, build_channel, source) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    rows
+                )
+
+    # 保存单个环境信息
+    @traced("db.save_environment")
+    def save_environment(self, env_name: str, env_info: List) -> bool:
+        """
+        只更新单个环境的数据（环境行及其全部包），不影响其他环境
+        
+        参数:
+            env_name: 环境名称
+            env_info: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]
+        
+        返回:
+            bool: 操作是否成功
+        """
+        if not self.connect():
+            print("保存单个环境信息error: 无法连接数据库")
+            return False
+
+        try:
+            with self.connection.cursor() as cursor:
+                old_versions = self._current_versions(cursor, env_name)
+                # 先删除旧的环境行，外键级联删除它的包，再重新插入
+                cursor.execute("DELETE FROM environments WHERE host_name = %s AND env_name = %s", (self.host_name, env_name))
+                packages = env_info[1] if len(env_info) > 1 else [[], [], []]
+                self._insert_environment(cursor, env_name, env_info[0], packages)
+                self._record_changes(cursor, env_name, old_versions, {env_name: versions_of(packages)})
+                self.connection.commit()
+                return True
+        except Exception as e:
+            try:
+                if self.connection:
+                    self.connection.rollback()
+            except:
+                pass
+            print(f"保存环境 {env_name} 时出错: {e}")
+            return False
+        finally:
+            self.disconnect()
+
+    # 删除单个环境信息
+    @traced("db.delete_environment")
+    def delete_environment(self, env_name: str) -> bool:
+        """
+        删除单个环境的数据，包表中的数据由外键级联删除
+        
+        参数:
+            env_name: 环境名称
+        
+        返回:
+            bool: 操作是否成功
+        """
+        if not self.connect():
+            print("删除环境信息error: 无法连接数据库")
+            return False
+
+        try:
+            with self.connection.cursor() as cursor:
+                old_versions = self._current_versions(cursor, env_name)
+                cursor.execute("DELETE FROM environments WHERE host_name = %s AND env_name = %s", (self.host_name, env_name))
+                self._record_changes(cursor, env_name, old_versions, {})
+                self.connection.commit()
+                return True
+        except Exception as e:
+            try:
+                if self.connection:
+                    self.connection.rollback()
+            except:
+                pass
+            print(f"删除环境 {env_name} 时出错: {e}")
+            return False
+        finally:
+            self.disconnect()
+
+    # 批量应用增量
+    @traced("db.apply_delta")
+    def apply_delta(self, changed: Dict[str, List], removed: List[str] = (), scope: str = "delta") -> bool:
+        """
+        在一个事务中应用多个环境的增量：changed 中的环境整体替换，removed 中的环境删除
+
+        参数:
+            changed: {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]}
+            removed: 要删除的环境名称列表
+            scope: 写入快照表的范围说明
+
+        返回:
+            bool: 操作是否成功
+        """
+        if not changed and not removed:
+            return True
+        if not self.connect():
+            print("应用环境增量error: 无法连接数据库")
+            return False
+
+        try:
+            with self.connection.cursor() as cursor:
+                old_versions = {}
+                new_versions = {}
+                for env_name in list(changed) + list(removed):
+                    old_versions.update(self._current_versions(cursor, env_name))
+                    cursor.execute("DELETE FROM environments WHERE host_name = %s AND env_name = %s", (self.host_name, env_name))
+                for env_name, env_info in changed.items():
+                    packages = env_info[1] if len(env_info) > 1 else [[], [], []]
+                    self._insert_environment(cursor, env_name, env_info[0], packages)
+                    new_versions[env_name] = versions_of(packages)
+                self._record_changes(cursor, scope, old_versions, new_versions)
+                self.connection.commit()
+                return True
+        except Exception as e:
+            try:
+                if self.connection:
+                    self.connection.rollback()
+            except:
+                pass
+            print(f"应用环境增量时出错: {e}")
+            return False
+        finally:
+            self.disconnect()
+
     # 加载全部环境信息
+    @traced("db.load_environments")
     def load_environments(self) -> Optional[Dict[str, List]]:
         """
         从数据库加载环境信息
         
         return:
-            Dict[str, List]: 环境数据字典，格式为 {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel]]}
+            Dict[str, List]: 环境数据字典，格式为 {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]}
             None: 加载失败
         """
         if not self.connect():
@@ -231,7 +609,7 @@ class MySQLController:
         try:
             with self.connection.cursor() as cursor:
                 # 查询所有环境
-                cursor.execute("SELECT * FROM environments")
+                cursor.execute("SELECT * FROM environments WHERE host_name = %s", (self.host_name,))
                 environments = cursor.fetchall()    # 环境表的行字典的列表
                 
                 if not environments:
@@ -245,21 +623,23 @@ class MySQLController:
                     env_path = env['path']
                     
                     # 查询该环境的包
-                    cursor.execute("SELECT * FROM packages WHERE env_name = %s", (env_name,))
+                    cursor.execute("SELECT * FROM packages WHERE host_name = %s AND env_name = %s", (self.host_name, env_name))
                     packages = cursor.fetchall()    # 包表的行字典的列表
                     
                     # 整理包信息
                     package_names = []
                     package_versions = []
                     package_channels = []
+                    package_sources = []
                     
                     for pkg in packages:
                         package_names.append(pkg['package_name'])
                         package_versions.append(pkg['version'] or '')
                         package_channels.append(pkg['build_channel'] or '')
+                        package_sources.append(pkg.get('source') or 'conda')
                     
                     # 存储环境数据
-                    env_data[env_name] = [env_path, [package_names, package_versions, package_channels]]
+                    env_data[env_name] = [env_path, [package_names, package_versions, package_channels, package_sources]]
                 
                 return env_data
                 
@@ -269,7 +649,144 @@ class MySQLController:
         finally:
             self.disconnect()
     
+    # 加载单个环境的包列表
+    @traced("db.load_env_packages")
+    def load_env_packages(self, env_name: str) -> Optional[List]:
+        """
+        按需加载单个环境的包列表（配合 list_environments 使用，启动时不加载任何包）
+
+        参数:
+            env_name: 环境名称
+
+        返回:
+            List: [packages_name, packages_version, packages_BuildChannel, packages_source]
+            None: 查询失败
+        """
+        if not self.connect():
+            print("加载环境包列表error：无法连接数据库")
+            return None
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT package_name, version, build_channel, source FROM packages "
+                    "WHERE host_name = %s AND env_name = %s ORDER BY id",
+                    (self.host_name, env_name)
+                )
+                rows = cursor.fetchall()
+                return [
+                    [row['package_name'] for row in rows],
+                    [row['version'] for row in rows],
+                    [row['build_channel'] for row in rows],
+                    [row['source'] or 'conda' for row in rows],
+                ]
+        except Exception as e:
+            print(f"加载环境 {env_name} 的包列表时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
+
+    # 获取环境列表（不含包）
+    @traced("db.list_environments")
+    def list_environments(self) -> Optional[List[Dict]]:
+        """
+        一次查询获取所有环境的基本信息和包数量，不加载包列表
+        
+        返回:
+            List[Dict]: 每个元素包含 env_name、path、python_version、package_count、updated_at
+            None: 查询失败
+        """
+        if not self.connect():
+            print("获取环境列表error：无法连接数据库")
+            return None
+            
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT e.env_name, e.path, e.python_version, e.updated_at, COUNT(p.id) AS package_count "
+                    "FROM environments e LEFT JOIN packages p ON p.host_name = e.host_name AND p.env_name = e.env_name "
+                    "WHERE e.host_name = %s GROUP BY e.id ORDER BY e.id",
+                    (self.host_name,)
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"获取环境列表时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
+    
+    # 流式读取全部清单
+    def iter_inventory_rows(self, chunk_size: int = 5000, all_hosts: bool = False):
+        """
+        用服务端游标按 (host_name, env_name) 顺序流式读取环境和包，内存占用只与 chunk_size 有关
+
+        参数:
+            chunk_size: 每次返回的行数
+            all_hosts: 是否读取所有机器，默认只读取本机
+
+        返回值:
+            生成器，每次产生一个元组列表，元组顺序为 INVENTORY_COLUMNS；没有包的环境产生一行包字段为 None 的记录
+        """
+        if not self.connect():
+            print("读取清单error：无法连接数据库")
+            return
+
+        where = "" if all_hosts else "WHERE e.host_name = %s"
+        params = () if all_hosts else (self.host_name,)
+        try:
+            with self.connection.cursor(pymysql.cursors.SSCursor) as cursor:
+                cursor.execute(
+                    "SELECT e.host_name, e.env_name, e.path, e.python_version, "
+                    "p.package_name, p.version, p.build_channel, p.source "
+                    "FROM environments e LEFT JOIN packages p ON p.host_name = e.host_name AND p.env_name = e.env_name "
+                    f"{where} ORDER BY e.host_name, e.env_name, p.package_name",
+                    params
+                )
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+        except Exception as e:
+            print(f"读取清单时出错: {e}")
+        finally:
+            self.disconnect()
+
+    # 跨环境查找包
+    @traced("db.find_packages")
+    def find_packages(self, package_name: str, like: bool = False) -> Optional[List[Dict]]:
+        """
+        在所有环境中查找指定名称的包
+        
+        参数:
+            package_name (str): 包名称
+            like (bool): 是否按 SQL LIKE 模式匹配（可使用 % 通配符）
+            
+        返回:
+            List[Dict]: 包信息列表，每个元素包含 env_name、package_name、version、build_channel、source
+            None: 查询失败
+        """
+        if not self.connect():
+            print("查找包信息error：无法连接数据库")
+            return None
+            
+        try:
+            with self.connection.cursor() as cursor:
+                operator = "LIKE" if like else "="
+                cursor.execute(
+                    f"SELECT env_name, package_name, version, build_channel, source FROM packages "
+                    f"WHERE host_name = %s AND package_name {operator} %s ORDER BY env_name, package_name",
+                    (self.host_name, package_name)
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"查找包信息时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
+    
     # 获取所有环境的Python版本信息
+    @traced("db.get_python_versions")
     def get_python_versions(self) -> Optional[Dict[str, str]]:
         """
         获取所有环境的Python版本信息
@@ -284,7 +801,8 @@ class MySQLController:
             
         try:
             with self.connection.cursor() as cursor:
-                cursor.execute("SELECT env_name, python_version FROM environments WHERE python_version IS NOT NULL")
+                cursor.execute("SELECT env_name, python_version FROM environments WHERE host_name = %s AND python_version IS NOT NULL",
+                               (self.host_name,))
                 results = cursor.fetchall()
                 
                 python_versions = {}    # 同于返回的Python版本信息字典
@@ -300,6 +818,7 @@ class MySQLController:
             self.disconnect()
     
     # 清空所有数据和包
+    @traced("db.clear_data")
     def clear_data(self) -> bool:
         """
         清空所有环境和包数据
@@ -312,9 +831,9 @@ class MySQLController:
             
         try:
             with self.connection.cursor() as cursor:
-                # 清空数据
-                cursor.execute("DELETE FROM packages")
-                cursor.execute("DELETE FROM environments")
+                # 清空本机的数据
+                cursor.execute("DELETE FROM packages WHERE host_name = %s", (self.host_name,))
+                cursor.execute("DELETE FROM environments WHERE host_name = %s", (self.host_name,))
                 
                 # 提交事务
                 self.connection.commit()
@@ -333,6 +852,7 @@ class MySQLController:
             self.disconnect()
     
     # 根据环境名称获取包信息
+    @traced("db.get_packages_by_env")
     def get_packages_by_env(self, env_name: str) -> Optional[List[Dict]]:
         """
         根据环境名称获取包信息
@@ -350,7 +870,7 @@ class MySQLController:
             
         try:
             with self.connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM packages WHERE env_name = %s", (env_name,))
+                cursor.execute("SELECT * FROM packages WHERE host_name = %s AND env_name = %s", (self.host_name, env_name))
                 return cursor.fetchall()
         except Exception as e:
             print(f"查询环境包信息时出错: {e}")
@@ -359,6 +879,7 @@ class MySQLController:
             self.disconnect()
     
     # 获取特定环境、包名称的包信息
+    @traced("db.get_package_by_env_and_name")
     def get_package_by_env_and_name(self, env_name: str, package_name: str) -> Optional[Dict]:
         """
         根据环境名称和包名称获取特定包信息
@@ -377,8 +898,8 @@ class MySQLController:
             
         try:
             with self.connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM packages WHERE env_name = %s AND package_name = %s", 
-                              (env_name, package_name))
+                cursor.execute("SELECT * FROM packages WHERE host_name = %s AND env_name = %s AND package_name = %s", 
+                              (self.host_name, env_name, package_name))
                 return cursor.fetchone()
         except Exception as e:
             print(f"查询特定包信息时出错: {e}")
@@ -387,6 +908,7 @@ class MySQLController:
             self.disconnect()
     
     # 检查包是否存在
+    @traced("db.package_exists")
     def package_exists(self, env_name: str, package_name: str) -> bool:
         """
         检查特定包是否存在于指定环境中
@@ -401,6 +923,7 @@ class MySQLController:
         return self.get_package_by_env_and_name(env_name, package_name) is not None
     
     # 更新包版本
+    @traced("db.update_package_version")
     def update_package_version(self, env_name: str, package_name: str, version: str) -> bool:
         """
         更新包的版本信息
@@ -419,13 +942,22 @@ class MySQLController:
             
         try:
             with self.connection.cursor() as cursor:
-                cursor.execute("UPDATE packages SET version = %s, updated_at = CURRENT_TIMESTAMP WHERE env_name = %s AND package_name = %s",
-                              (version, env_name, package_name))
+                cursor.execute("SELECT version FROM packages WHERE host_name = %s AND env_name = %s AND package_name = %s",
+                              (self.host_name, env_name, package_name))
+                old = cursor.fetchone()
+                cursor.execute("UPDATE packages SET version = %s, updated_at = CURRENT_TIMESTAMP "
+                               "WHERE host_name = %s AND env_name = %s AND package_name = %s",
+                              (version, self.host_name, env_name, package_name))
+                updated = cursor.rowcount > 0
+                if updated and old:
+                    self._record_changes(cursor, env_name,
+                                         {env_name: {package_name: old['version']}},
+                                         {env_name: {package_name: version}})
                 
                 # 提交事务
                 if self.connection:
                     self.connection.commit()
-                return cursor.rowcount > 0
+                return updated
                 
         except Exception as e:
             # 回滚事务
@@ -437,4 +969,301 @@ class MySQLController:
             print(f"更新包版本时出错: {e}")
             return False
         finally:
-            self.disconnect()
\ No newline at end of file
+            self.disconnect()
+
+    # 查询环境在某个时间点的状态
+    @traced("db.get_env_state_at")
+    def get_env_state_at(self, env_name: str, at: datetime) -> Optional[Dict[str, str]]:
+        """
+        根据变更历史还原环境在指定时间点的包版本（早于保留期的时间点只能还原到压缩后的基线）
+        
+        参数:
+            env_name (str): 环境名称
+            at (datetime): 时间点
+            
+        返回:
+            Dict[str, str]: {package_name: version}，该时间点环境不存在则为空字典
+            None: 查询失败
+        """
+        if not self.connect():
+            print("查询历史状态error：无法连接数据库")
+            return None
+            
+        try:
+            with self.connection.cursor() as cursor:
+                # 每个包取该时间点之前的最后一条记录，new_version 为空表示那时已被删除
+                cursor.execute(
+                    "SELECT h.package_name, h.new_version FROM package_history h "
+                    "JOIN (SELECT package_name, MAX(id) AS last_id FROM package_history "
+                    "      WHERE host_name = %s AND env_name = %s AND changed_at <= %s GROUP BY package_name) last "
+                    "  ON h.id = last.last_id "
+                    "WHERE h.new_version IS NOT NULL ORDER BY h.package_name",
+                    (self.host_name, env_name, at)
+                )
+                return {row['package_name']: row['new_version'] for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"查询历史状态时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
+    
+    # 查询包的变更记录
+    @traced("db.get_package_history")
+    def get_package_history(self, package_name: str = None, env_name: str = None,
+                            since: datetime = None, until: datetime = None, limit: int = 1000,
+                            all_hosts: bool = False) -> Optional[List[Dict]]:
+        """
+        查询变更记录，如「numpy 在哪些环境、什么时候变过」或「某个环境最近的变更」
+        
+        参数:
+            package_name (str, optional): 包名称
+            env_name (str, optional): 环境名称
+            since / until (datetime, optional): 时间范围
+            limit (int): 最多返回的条数（最新的在前）
+            all_hosts (bool): 是否查询所有机器，默认只查本机
+            
+        返回:
+            List[Dict]: 每条包含 snapshot_id、host_name、env_name、package_name、old_version、new_version、changed_at
+            None: 查询失败
+        """
+        if not self.connect():
+            print("查询变更记录error：无法连接数据库")
+            return None
+            
+        conditions = []
+        params = []
+        if not all_hosts:
+            conditions.append("host_name = %s")
+            params.append(self.host_name)
+        if package_name:
+            conditions.append("package_name = %s")
+            params.append(package_name)
+        if env_name:
+            conditions.append("env_name = %s")
+            params.append(env_name)
+        if since:
+            conditions.append("changed_at >= %s")
+            params.append(since)
+        if until:
+            conditions.append("changed_at <= %s")
+            params.append(until)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT snapshot_id, host_name, env_name, package_name, old_version, new_version, changed_at "
+                    f"FROM package_history {where} ORDER BY changed_at DESC, id DESC LIMIT %s",
+                    params + [limit]
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"查询变更记录时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
+    
+    # 压缩变更历史
+    @traced("db.compact_history")
+    def compact_history(self, keep_days: int = HISTORY_RETENTION_DAYS) -> int:
+        """
+        压缩本机的变更历史（保存时不会自动压缩，由 cli.py history --compact 或定时任务调用）
+        
+        参数:
+            keep_days (int): 保留完整历史的天数
+            
+        返回:
+            int: 删除的历史条数，失败返回 -1
+        """
+        if not self.connect():
+            print("压缩变更历史error：无法连接数据库")
+            return -1
+            
+        try:
+            with self.connection.cursor() as cursor:
+                deleted = self._compact_history(cursor, keep_days)
+                self.connection.commit()
+                return deleted
+        except Exception as e:
+            try:
+                if self.connection:
+                    self.connection.rollback()
+            except:
+                pass
+            print(f"压缩变更历史时出错: {e}")
+            return -1
+        finally:
+            self.disconnect()
+
+    # === 多主机查询（不按本机过滤） ===
+
+    # 列出所有上报过的主机
+    @traced("db.list_hosts")
+    def list_hosts(self) -> Optional[List[Dict]]:
+        """
+        返回:
+            List[Dict]: 每台主机的 host_name、env_count、last_update
+        """
+        if not self.connect():
+            return None
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT host_name, COUNT(*) AS env_count, MAX(updated_at) AS last_update "
+                    "FROM environments GROUP BY host_name ORDER BY host_name"
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"查询主机列表时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
+
+    # 跨主机查找环境
+    @traced("db.fleet_find_envs")
+    def fleet_find_envs(self, env_name: str = None, python_version: str = None) -> Optional[List[Dict]]:
+        """
+        跨主机查找环境，如"哪些机器上有 env X 且 Python 为 3.9"
+
+        参数:
+            env_name: 环境名称，不传则不限
+            python_version: Python 版本，按版本前缀匹配（3.9 匹配 3.9 和 3.9.x）
+
+        返回:
+            List[Dict]: 每条包含 host_name、env_name、path、python_version、updated_at
+        """
+        conditions = []
+        params = []
+        if env_name:
+            conditions.append("env_name = %s")
+            params.append(env_name)
+        if python_version:
+            # 等值 + 前缀 LIKE，都能用上 idx_env_python 索引
+            conditions.append("(python_version = %s OR python_version LIKE %s)")
+            params += [python_version, python_version + ".%"]
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+        if not self.connect():
+            return None
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT host_name, env_name, path, python_version, updated_at FROM environments {where} "
+                    f"ORDER BY host_name, env_name",
+                    params
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"跨主机查找环境时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
+
+    # 跨主机查找包
+    @traced("db.fleet_find_packages")
+    def fleet_find_packages(self, package_name: str, version: str = None) -> Optional[List[Dict]]:
+        """
+        跨主机查找安装了某个包的环境
+
+        参数:
+            package_name: 包名称
+            version: 版本，按版本前缀匹配，不传则不限
+
+        返回:
+            List[Dict]: 每条包含 host_name、env_name、package_name、version、source
+        """
+        sql = "SELECT host_name, env_name, package_name, version, source FROM packages WHERE package_name = %s"
+        params = [package_name]
+        if version:
+            sql += " AND (version = %s OR version LIKE %s)"
+            params += [version, version + ".%"]
+
+        if not self.connect():
+            return None
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql + " ORDER BY host_name, env_name", params)
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"跨主机查找包时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
+
+    # 累加模块导入统计
+    @traced("db.save_module_usage")
+    def save_module_usage(self, usage: Dict[str, Dict[str, Tuple[int, datetime]]]) -> bool:
+        """
+        在一个事务中累加各环境的模块导入次数，最后导入时间取较新的一个
+
+        参数:
+            usage: {env_name: {module_name: (导入次数, 最后导入时间)}}
+
+        返回:
+            bool: 操作是否成功
+        """
+        rows = [(self.host_name, env_name, module_name, count, last_imported)
+                for env_name, modules in usage.items()
+                for module_name, (count, last_imported) in modules.items()]
+        if not rows:
+            return True
+        if not self.connect():
+            print("保存模块导入统计error: 无法连接数据库")
+            return False
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.executemany(
+                    "INSERT INTO module_usage (host_name, env_name, module_name, import_count, last_imported) "
+                    "VALUES (%s, %s, %s, %s, %s) "
+                    "ON DUPLICATE KEY UPDATE import_count = import_count + VALUES(import_count), "
+                    "last_imported = GREATEST(last_imported, VALUES(last_imported))",
+                    rows
+                )
+                self.connection.commit()
+                return True
+        except Exception as e:
+            try:
+                if self.connection:
+                    self.connection.rollback()
+            except:
+                pass
+            print(f"保存模块导入统计时出错: {e}")
+            return False
+        finally:
+            self.disconnect()
+
+    # 读取模块导入统计
+    @traced("db.get_module_usage")
+    def get_module_usage(self, env_name: str = None) -> Optional[Dict[str, Dict[str, Dict]]]:
+        """
+        参数:
+            env_name: 只读取指定环境，不传则读取本机所有环境
+
+        返回:
+            Dict: {env_name: {module_name: {"import_count", "last_imported"}}}
+            None: 查询失败
+        """
+        sql = "SELECT env_name, module_name, import_count, last_imported FROM module_usage WHERE host_name = %s"
+        params = [self.host_name]
+        if env_name:
+            sql += " AND env_name = %s"
+            params.append(env_name)
+
+        if not self.connect():
+            return None
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                usage = {}
+                for row in cursor.fetchall():
+                    usage.setdefault(row['env_name'], {})[row['module_name']] = {
+                        "import_count": row['import_count'],
+                        "last_imported": row['last_imported'],
+                    }
+                return usage
+        except Exception as e:
+            print(f"读取模块导入统计时出错: {e}")
+            return None
+        finally:
+            self.disconnect()
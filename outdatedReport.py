@@ -0,0 +1,126 @@
+# outdatedReport.py
+"""
+过期包报告：把所有环境中的 conda 包与本地可用版本索引（repodataIndex）比较，
+给出每个环境和全部环境汇总的"落后于最新版本"情况，不调用 conda update --dry-run
+
+批量计算：先收集所有环境中出现的包名，一次批量查询索引；
+每个不同的版本字符串只计算一次排序键，再逐个 (包名, 已安装版本) 比较
+"""
+import csv
+import io
+import json
+
+from repodataIndex import RepodataIndex, version_key
+
+# 比较策略：latest 为索引中的最新版本；same-major 为主版本号相同的最新版本（通常没有破坏性变化）
+POLICIES = ('latest', 'same-major')
+
+
+# 主版本号
+def _major(version: str):
+    key = version_key(version)
+    first = key[1][0]
+    # 末尾的 0 段在排序键中被去掉了（0、0.0rc1 的第一段不是数字），主版本号按 0 处理
+    return key[0], first if first[0] == 1 and first[1] >= 0 else (1, 0, '')
+
+
+# 生成过期包报告
+def build_report(env_data: dict, index: RepodataIndex, policy: str = 'latest') -> dict:
+    """
+    参数:
+        env_data: {env_name: [env_path, [packages_name, packages_version, packages_BuildChannel, packages_source]]}
+        index: 已刷新的可用版本索引
+        policy: 比较策略，见 POLICIES
+
+    返回值:
+        dict: {
+            "policy": 策略,
+            "environments": {环境名: {"total": 包数, "outdated": [{"package_name", "installed", "latest"}...]}},
+            "packages": {包名: {"latest": 最新版本, "envs": {环境名: 已安装版本}}}（只包含过期的包，即全部环境汇总）,
+            "summary": {"environments": 环境数, "packages": 比较的包数, "outdated": 过期的(环境, 包)数,
+                        "outdated_envs": 有过期包的环境数, "unknown": 索引中没有的包名数}
+        }
+    """
+    # 收集 conda 安装的 (环境, 包, 版本)，pip 包的版本体系不同，不参与比较
+    installed = []
+    for env_name, env_info in env_data.items():
+        packages = env_info[1] if len(env_info) > 1 and env_info[1] else [[], [], []]
+        sources = packages[3] if len(packages) > 3 else ["conda"] * len(packages[0])
+        for name, version, source in zip(packages[0], packages[1], sources):
+            if source != "pip":
+                installed.append((env_name, name, version))
+
+    names = {name for _, name, _ in installed}
+    candidates = index.versions_by_name(names)
+
+    # 每个不同的版本字符串只计算一次排序键
+    keys = {}
+
+    def key_of(version):
+        key = keys.get(version)
+        if key is None:
+            key = keys[version] = version_key(version)
+        return key
+
+    # 每个包的最新版本（same-major 策略按主版本号分组）
+    latest = {}
+    for name, versions in candidates.items():
+        if policy == 'same-major':
+            groups = {}
+            for version in versions:
+                major = _major(version)
+                if major not in groups or key_of(version) > key_of(groups[major]):
+                    groups[major] = version
+            latest[name] = groups
+        else:
+            latest[name] = max(versions, key=key_of)
+
+    environments = {env_name: {"total": 0, "outdated": []} for env_name in env_data}
+    packages = {}
+    for env_name, name, version in installed:
+        environments[env_name]["total"] += 1
+        target = latest.get(name)
+        if isinstance(target, dict):
+            target = target.get(_major(version))
+        if target is None or key_of(target) <= key_of(version):
+            continue
+        environments[env_name]["outdated"].append({"package_name": name, "installed": version, "latest": target})
+        entry = packages.setdefault(name, {"latest": target, "envs": {}})
+        entry["envs"][env_name] = version
+        if key_of(target) > key_of(entry["latest"]):
+            entry["latest"] = target
+
+    outdated_count = sum(len(info["outdated"]) for info in environments.values())
+    return {
+        "policy": policy,
+        "environments": environments,
+        "packages": {name: packages[name] for name in sorted(packages, key=lambda n: -len(packages[n]["envs"]))},
+        "summary": {
+            "environments": len(environments),
+            "packages": len(installed),
+            "outdated": outdated_count,
+            "outdated_envs": sum(1 for info in environments.values() if info["outdated"]),
+            "unknown": len(names - candidates.keys()),
+        },
+    }
+
+
+# 导出报告
+def export_report(report: dict, fmt: str = 'json') -> str:
+    """
+    参数:
+        report: build_report 的返回值
+        fmt: json 为完整报告；csv 为每个 (环境, 包) 一行，便于导入表格
+
+    返回值:
+        str: 导出的文本
+    """
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["env_name", "package_name", "installed", "latest"])
+        for env_name, info in report["environments"].items():
+            for row in info["outdated"]:
+                writer.writerow([env_name, row["package_name"], row["installed"], row["latest"]])
+        return buffer.getvalue()
+    return json.dumps(report, ensure_ascii=False, indent=2)
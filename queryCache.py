@@ -0,0 +1,175 @@
+# queryCache.py
+"""
+MySQLController 前面的读缓存：重复的查询直接在进程内返回，不再访问数据库
+
+- 缓存按 (数据库地址, 数据库名, 主机名) 在进程内共享，界面和各工作线程创建的控制器使用同一份缓存
+- 版本号失效：每次写入都会递增版本号，缓存键中带有查询时的版本号，写入之后旧的条目不会再被命中，
+  最终由 LRU 淘汰；单个环境的写入只让该环境的条目失效
+- 否定结果也会缓存：环境中没有某个包、环境不存在（空列表）都是有效的查询结果；
+  查询失败（返回 None）不缓存
+- 其他进程（如另一台机器的收集器）的写入不会让本进程的缓存失效，需要时调用 invalidate()
+"""
+import threading
+
+from lruCache import LRUCache, MISSING
+from mysqlcontroller import MySQLController
+
+# 每个数据库最多缓存的查询结果数
+QUERY_CACHE_SIZE = 256
+
+
+# 一个数据库（一台机器的数据）的缓存状态
+class _CacheState:
+    def __init__(self, capacity: int):
+        self.cache = LRUCache(capacity)
+        self.lock = threading.Lock()
+        self.generation = 0         # 全量写入（save_environments / clear_data）时递增，所有条目失效
+        self.writes = 0             # 每次写入都递增，用于依赖所有环境的查询
+        self.env_versions = {}      # 环境名称 -> 该环境的写入次数
+
+    # 查询单个环境时使用的版本
+    def env_version(self, env_name: str) -> tuple:
+        with self.lock:
+            return self.generation, self.env_versions.get(env_name, 0)
+
+    # 查询所有环境时使用的版本
+    def all_version(self) -> tuple:
+        with self.lock:
+            return self.generation, self.writes
+
+    # 记录写入
+    def bump(self, env_names=None):
+        """
+        参数:
+            env_names: 写入的环境名称，为 None 表示可能影响所有环境
+        """
+        with self.lock:
+            self.writes += 1
+            if env_names is None:
+                self.generation += 1
+                self.env_versions.clear()
+            else:
+                for env_name in env_names:
+                    self.env_versions[env_name] = self.env_versions.get(env_name, 0) + 1
+
+
+_states = {}
+_states_lock = threading.Lock()
+
+
+# 获取数据库对应的缓存状态
+def _state_for(controller: MySQLController, capacity: int) -> _CacheState:
+    key = (controller.host, controller.database, controller.host_name)
+    with _states_lock:
+        state = _states.get(key)
+        if state is None:
+            state = _states[key] = _CacheState(capacity)
+        return state
+
+
+class CachedMySQLController(MySQLController):
+    """
+    带读缓存的数据库控制器，用法与 MySQLController 相同
+    """
+
+    def __init__(self, *args, cache_size: int = QUERY_CACHE_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._state = _state_for(self, cache_size)
+
+    # 缓存命中统计
+    def cache_stats(self) -> dict:
+        cache = self._state.cache
+        return {"size": len(cache), "capacity": cache.capacity, "hits": cache.hits, "misses": cache.misses}
+
+    # 让本数据库的所有缓存失效（如其他进程写入了数据）
+    def invalidate(self, env_names=None):
+        self._state.bump(env_names)
+
+    # 先查缓存，未命中再查询数据库
+    def _cached(self, key: tuple, query):
+        value = self._state.cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        value = query()
+        if value is not None:   # 查询失败不缓存，下次重新查询
+            self._state.cache.put(key, value)
+        return value
+
+    # === 读 ===
+
+    def get_packages_by_env(self, env_name: str):
+        # 版本号在查询之前读取，查询期间发生的写入会让这次的结果立即失效
+        key = ("packages", env_name) + self._state.env_version(env_name)
+        rows = self._cached(key, lambda: super(CachedMySQLController, self).get_packages_by_env(env_name))
+        return [dict(row) for row in rows] if rows is not None else None
+
+    # 环境的包索引 {包名: 行}，同一环境的按名查询（包括不存在的包）都由它回答
+    def _package_index(self, env_name: str):
+        key = ("package_index", env_name) + self._state.env_version(env_name)
+
+        def query():
+            rows = super(CachedMySQLController, self).get_packages_by_env(env_name)
+            return {row['package_name']: row for row in rows} if rows is not None else None
+        return self._cached(key, query)
+
+    def get_package_by_env_and_name(self, env_name: str, package_name: str):
+        index = self._package_index(env_name)
+        if index is None:
+            return None
+        row = index.get(package_name)
+        return dict(row) if row is not None else None
+
+    # 按需加载的包列表（界面选中环境时），每个环境单独失效
+    def load_env_packages(self, env_name: str):
+        key = ("env_packages", env_name) + self._state.env_version(env_name)
+        packages = self._cached(key, lambda: super(CachedMySQLController, self).load_env_packages(env_name))
+        return [list(column) for column in packages] if packages is not None else None
+
+    # 环境列表（含包数量），任何环境的写入都会改变它
+    def list_environments(self):
+        key = ("env_list",) + self._state.all_version()
+        rows = self._cached(key, lambda: super(CachedMySQLController, self).list_environments())
+        return [dict(row) for row in rows] if rows is not None else None
+
+    def get_python_versions(self):
+        key = ("python_versions",) + self._state.all_version()
+        versions = self._cached(key, lambda: super(CachedMySQLController, self).get_python_versions())
+        return dict(versions) if versions is not None else None
+
+    # === 写（写入后递增版本号，无论成功与否） ===
+
+    def save_environments(self, env_data):
+        try:
+            return super().save_environments(env_data)
+        finally:
+            self._state.bump()
+
+    def save_environment(self, env_name: str, env_info):
+        try:
+            return super().save_environment(env_name, env_info)
+        finally:
+            self._state.bump([env_name])
+
+    def delete_environment(self, env_name: str):
+        try:
+            return super().delete_environment(env_name)
+        finally:
+            self._state.bump([env_name])
+
+    def apply_delta(self, changed, removed=(), scope: str = "delta"):
+        try:
+            return super().apply_delta(changed, removed, scope)
+        finally:
+            self._state.bump(list(changed) + list(removed))
+
+    def update_package_version(self, env_name: str, package_name: str, version: str):
+        try:
+            return super().update_package_version(env_name, package_name, version)
+        finally:
+            self._state.bump([env_name])
+
+    def clear_data(self):
+        try:
+            return super().clear_data()
+        finally:
+            self._state.bump()
@@ -0,0 +1,278 @@
+# repodataIndex.py
+"""
+离线的可用版本索引：把 conda 缓存在 <conda_path>/pkgs/cache/*.json 中的 repodata 解析一次，
+按包名存入 SQLite（只保留 包名 + 版本 + 渠道，不保留每个 build），之后的查询不再读取原始 JSON
+
+缓存文件的 (大小, mtime) 记录在索引中，refresh() 只重新解析变化过的文件；
+conda 重新下载 repodata 后（如执行过 conda install / conda search），下一次 refresh() 就会更新
+
+用于安装对话框的版本自动补全，以及"有新版本可用"的提示
+"""
+import json
+import os
+import re
+import sqlite3
+import time
+
+from condaEnvManager import conda_path_file
+from tracing import span
+
+# 索引表结构
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS sources (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        channel TEXT,
+        subdir TEXT,
+        indexed_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS versions (
+        name TEXT NOT NULL,
+        version TEXT NOT NULL,
+        channel TEXT NOT NULL,
+        source_path TEXT NOT NULL,
+        PRIMARY KEY (name, version, channel, source_path)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS idx_versions_source ON versions (source_path)",
+]
+
+# 一次 IN 查询的最大参数个数（SQLite 默认上限 999）
+QUERY_BATCH = 500
+
+_VERSION_PART = re.compile(r'\d+|[a-zA-Z]+')
+# 预发布标记，排在正式版本之前
+_PRE_RELEASE = {'dev': -4, 'a': -3, 'alpha': -3, 'b': -2, 'beta': -2, 'rc': -1, 'c': -1}
+
+
+# 版本排序键
+def version_key(version: str) -> tuple:
+    """
+    近似 conda 的版本排序：按 . _ - 分段，数字按数值比较，末尾的 0 段不影响大小（2.1 == 2.1.0），
+    dev/a/b/rc 等预发布标记排在正式版本之前，post 等其他字母排在正式版本之后、下一个数字段之前
+    （1.0 < 1.0.post1 < 1.0.1）；epoch（1!2.0）和本地版本（+xxx）分别取前缀和去除
+
+    返回值:
+        tuple: 可直接比较大小的排序键
+    """
+    version = version.strip().lower()
+    epoch = 0
+    if '!' in version:
+        epoch_text, version = version.split('!', 1)
+        epoch = int(epoch_text) if epoch_text.isdigit() else 0
+    version = version.split('+', 1)[0]
+    key = []
+    for part in _VERSION_PART.findall(version):
+        if part.isdigit():
+            key.append((1, int(part), ''))
+        elif part in _PRE_RELEASE:
+            # 预发布标记前的 0 段同样不影响大小（1.0rc1 == 1.0.0rc1 < 1.0）
+            while key and key[-1] == (1, 0, ''):
+                key.pop()
+            key.append((0, _PRE_RELEASE[part], part))
+        else:
+            key.append((1, 0, part))
+    # 去掉末尾的 0 段，再补一个正式版本标记，使 1.0 > 1.0rc1、1.0.1 > 1.0
+    while key and key[-1] == (1, 0, ''):
+        key.pop()
+    key.append((1, -1, ''))
+    return (epoch, tuple(key))
+
+
+# 默认的索引文件路径
+def index_file() -> str:
+    return os.path.join(os.path.dirname(conda_path_file()), 'conda_repodata_index.sqlite')
+
+
+# 可用版本索引
+class RepodataIndex:
+    def __init__(self, conda_path: str, index_path: str = None):
+        """
+        参数:
+            conda_path: conda的安装根目录，repodata 缓存位于 <conda_path>/pkgs/cache
+            index_path: SQLite 索引文件路径，默认保存在 conda_path.txt 同目录下
+        """
+        self.conda_path = conda_path
+        self.index_path = index_path or index_file()
+        self.cache_dir = os.path.join(conda_path, 'pkgs', 'cache') if conda_path else None
+
+    # 打开索引数据库
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        connection = sqlite3.connect(self.index_path, timeout=10)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    # 列出缓存目录中的 repodata 文件
+    def _cache_files(self) -> dict:
+        """
+        返回值:
+            dict: {文件路径: (size, mtime_ns)}
+        """
+        files = {}
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except (OSError, TypeError):
+            return files
+        for entry in entries:
+            # 新版本 conda 在旁边写 .info.json / .state.json 记录下载状态，不是 repodata
+            if not entry.name.endswith('.json') or entry.name.endswith(('.info.json', '.state.json')):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            files[entry.path] = (st.st_size, st.st_mtime_ns)
+        return files
+
+    # 解析单个 repodata 文件
+    @staticmethod
+    def _parse_repodata(path: str):
+        """
+        返回值:
+            tuple: (channel, subdir, {(name, version), ...})，解析失败返回 None
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                repodata = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        url = repodata.get('_url')
+        if not url:
+            # 新版本 conda 把下载地址放在同名的 .info.json 中
+            try:
+                with open(path[:-len('.json')] + '.info.json', 'r', encoding='utf-8') as f:
+                    url = json.load(f).get('url')
+            except (OSError, ValueError):
+                url = None
+        subdir = (repodata.get('info') or {}).get('subdir')
+        channel = url.rstrip('/').rsplit('/', 1)[0] if url else os.path.basename(path)
+
+        pairs = set()
+        for key in ('packages', 'packages.conda'):
+            for record in (repodata.get(key) or {}).values():
+                name, version = record.get('name'), record.get('version')
+                if name and version:
+                    pairs.add((name, version))
+        return channel, subdir, pairs
+
+    # 刷新索引
+    def refresh(self) -> bool:
+        """
+        重新解析变化过的缓存文件，删除已不存在的缓存文件对应的记录
+
+        返回值:
+            bool: 索引是否有变化
+        """
+        with span("repodata.refresh") as s:
+            files = self._cache_files()
+            connection = self.connect()
+            try:
+                indexed = {path: (size, mtime_ns) for path, size, mtime_ns in
+                           connection.execute("SELECT path, size, mtime_ns FROM sources")}
+                stale = [path for path in indexed if path not in files]
+                changed = [path for path, stat in files.items() if indexed.get(path) != stat]
+
+                for path in stale:
+                    connection.execute("DELETE FROM versions WHERE source_path = ?", (path,))
+                    connection.execute("DELETE FROM sources WHERE path = ?", (path,))
+                for path in changed:
+                    parsed = self._parse_repodata(path)
+                    connection.execute("DELETE FROM versions WHERE source_path = ?", (path,))
+                    if parsed is None:
+                        continue    # 正在被 conda 写入的文件，下次再试
+                    channel, subdir, pairs = parsed
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO versions (name, version, channel, source_path) VALUES (?, ?, ?, ?)",
+                        [(name, version, channel, path) for name, version in pairs]
+                    )
+                    connection.execute(
+                        "INSERT OR REPLACE INTO sources (path, size, mtime_ns, channel, subdir, indexed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, files[path][0], files[path][1], channel, subdir, time.time())
+                    )
+                connection.commit()
+                s.set(files=len(files), changed=len(changed), stale=len(stale))
+                return bool(stale or changed)
+            except sqlite3.Error as e:
+                connection.rollback()
+                print(f"刷新可用版本索引时出错: {e}")
+                return False
+            finally:
+                connection.close()
+
+    # 查询某个包的全部可用版本
+    def available_versions(self, package_name: str) -> list:
+        """
+        返回值:
+            list: 版本字符串，从新到旧排列
+        """
+        connection = self.connect()
+        try:
+            rows = connection.execute("SELECT DISTINCT version FROM versions WHERE name = ?", (package_name,)).fetchall()
+        finally:
+            connection.close()
+        return sorted((row[0] for row in rows), key=version_key, reverse=True)
+
+    # 按前缀查找包名（用于包名自动补全）
+    def package_names(self, prefix: str = '', limit: int = 200) -> list:
+        connection = self.connect()
+        try:
+            rows = connection.execute(
+                "SELECT DISTINCT name FROM versions WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+                (prefix, prefix + '￿', limit)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [row[0] for row in rows]
+
+    # 批量查询可用版本
+    def versions_by_name(self, package_names) -> dict:
+        """
+        参数:
+            package_names: 包名称的可迭代对象
+
+        返回值:
+            dict: {包名: [版本, ...]}（未排序），索引中没有的包不包含在内
+        """
+        names = list(set(package_names))
+        versions = {}
+        connection = self.connect()
+        try:
+            for i in range(0, len(names), QUERY_BATCH):
+                batch = names[i:i + QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                for name, version in connection.execute(
+                        f"SELECT DISTINCT name, version FROM versions WHERE name IN ({placeholders})", batch):
+                    versions.setdefault(name, []).append(version)
+        finally:
+            connection.close()
+        return versions
+
+    # 批量查询最新版本
+    def latest_versions(self, package_names) -> dict:
+        """
+        返回值:
+            dict: {包名: 最新版本}，索引中没有的包不包含在内
+        """
+        return {
+            name: max(candidates, key=version_key)
+            for name, candidates in self.versions_by_name(package_names).items()
+        }
+
+    # 查找有新版本的包
+    def newer_versions(self, installed: dict) -> dict:
+        """
+        参数:
+            installed: {包名: 已安装版本}
+
+        返回值:
+            dict: {包名: 最新版本}，只包含索引中的最新版本比已安装版本新的包
+        """
+        latest = self.latest_versions(installed.keys())
+        return {
+            name: version for name, version in latest.items()
+            if version_key(version) > version_key(installed[name])
+        }
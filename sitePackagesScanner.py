@@ -0,0 +1,211 @@
+# sitePackagesScanner.py
+import json
+import os
+import re
+import threading
+
+# 缓存 —— key: site-packages 目录, value: (目录修改时间, 扫描结果列表)
+_cache = {}
+# 缓存 —— key: conda-meta 目录, value: (目录修改时间, conda 安装的 dist-info/egg-info 目录名集合)
+_owned_cache = {}
+_cache_lock = threading.Lock()
+
+
+# 获取环境的 site-packages 目录
+def site_packages_dirs(env_path: str) -> list:
+    """
+    获取环境下的 site-packages 目录（Windows 为 Lib/site-packages，其他系统为 lib/pythonX.Y/site-packages）
+
+    参数:
+        env_path (str): 环境路径
+
+    返回值:
+        list: 存在的 site-packages 目录列表，没有安装 python 的环境返回空列表
+    """
+    dirs = []
+    win_dir = os.path.join(env_path, "Lib", "site-packages")
+    if os.path.isdir(win_dir):
+        dirs.append(win_dir)
+    lib_dir = os.path.join(env_path, "lib")
+    try:
+        for name in os.listdir(lib_dir):
+            if name.startswith("python"):
+                candidate = os.path.join(lib_dir, name, "site-packages")
+                if os.path.isdir(candidate):
+                    dirs.append(candidate)
+    except OSError:
+        pass
+    return dirs
+
+
+# 规范化包名称
+def normalize_name(name: str) -> str:
+    """
+    按 PEP 503 规范化包名称（小写，连续的 -_. 替换为 -），用于对比 conda 包名和 pip 包名
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+# 读取元数据文件头
+def read_metadata_headers(path: str) -> dict:
+    """
+    只读取 METADATA / PKG-INFO 的头部（遇到第一个空行即停止，不读后面的长描述）
+
+    参数:
+        path (str): 元数据文件路径
+
+    返回值:
+        dict: 包含 Name、Version 的字典，读取失败返回空字典
+    """
+    headers = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip():
+                    break
+                key, sep, value = line.partition(":")
+                if sep and key in ("Name", "Version"):
+                    headers[key] = value.strip()
+                    if len(headers) == 2:
+                        break
+    except OSError:
+        pass
+    return headers
+
+
+# 扫描单个 site-packages 目录
+def _scan_dir(site_dir: str) -> list:
+    results = []
+    try:
+        entries = os.listdir(site_dir)
+    except OSError:
+        return results
+
+    for entry in entries:
+        full_path = os.path.join(site_dir, entry)
+        installer = ""
+        if entry.endswith(".dist-info"):
+            meta_path = os.path.join(full_path, "METADATA")
+            try:
+                with open(os.path.join(full_path, "INSTALLER"), "r", encoding="utf-8") as f:
+                    installer = f.read().strip()
+            except OSError:
+                pass
+        elif entry.endswith(".egg-info"):
+            # egg-info 可能是目录（内含 PKG-INFO），也可能本身就是 PKG-INFO 格式的文件
+            meta_path = os.path.join(full_path, "PKG-INFO") if os.path.isdir(full_path) else full_path
+        else:
+            continue
+
+        headers = read_metadata_headers(meta_path)
+        if headers.get("Name") and headers.get("Version"):
+            results.append((headers["Name"], headers["Version"], installer, entry))
+    return results
+
+
+# 获取 conda 安装的 dist-info/egg-info 目录名
+def _conda_owned_dist_dirs(env_path: str) -> set:
+    """
+    读取 conda-meta/*.json 的文件列表，找出由 conda 包安装的 dist-info/egg-info 目录名，
+    用来识别 conda 包名和 Python 包名不一致（如 msgpack-python / msgpack）且没有 INSTALLER 文件的情况
+    """
+    meta_dir = os.path.join(env_path, "conda-meta")
+    try:
+        mtime = os.stat(meta_dir).st_mtime_ns
+    except OSError:
+        return set()
+    with _cache_lock:
+        cached = _owned_cache.get(meta_dir)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    owned = set()
+    for entry in os.listdir(meta_dir):
+        if not entry.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(meta_dir, entry), "r", encoding="utf-8") as f:
+                files = json.load(f).get("files", [])
+        except (OSError, ValueError):
+            continue
+        for file_path in files:
+            for part in file_path.replace("\\", "/").split("/"):
+                if part.endswith((".dist-info", ".egg-info")):
+                    owned.add(part)
+                    break
+    with _cache_lock:
+        _owned_cache[meta_dir] = (mtime, owned)
+    return owned
+
+
+# 扫描环境中 site-packages 下的所有包
+def scan_site_packages(env_path: str) -> list:
+    """
+    扫描环境的 site-packages 下的 *.dist-info 和 *.egg-info，结果按目录修改时间缓存
+    （安装/卸载包会增删 dist-info 目录，从而改变 site-packages 的修改时间）
+
+    参数:
+        env_path (str): 环境路径
+
+    返回值:
+        list: [(包名称, 版本, 安装器, 目录名)] 列表，安装器为 INSTALLER 文件内容（如 pip、conda），未知时为空字符串
+    """
+    results = []
+    for site_dir in site_packages_dirs(env_path):
+        try:
+            mtime = os.stat(site_dir).st_mtime_ns
+        except OSError:
+            continue
+        with _cache_lock:
+            cached = _cache.get(site_dir)
+        if cached and cached[0] == mtime:
+            results.extend(cached[1])
+            continue
+        scanned = _scan_dir(site_dir)
+        with _cache_lock:
+            _cache[site_dir] = (mtime, scanned)
+        results.extend(scanned)
+    return results
+
+
+# 把 pip 安装的包合并到包信息中
+def merge_pip_packages(packages: list, env_path: str) -> list:
+    """
+    用 site-packages 的扫描结果补全 conda list 的包信息，并标注来源
+
+    参数:
+        packages (list): [packages_name, packages_version, packages_BuildChannel, packages_source]
+        env_path (str): 环境路径
+
+    返回值:
+        list: 合并后的包信息，格式同上；conda 不知道的 pip 包追加在末尾，来源为 pip；
+        conda 装过、又被 pip 覆盖成其他版本的包改为 dist-info 中的版本，来源为 pip
+    """
+    names, versions, channels, sources = packages
+    index = {normalize_name(name): i for i, name in enumerate(names)}
+    owned = None
+
+    for name, version, installer, entry in scan_site_packages(env_path):
+        i = index.get(normalize_name(name))
+        if i is None:
+            if installer == "conda":
+                continue    # conda 安装的包已由 conda-meta 记录，名称不同（如 py-xxx）时不重复添加
+            if not installer:
+                # 没有 INSTALLER 文件时，再查 conda-meta 确认是不是 conda 装的（只在需要时读取）
+                if owned is None:
+                    owned = _conda_owned_dist_dirs(env_path)
+                if entry in owned:
+                    continue
+            index[normalize_name(name)] = len(names)
+            names.append(name)
+            versions.append(version)
+            channels.append("pypi")
+            sources.append("pip")
+        elif sources[i] == "pip":
+            versions[i] = version   # conda list 对 pip 包的版本可能过期，以 dist-info 为准
+        elif installer == "pip" and versions[i] != version:
+            # pip 覆盖安装了 conda 的包：conda-meta 中的记录已过期，实际生效的是 pip 装的版本
+            versions[i] = version
+            channels[i] = "pypi"
+            sources[i] = "pip"
+    return [names, versions, channels, sources]
@@ -0,0 +1,86 @@
+# startupProfiler.py
+"""
+启动耗时分析：把从 main.py 第一行到窗口可用的时间拆成 导入 / 构建界面 / 首次绘制 / 数据库检查 / 加载数据 等阶段
+
+用 python main.py --profile-startup 或设置环境变量 CONDA_MANAGER_PROFILE_STARTUP=1 打开，
+窗口可用后把各阶段耗时打印到控制台和操作日志；首次绘制超过 FIRST_PAINT_TARGET_MS 时给出提示。
+未打开时只记录几个时间点，几乎没有开销（首次绘制时间始终记录，供界面显示）
+
+时间从本模块被导入时开始计算（main.py 第一个导入它），不包括 Python 解释器自身的启动时间
+"""
+import contextlib
+import os
+import sys
+import time
+
+# 首次绘制的目标耗时（毫秒）
+FIRST_PAINT_TARGET_MS = 800
+
+_T0 = time.perf_counter()
+_phases = []        # [(阶段名, 开始, 结束)]，相对 _T0 的秒数
+_marks = {}         # {时间点名: 相对 _T0 的秒数}
+enabled = os.environ.get("CONDA_MANAGER_PROFILE_STARTUP") == "1" or "--profile-startup" in sys.argv
+
+
+# 相对启动的秒数
+def elapsed() -> float:
+    return time.perf_counter() - _T0
+
+
+# 记录一个阶段
+@contextlib.contextmanager
+def phase(name: str):
+    """
+    用法: with phase("import.qt"): import ...
+    """
+    start = elapsed()
+    try:
+        yield
+    finally:
+        _phases.append((name, start, elapsed()))
+
+
+# 记录一个时间点（只记录第一次）
+def mark(name: str):
+    _marks.setdefault(name, elapsed())
+
+
+# 时间点（毫秒），未记录时返回None
+def mark_ms(name: str):
+    return _marks[name] * 1000 if name in _marks else None
+
+
+# 启动耗时报告
+def report() -> dict:
+    """
+    返回值:
+        dict: {
+            "phases": [{"name", "start_ms", "duration_ms"}]（按开始时间排列）,
+            "marks": {时间点名: 毫秒},
+            "first_paint_ms": 首次绘制时间（毫秒）或 None,
+            "target_ms": 首次绘制的目标耗时,
+        }
+    """
+    phases = [{"name": name, "start_ms": round(start * 1000, 1), "duration_ms": round((end - start) * 1000, 1)}
+              for name, start, end in sorted(_phases, key=lambda p: p[1])]
+    return {
+        "phases": phases,
+        "marks": {name: round(value * 1000, 1) for name, value in sorted(_marks.items(), key=lambda m: m[1])},
+        "first_paint_ms": mark_ms("first_paint"),
+        "target_ms": FIRST_PAINT_TARGET_MS,
+    }
+
+
+# 格式化为文本
+def format_report(data: dict = None) -> str:
+    data = data or report()
+    lines = ["启动耗时:"]
+    for item in data["phases"]:
+        lines.append(f"  {item['name']:<20} 开始 {item['start_ms']:>8.1f} ms  耗时 {item['duration_ms']:>8.1f} ms")
+    for name, value in data["marks"].items():
+        lines.append(f"  @{name:<19} {value:>8.1f} ms")
+    first_paint = data["first_paint_ms"]
+    if first_paint is not None:
+        status = "达标" if first_paint <= data["target_ms"] else f"超过目标 {data['target_ms']} ms"
+        lines.append(f"  首次绘制 {first_paint:.1f} ms（{status}）")
+    return "\n".join(lines)
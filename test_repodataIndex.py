@@ -0,0 +1,30 @@
+# test_repodataIndex.py
+"""
+repodataIndex.version_key 的测试：python -m pytest test_repodataIndex.py
+"""
+from repodataIndex import version_key
+
+
+def test_pre_releases_sort_before_final_release():
+    ordered = ["1.0.dev1", "1.0a1", "1.0b2", "1.0rc1", "1.0"]
+    assert sorted(ordered, key=version_key) == ordered
+    assert version_key("1.0rc1") < version_key("1.0.0")
+
+
+def test_post_releases_sort_between_release_and_next_version():
+    ordered = ["1.0", "1.0.post1", "1.0.post2", "1.0.1"]
+    assert sorted(ordered, key=version_key) == ordered
+    assert version_key("1.1.1g") < version_key("1.1.1h") < version_key("1.1.2")
+
+
+def test_trailing_zero_segments_are_equal():
+    assert version_key("2.1") == version_key("2.1.0") == version_key("2.1.0.0")
+    assert version_key("2.1") < version_key("2.1.0.1")
+    assert version_key("2") < version_key("2.0.1")
+    assert version_key("1!1.0") > version_key("2.0")
+    assert version_key("1.0+local") == version_key("1.0")
+
+
+def test_numeric_segments_compare_as_numbers():
+    assert version_key("1.10") > version_key("1.9")
+    assert max(["3.9.18", "3.10.2", "3.10.12"], key=version_key) == "3.10.12"
@@ -0,0 +1,135 @@
+# test_writeBehind.py
+"""
+writeBehind.WriteBehindPersister 的测试，用假的控制器代替数据库：python -m pytest test_writeBehind.py
+"""
+import threading
+import time
+
+from lruCache import MISSING
+from writeBehind import WriteBehindPersister
+
+
+# 假的数据库控制器：记录每次写入，可以让前几次写入失败，或阻塞写入直到放行
+class FakeController:
+    def __init__(self, failures: int = 0, block: bool = False):
+        self.failures = failures
+        self.calls = []             # [(kind, 数据, 时间)]
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def _call(self, kind, data) -> bool:
+        self.calls.append((kind, data, time.monotonic()))
+        self.started.set()
+        self.release.wait(5)
+        if self.failures > 0:
+            self.failures -= 1
+            return False
+        return True
+
+    def apply_delta(self, changed, removed=(), scope: str = "delta"):
+        return self._call("delta", (dict(changed), sorted(removed)))
+
+    def save_environments(self, env_data):
+        return self._call("full", dict(env_data))
+
+
+def test_updates_to_same_env_are_merged():
+    controller = FakeController(block=True)
+    persister = WriteBehindPersister(controller, retry_base=0.01)
+    persister.submit({"a": ["/envs/a", 1]})
+    assert controller.started.wait(5)
+
+    # 第一批正在写入时，同一环境的多次更新只保留最后一次
+    persister.submit({"b": ["/envs/b", 1]})
+    persister.submit({"b": ["/envs/b", 2]}, removed=["c"])
+    persister.submit({"c": ["/envs/c", 1]})
+    persister.submit(removed=["c"])
+    controller.release.set()
+
+    assert persister.flush(timeout=5)
+    assert [call[:2] for call in controller.calls] == [
+        ("delta", ({"a": ["/envs/a", 1]}, [])),
+        ("delta", ({"b": ["/envs/b", 2]}, ["c"])),
+    ]
+    assert persister.written == 3
+    persister.close(timeout=5)
+
+
+def test_pending_includes_batch_being_written():
+    controller = FakeController(block=True)
+    persister = WriteBehindPersister(controller, retry_base=0.01)
+    persister.submit({"a": ["/envs/a", 1]}, removed=["gone"])
+    assert controller.started.wait(5)
+
+    # 已从队列取出但还没提交的批次仍然可见
+    assert persister.pending("a") == ["/envs/a", 1]
+    assert persister.pending("gone") is None
+    assert persister.pending("other") is MISSING
+
+    controller.release.set()
+    assert persister.flush(timeout=5)
+    assert persister.pending("a") is MISSING
+    persister.close(timeout=5)
+
+
+def test_pending_during_full_write():
+    controller = FakeController(block=True)
+    persister = WriteBehindPersister(controller, retry_base=0.01)
+    persister.replace_all({"a": ["/envs/a", 1]})
+    assert controller.started.wait(5)
+
+    assert persister.pending("a") == ["/envs/a", 1]
+    assert persister.pending("b") is None      # 不在全量结果中的环境会被删除
+
+    controller.release.set()
+    assert persister.flush(timeout=5)
+    assert persister.pending("b") is MISSING
+    persister.close(timeout=5)
+
+
+def test_failed_batch_is_retried_with_backoff():
+    controller = FakeController(failures=2)
+    persister = WriteBehindPersister(controller, retry_base=0.05, retry_max=1.0)
+    persister.submit({"a": ["/envs/a", 1]})
+
+    assert persister.flush(timeout=5)
+    assert len(controller.calls) == 3
+    assert all(call[:2] == ("delta", ({"a": ["/envs/a", 1]}, [])) for call in controller.calls)
+    # 每次失败后等待的时间翻倍
+    times = [call[2] for call in controller.calls]
+    assert times[1] - times[0] >= 0.05
+    assert times[2] - times[1] >= 0.1
+    assert persister.failures == 2
+    assert persister.written == 1
+    persister.close(timeout=5)
+
+
+def test_newer_update_wins_over_failed_batch():
+    controller = FakeController(failures=1, block=True)
+    persister = WriteBehindPersister(controller, retry_base=0.05)
+    persister.submit({"a": ["/envs/a", 1]})
+    assert controller.started.wait(5)
+
+    # 第一批写入失败前又提交了新的版本，重试时写入新的版本
+    persister.submit({"a": ["/envs/a", 2]})
+    controller.release.set()
+
+    assert persister.flush(timeout=5)
+    assert [call[1] for call in controller.calls] == [
+        ({"a": ["/envs/a", 1]}, []),
+        ({"a": ["/envs/a", 2]}, []),
+    ]
+    persister.close(timeout=5)
+
+
+def test_flush_times_out_while_writes_keep_failing():
+    controller = FakeController(failures=1000)
+    persister = WriteBehindPersister(controller, retry_base=0.01, retry_max=0.02)
+    persister.submit({"a": ["/envs/a", 1]})
+
+    assert not persister.flush(timeout=0.2)
+    assert persister.has_pending()
+    assert persister.pending("a") == ["/envs/a", 1]
+    assert not persister.close(timeout=0.2)
@@ -0,0 +1,189 @@
+# tracing.py
+"""
+轻量的耗时追踪：把 conda 子进程、数据库查询、界面渲染包在命名的 span 里，
+记录耗时、参数大小、行数等信息，保存在固定大小的环形缓冲区中，可导出为 Chrome trace JSON
+（chrome://tracing 或 https://ui.perfetto.dev 打开）
+
+关闭时 span() 直接返回一个共享的空对象，几乎没有开销；设置环境变量 CONDA_MANAGER_TRACE=1 可在启动时打开
+"""
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+_enabled = False
+_buffer = collections.deque(maxlen=10000)     # 环形缓冲区，满了自动丢弃最旧的记录
+_lock = threading.Lock()
+_pid = os.getpid()
+
+
+# 关闭时使用的空 span
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+# 记录中的 span
+class _Span:
+    __slots__ = ("name", "attrs", "start", "tid")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.start = 0
+        self.tid = 0
+
+    def __enter__(self):
+        self.tid = threading.get_ident()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        record = {
+            "name": self.name,
+            "start_ns": self.start,
+            "duration_ns": end - self.start,
+            "tid": self.tid,
+            "attrs": self.attrs,
+        }
+        with _lock:
+            _buffer.append(record)
+        return False
+
+    # 在 span 内补充属性（如返回的行数）
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+# 打开追踪
+def enable(capacity: int = None):
+    """
+    打开追踪
+
+    参数:
+        capacity (int, optional): 环形缓冲区容量，不传则保持原容量
+    """
+    global _enabled, _buffer
+    if capacity and capacity != _buffer.maxlen:
+        with _lock:
+            _buffer = collections.deque(_buffer, maxlen=capacity)
+    _enabled = True
+
+
+# 关闭追踪
+def disable():
+    global _enabled
+    _enabled = False
+
+
+# 是否打开
+def is_enabled() -> bool:
+    return _enabled
+
+
+# 清空已记录的 span
+def clear():
+    with _lock:
+        _buffer.clear()
+
+
+# 创建 span
+def span(name: str, **attrs):
+    """
+    创建一个命名的 span，用法: with span("db.load_environments") as s: ...; s.set(rows=10)
+
+    返回值:
+        关闭时返回共享的空对象，打开时返回新的 _Span
+    """
+    if not _enabled:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+# 计算参数大小
+def _size_of(value):
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+# 装饰器：把整个函数包在 span 里
+def traced(name: str):
+    """
+    装饰器，把函数调用包在名为 name 的 span 里，自动记录参数大小和返回值大小（行数/条目数）
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            # 第一个参数通常是 self，不计入
+            sizes = [_size_of(a) for a in args[1:]] + [_size_of(v) for v in kwargs.values()]
+            with _Span(name, {"arg_sizes": [s for s in sizes if s is not None]}) as s:
+                result = func(*args, **kwargs)
+                if isinstance(result, bool):
+                    s.set(ok=result)
+                elif result is None:
+                    s.set(ok=False)         # 查询类方法失败时返回 None
+                else:
+                    size = _size_of(result)
+                    if size is not None:
+                        s.set(rows=size)
+                return result
+        return wrapper
+    return decorator
+
+
+# 获取最近的 span
+def recent_spans(limit: int = None) -> list:
+    """
+    返回值:
+        list: 最近的 span 记录（旧的在前），每条包含 name、start_ns、duration_ns、tid、attrs
+    """
+    with _lock:
+        records = list(_buffer)
+    return records[-limit:] if limit else records
+
+
+# 导出 Chrome trace JSON
+def export_chrome_trace(path: str) -> int:
+    """
+    把缓冲区中的 span 导出为 Chrome trace 格式（Trace Event Format 的 X 事件）
+
+    返回值:
+        int: 导出的事件数
+    """
+    events = [{
+        "name": r["name"],
+        "cat": r["name"].split(".", 1)[0],
+        "ph": "X",
+        "ts": r["start_ns"] / 1000,         # 单位：微秒
+        "dur": r["duration_ns"] / 1000,
+        "pid": _pid,
+        "tid": r["tid"],
+        "args": r["attrs"],
+    } for r in recent_spans()]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+    return len(events)
+
+
+if os.environ.get("CONDA_MANAGER_TRACE") == "1":
+    enable()
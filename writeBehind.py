@@ -0,0 +1,219 @@
+# writeBehind.py
+"""
+清单的后台写入（write-behind）：界面拿到扫描结果后立即更新，写数据库的工作交给单独的线程
+
+- submit() 提交增量（变化的环境 / 删除的环境），replace_all() 提交一次全量扫描结果
+- 同一环境在写入前的多次更新会合并，只写最后一次
+- 写入线程把积累的增量放在一个事务里（MySQLController.apply_delta）批量写入，
+  失败时按指数退避重试，重试期间新提交的更新会覆盖失败批次中的同一环境
+- flush() 等待当前积累的数据全部写入（用于测试和需要立即读库的场景），close() 写完后停止线程（退出程序时调用）
+"""
+import threading
+import time
+
+from lruCache import MISSING
+
+# 每个事务最多写入的环境数
+BATCH_ENVS = 50
+# 重试的等待时间（秒），每次失败翻倍，直到上限
+RETRY_BASE = 1.0
+RETRY_MAX = 60.0
+
+
+class WriteBehindPersister:
+    def __init__(self, controller, batch_envs: int = BATCH_ENVS, retry_base: float = RETRY_BASE,
+                 retry_max: float = RETRY_MAX, callback=None):
+        """
+        参数:
+            controller: MySQLController（或 CachedMySQLController），只在写入线程中使用
+            batch_envs: 每个事务最多写入的环境数
+            retry_base: 第一次重试前等待的秒数
+            retry_max: 重试等待的上限（秒）
+            callback: 每次写入后在写入线程中调用 callback(是否成功, 环境名称列表)
+        """
+        self.controller = controller
+        self.batch_envs = batch_envs
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.callback = callback
+
+        self._cond = threading.Condition()
+        self._full = None           # 待写入的全量扫描结果 {env_name: env_info}，写在所有增量之前
+        self._pending = {}          # 待写入的增量 {env_name: env_info 或 None 表示删除}
+        self._in_flight = 0         # 正在写入的批次数（0 或 1）
+        self._in_flight_batch = None    # 正在写入的批次 (kind, batch)，提交前 pending() 仍以它为准
+        self._generation = 0        # 每次提交全量扫描结果时递增，用来丢弃过时的失败批次
+        self._stopping = False
+        self._thread = None
+
+        self.written = 0            # 已写入的环境数
+        self.failures = 0           # 写入失败的次数（每次重试都计入）
+        self.last_error_at = None   # 最近一次写入失败的时间
+
+    # 启动写入线程
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    # 提交增量
+    def submit(self, changed: dict = None, removed=()):
+        """
+        参数:
+            changed: {env_name: [env_path, packages]}
+            removed: 要删除的环境名称
+        """
+        with self._cond:
+            for env_name, env_info in (changed or {}).items():
+                self._pending[env_name] = env_info
+            for env_name in removed:
+                self._pending[env_name] = None
+            self._cond.notify_all()
+        self.start()
+
+    # 提交全量扫描结果
+    def replace_all(self, env_data: dict):
+        """
+        用全量扫描结果替换本机在数据库中的全部环境（不在结果中的环境会被删除），之前积累的增量都被它覆盖
+        """
+        with self._cond:
+            self._full = dict(env_data)
+            self._pending.clear()
+            self._generation += 1
+            self._cond.notify_all()
+        self.start()
+
+    # 查询尚未写入的数据
+    def pending(self, env_name: str):
+        """
+        按 待写入的增量 -> 待写入的全量结果 -> 正在写入的批次 的顺序查找（后提交的优先）
+
+        返回值:
+            尚未写入数据库的 env_info（None 表示等待删除）；没有待写入的数据时返回 MISSING
+        """
+        with self._cond:
+            if env_name in self._pending:
+                return self._pending[env_name]
+            if self._full is not None:
+                return self._full.get(env_name)
+            if self._in_flight_batch is not None:
+                kind, batch = self._in_flight_batch
+                if kind == "full":
+                    return batch.get(env_name)
+                if env_name in batch:
+                    return batch[env_name]
+            return MISSING
+
+    # 是否还有数据没有写入
+    def has_pending(self) -> bool:
+        with self._cond:
+            return self._full is not None or bool(self._pending) or self._in_flight > 0
+
+    # 等待积累的数据全部写入
+    def flush(self, timeout: float = None) -> bool:
+        """
+        返回值:
+            bool: 超时前是否全部写入（写入一直失败时会等到超时）
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._full is not None or self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    # 写完后停止写入线程
+    def close(self, timeout: float = None) -> bool:
+        """
+        返回值:
+            bool: 停止前是否全部写入
+        """
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+        return flushed
+
+    # 取出下一批
+    def _take_batch(self):
+        if self._full is not None:
+            batch, self._full = self._full, None
+            return "full", batch
+        names = list(self._pending)[:self.batch_envs]
+        return "delta", {name: self._pending.pop(name) for name in names}
+
+    # 失败的批次放回队列（期间有更新的环境以新的为准）
+    def _requeue(self, kind: str, batch: dict, generation: int):
+        if generation != self._generation:
+            return      # 期间又提交了全量扫描结果，这一批已经过时
+        if kind == "full":
+            self._full = batch
+            return
+        for env_name, env_info in batch.items():
+            self._pending.setdefault(env_name, env_info)
+
+    # 写入一批
+    def _write(self, kind: str, batch: dict) -> bool:
+        if kind == "full":
+            return self.controller.save_environments(batch)
+        changed = {name: info for name, info in batch.items() if info is not None}
+        removed = [name for name, info in batch.items() if info is None]
+        return self.controller.apply_delta(changed, removed, scope="write-behind")
+
+    # 写入线程
+    def _run(self):
+        retry = 0
+        while True:
+            with self._cond:
+                while not self._stopping and self._full is None and not self._pending:
+                    self._cond.wait()
+                if self._full is None and not self._pending:
+                    return      # 已停止，且没有待写入的数据
+                kind, batch = self._take_batch()
+                generation = self._generation
+                self._in_flight += 1
+                self._in_flight_batch = (kind, batch)
+
+            ok = False
+            try:
+                ok = self._write(kind, batch)
+            except Exception as e:
+                print(f"后台写入数据库时出错: {e}")
+
+            with self._cond:
+                self._in_flight -= 1
+                self._in_flight_batch = None
+                if ok:
+                    self.written += len(batch)
+                    retry = 0
+                else:
+                    self.failures += 1
+                    self.last_error_at = time.time()
+                    self._requeue(kind, batch, generation)
+                self._cond.notify_all()
+
+            if self.callback is not None:
+                try:
+                    self.callback(ok, sorted(batch))
+                except Exception as e:
+                    print(f"后台写入回调出错: {e}")
+
+            if not ok:
+                # 指数退避，期间新提交的数据不会提前触发重试；停止时不再重试
+                deadline = time.monotonic() + min(self.retry_max, self.retry_base * (2 ** retry))
+                retry += 1
+                with self._cond:
+                    while not self._stopping and deadline > time.monotonic():
+                        self._cond.wait(deadline - time.monotonic())
+                    if self._stopping:
+                        print(f"后台写入已停止，{len(self._pending) + len(self._full or {})} 个环境的数据未写入数据库")
+                        return